@@ -1,14 +1,232 @@
-from flask import Blueprint, request, jsonify, render_template
+from flask import Blueprint, Response, g, request, jsonify, render_template, stream_with_context
+import hmac
+import json
 import logging
+import os
+import threading
+import time
 import numpy as np
-from app.services.prediction_service import PredictionService
+from app.services.admission import AdmissionController, AdmissionRejected
+from app.services.model_registry import UnknownModelError
+from app.services.profiler import ProfilerCapture
+from app.services.warmup import Readiness
+from app.utils import metrics, postprocessing, wire_formats
+from app.utils.metrics import stage
+from config.settings import Config
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('api', __name__)
 
-# Initialize prediction service
-prediction_service = PredictionService('models/cyber_sentinel_model.pkl')
+# The model registry (and torch with it) is created on first use, so
+# importing the app and forking workers stay cheap
+_model_registry = None
+_model_registry_lock = threading.Lock()
+
+# Admission control is per worker: each one sheds load on its own queue
+_admission_controller = None
+_admission_lock = threading.Lock()
+
+# Armed on demand through /api/admin/profile; idle it costs one attribute check per request
+profiler = ProfilerCapture(Config.PROFILER_OUTPUT_DIR, max_seconds=Config.PROFILER_MAX_SECONDS)
+
+# This worker's startup warm-up, reported by /api/health/ready
+readiness = Readiness()
+
+def build_prediction_service(model_path: str, shadow: dict = None):
+    """Build a prediction service for one model file from Config, optionally with a shadow model"""
+    from app.services.prediction_service import PredictionService
+    return PredictionService(
+        model_path,
+        batching=Config.batching_options(),
+        cache=Config.cache_options(),
+        load_mode=Config.MODEL_LOAD_MODE,
+        backend=Config.backend_options(),
+        preprocessing=Config.preprocessing_options(),
+        buffer_pool=Config.buffer_pool_options(),
+        shadow=shadow,
+        warmup=Config.warmup_options(),
+        monitoring=Config.monitoring_options()
+    )
+
+def get_model_registry():
+    """Get the model registry, creating it from Config on first call"""
+    global _model_registry
+    if _model_registry is None:
+        with _model_registry_lock:
+            if _model_registry is None:
+                from app.services.model_registry import ModelRegistry
+                models = Config.registry_models()
+                shadow = Config.shadow_options()
+                # Only the configured primary model's file gets the shadow candidate
+                shadowed_path = models.get(shadow['primary'], {}).get('path') if shadow['enabled'] else None
+                registry = ModelRegistry(
+                    lambda path: build_prediction_service(path, shadow=shadow if path == shadowed_path else None),
+                    memory_budget_mb=Config.REGISTRY_MEMORY_BUDGET_MB,
+                    default_model=Config.REGISTRY_DEFAULT_MODEL
+                )
+                for name, spec in models.items():
+                    registry.register(name, spec['path'], version=spec.get('version'))
+                _model_registry = registry
+    return _model_registry
+
+def start_warm_up() -> None:
+    """Load and warm the default model in the background, once per worker
+    
+    Called by the servers as a worker starts; until it finishes the
+    readiness endpoint answers 503, so the load balancer holds traffic back.
+    """
+    if not Config.WARMUP_ENABLED or not readiness.begin():
+        return
+    
+    def run() -> None:
+        try:
+            with lease_prediction_service() as service:
+                readiness.finish(service.warm_up())
+        except Exception as e:
+            logger.error(f"Warm-up failed: {e}")
+            readiness.fail(str(e))
+    
+    threading.Thread(target=run, name='warm-up', daemon=True).start()
+
+def model_loaded() -> bool:
+    """Whether the default model is resident, without creating the registry or loading it"""
+    return _model_registry is not None and _model_registry.is_loaded()
+
+def device_info() -> dict:
+    """Device details and the configured CPU layout of the workers"""
+    from app.utils.model_utils import get_device_info
+    from app.utils.topology import get_topology_info
+    return get_device_info(topology=get_topology_info(
+        Config.WORKERS,
+        intra_op_threads=Config.TOPOLOGY_INTRA_OP_THREADS,
+        interop_threads=Config.TOPOLOGY_INTEROP_THREADS
+    ))
+
+def get_admission_controller():
+    """Get the admission controller for the prediction routes, creating it from Config on first call"""
+    global _admission_controller
+    if _admission_controller is None:
+        with _admission_lock:
+            if _admission_controller is None:
+                _admission_controller = AdmissionController(**Config.admission_options())
+    return _admission_controller
+
+def lease_prediction_service(name: str = None, version: str = None):
+    """Lease the service for a model version (default: the default model's active version)
+    
+    Use it as a context manager; a version that is swapped out or evicted
+    meanwhile is only closed once the block exits.
+    """
+    return get_model_registry().lease(name, version)
+
+def serving_stats() -> dict:
+    """The default model's micro-batching, cache, buffer pool and shadow statistics"""
+    with lease_prediction_service() as service:
+        return {
+            "batching": service.get_batching_stats(),
+            "cache": service.get_cache_stats(),
+            "buffer_pool": service.get_buffer_pool_stats(),
+            "shadow": service.get_shadow_stats()
+        }
+
+def deploy_model_version(name: str, data: dict):
+    """Start a background deploy of a new model version; returns (payload, status)"""
+    if not Config.REGISTRY_ALLOW_DEPLOY:
+        return {"success": False, "error": "Model deployment over the API is disabled"}, 403
+    
+    path = (data or {}).get('path')
+    if not path:
+        return {"success": False, "error": "No model path provided. Use 'path' key."}, 400
+    
+    # Only load files from the model directory: unpickling a model runs arbitrary code
+    model_dir = os.path.realpath(Config.REGISTRY_MODEL_DIR)
+    model_path = os.path.realpath(path)
+    if os.path.commonpath([model_dir, model_path]) != model_dir:
+        return {"success": False, "error": f"Model files must be under {Config.REGISTRY_MODEL_DIR}"}, 400
+    if not os.path.isfile(model_path):
+        return {"success": False, "error": f"Model file not found: {path}"}, 404
+    
+    version = get_model_registry().deploy(name, model_path, version=data.get('version'))
+    return {"success": True, "model": name, "version": version, "state": "loading"}, 202
+
+def is_admin(token: str) -> bool:
+    """Whether a request's X-Admin-Token matches Config.ADMIN_TOKEN (never, if none is set)"""
+    if not Config.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode('utf-8'), Config.ADMIN_TOKEN.encode('utf-8'))
+
+def arm_profiler(data: dict):
+    """Arm a profiler capture on this worker; returns (payload, status)"""
+    if not isinstance(data, dict):
+        data = {}
+    try:
+        seconds = data.get('seconds')
+        status = profiler.arm(
+            requests=int(data.get('requests', 10)),
+            seconds=float(seconds) if seconds is not None else None,
+            sample_interval_ms=float(data.get('sample_interval_ms', 5.0))
+        )
+    except (TypeError, ValueError) as e:
+        return {"success": False, "error": f"Invalid capture options: {e}"}, 400
+    except RuntimeError as e:
+        return {"success": False, "error": str(e)}, 409
+    except ImportError as e:
+        return {"success": False, "error": f"Profiling is unavailable: {e}"}, 501
+    return {"success": True, **status}, 202
+
+def _model_selection():
+    """Model name and version from ?model=&version= or the X-Model / X-Model-Version headers"""
+    return (
+        request.args.get('model') or request.headers.get('X-Model'),
+        request.args.get('version') or request.headers.get('X-Model-Version')
+    )
+
+def _unknown_model(e: Exception):
+    return jsonify({"success": False, "error": str(e)}), 404
+
+def _client_id() -> str:
+    """Rate-limit key: the configured client header when sent, else the remote address"""
+    if Config.ADMISSION_CLIENT_HEADER:
+        client = request.headers.get(Config.ADMISSION_CLIENT_HEADER)
+        if client:
+            return client
+    return request.remote_addr or 'unknown'
+
+def _rejected(e: AdmissionRejected):
+    response = jsonify({"success": False, "error": str(e), "retry_after": e.retry_after})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, e.status
+
+@bp.before_app_request
+def _start_request_metrics():
+    g.request_start = time.perf_counter()
+    metrics.REQUESTS_IN_FLIGHT.inc()
+    metrics.start_request_timings()
+    if profiler.armed:
+        g.profile = profiler.begin_request(request.endpoint or 'unmatched')
+
+@bp.after_app_request
+def _record_request_metrics(response):
+    """Record request latency and status, and report stage timings in Server-Timing"""
+    if 'request_start' not in g:
+        return response
+    
+    elapsed = time.perf_counter() - g.request_start
+    # Label by endpoint rather than path so unknown URLs can't blow up the series count
+    endpoint = request.endpoint or 'unmatched'
+    metrics.REQUEST_LATENCY.observe(elapsed, endpoint)
+    metrics.REQUESTS.inc(endpoint, str(response.status_code))
+    response.headers['Server-Timing'] = metrics.format_server_timing(metrics.pop_request_timings(), elapsed)
+    return response
+
+@bp.teardown_app_request
+def _finish_request_metrics(exc):
+    if g.pop('request_start', None) is not None:
+        metrics.REQUESTS_IN_FLIGHT.dec()
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profiler.end_request(profile)
 
 @bp.route('/')
 def index():
@@ -17,41 +235,182 @@ def index():
 
 @bp.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint
+    
+    Never goes through admission control or touches the model, and with
+    threaded workers it has reserved threads, so it answers under overload.
+    """
     return jsonify({
         "status": "healthy",
-        "model_loaded": True,
+        "model_loaded": model_loaded(),
+        "ready": readiness.ready,
         "service": "cyber_sentinel"
     })
 
+@bp.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the worker is up and answering, warm or not"""
+    return jsonify({"status": "alive", "service": "cyber_sentinel"})
+
+@bp.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 503 while the startup warm-up runs (or after it failed), 200 once warm"""
+    state = readiness.to_dict()
+    return jsonify({"status": state["state"], "model_loaded": model_loaded(), **state}), 200 if state["ready"] else 503
+
 @bp.route('/api/model/info', methods=['GET'])
 def get_model_info():
     """Get model information"""
-    capabilities = prediction_service.get_model_capabilities()
+    try:
+        with lease_prediction_service(*_model_selection()) as service:
+            capabilities = service.get_model_capabilities()
+    except UnknownModelError as e:
+        return _unknown_model(e)
     return jsonify(capabilities)
 
+@bp.route('/api/monitoring/features', methods=['GET'])
+def feature_monitoring():
+    """Running per-feature input statistics (moments, range, quantiles) and drift scores"""
+    try:
+        with lease_prediction_service(*_model_selection()) as service:
+            stats = service.get_monitoring_stats()
+    except UnknownModelError as e:
+        return _unknown_model(e)
+    return jsonify(stats)
+
+@bp.route('/api/models', methods=['GET'])
+def list_models():
+    """List registered models, their versions, and which are loaded"""
+    return jsonify(get_model_registry().get_stats())
+
+@bp.route('/api/models/<name>/deploy', methods=['POST'])
+def deploy_model(name):
+    """Load a new model version in the background and swap it in once warm"""
+    payload, status = deploy_model_version(name, request.get_json(silent=True) or {})
+    return jsonify(payload), status
+
+@bp.route('/api/admin/profile', methods=['GET', 'POST'])
+def profile_capture():
+    """Arm a profiler capture for the next requests on this worker, or report its status
+    
+    POST {"requests": N, "seconds": T, "sample_interval_ms": I} writes one
+    Chrome trace per captured request plus a collapsed-stack flamegraph
+    file under profiler.output_dir. Requires the X-Admin-Token header.
+    """
+    if not is_admin(request.headers.get('X-Admin-Token')):
+        return jsonify({"success": False, "error": "Admin token required"}), 403
+    
+    if request.method == 'GET':
+        return jsonify(profiler.get_status())
+    payload, status = arm_profiler(request.get_json(silent=True) or {})
+    return jsonify(payload), status
+
+@bp.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Get serving statistics (micro-batching, prediction cache, buffer pool, shadow model, memory and CPU layout)"""
+    from app.utils.model_utils import get_process_memory
+    
+    return jsonify({
+        **serving_stats(),
+        "models": get_model_registry().get_stats(),
+        "admission": get_admission_controller().get_stats(),
+        "memory": get_process_memory(),
+        "device": device_info()
+    })
+
+@bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Per-stage latency histograms and request/row counters in the Prometheus text format
+    
+    Each server worker keeps its own metrics, so a scrape sees the worker
+    that answered it.
+    """
+    return Response(metrics.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+def _read_binary_input(key: str):
+    """Decode a binary request body, or return None for JSON requests"""
+    request_format = wire_formats.normalize_mimetype(request.mimetype)
+    if not wire_formats.is_binary(request_format):
+        return None
+    
+    return wire_formats.decode_body(
+        request.get_data(cache=False),
+        request_format,
+        key,
+        shape_header=request.headers.get(wire_formats.SHAPE_HEADER)
+    )
+
+def _response_format() -> str:
+    """Pick the response encoding from the Accept header, defaulting to the request format"""
+    request_format = wire_formats.normalize_mimetype(request.mimetype)
+    if request_format not in wire_formats.SUPPORTED_FORMATS:
+        request_format = wire_formats.JSON
+    
+    offered = [request_format] + [
+        mimetype for mimetype in wire_formats.SUPPORTED_FORMATS if mimetype != request_format
+    ] + list(wire_formats.MIMETYPE_ALIASES)
+    best = request.accept_mimetypes.best_match(offered) if request.accept_mimetypes else None
+    
+    return wire_formats.normalize_mimetype(best or request_format)
+
+def _binary_response(result, key: str, response_format: str):
+    """Build a binary response for the array under result[key]"""
+    try:
+        body, headers = wire_formats.encode_result(result, key, response_format)
+    except wire_formats.RowErrorsTooLarge as e:
+        return jsonify({"success": False, "error": str(e), "errors": result.get("errors")}), 422
+    return Response(body, status=200, mimetype=response_format, headers=headers)
+
 @bp.route('/api/predict', methods=['POST'])
 def predict():
     """Make a prediction"""
     try:
-        data = request.get_json()
-        
-        if not data or 'input' not in data:
+        try:
+            with stage('parse'):
+                input_data = _read_binary_input('input')
+        except ValueError as e:
             return jsonify({
                 "success": False,
-                "error": "No input data provided. Use 'input' key."
+                "error": f"Invalid request body: {str(e)}"
             }), 400
         
-        input_data = data['input']
+        if input_data is None:
+            with stage('parse'):
+                data = request.get_json()
+            
+            if not data or 'input' not in data:
+                return jsonify({
+                    "success": False,
+                    "error": "No input data provided. Use 'input' key."
+                }), 400
+            
+            input_data = data['input']
+        
+        try:
+            postprocess = postprocessing.parse_options(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        
+        response_format = _response_format()
         
         # Make prediction
-        result = prediction_service.predict(input_data)
+        with get_admission_controller().admit(_client_id()):
+            with get_model_registry().lease(*_model_selection()) as service:
+                result = service.predict(input_data, as_numpy=wire_formats.is_binary(response_format),
+                                         postprocess=postprocess)
         
         if result['success']:
-            return jsonify(result), 200
+            with stage('serialize'):
+                if wire_formats.is_binary(response_format):
+                    return _binary_response(result, 'prediction', response_format)
+                return jsonify(result), 200
         else:
             return jsonify(result), 500
-            
+    
+    except AdmissionRejected as e:
+        return _rejected(e)
+    except UnknownModelError as e:
+        return _unknown_model(e)
     except Exception as e:
         logger.error(f"Prediction endpoint error: {e}")
         return jsonify({
@@ -63,30 +422,58 @@ def predict():
 def batch_predict():
     """Make batch predictions"""
     try:
-        data = request.get_json()
-        
-        if not data or 'inputs' not in data:
+        try:
+            with stage('parse'):
+                batch_data = _read_binary_input('inputs')
+        except ValueError as e:
             return jsonify({
                 "success": False,
-                "error": "No input data provided. Use 'inputs' key for batch processing."
+                "error": f"Invalid request body: {str(e)}"
             }), 400
         
-        batch_data = data['inputs']
+        if batch_data is None:
+            with stage('parse'):
+                data = request.get_json()
+            
+            if not data or 'inputs' not in data:
+                return jsonify({
+                    "success": False,
+                    "error": "No input data provided. Use 'inputs' key for batch processing."
+                }), 400
+            
+            batch_data = data['inputs']
         
-        if not isinstance(batch_data, list):
+        if not isinstance(batch_data, (list, np.ndarray)):
             return jsonify({
                 "success": False,
                 "error": "Batch data must be a list of inputs"
             }), 400
         
+        try:
+            postprocess = postprocessing.parse_options(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        
+        response_format = _response_format()
+        
         # Make batch prediction
-        result = prediction_service.batch_predict(batch_data)
+        with get_admission_controller().admit(_client_id(), rows=len(batch_data)):
+            with get_model_registry().lease(*_model_selection()) as service:
+                result = service.batch_predict(batch_data, as_numpy=wire_formats.is_binary(response_format),
+                                               postprocess=postprocess)
         
         if result['success']:
-            return jsonify(result), 200
+            with stage('serialize'):
+                if wire_formats.is_binary(response_format):
+                    return _binary_response(result, 'predictions', response_format)
+                return jsonify(result), 200
         else:
             return jsonify(result), 500
-            
+    
+    except AdmissionRejected as e:
+        return _rejected(e)
+    except UnknownModelError as e:
+        return _unknown_model(e)
     except Exception as e:
         logger.error(f"Batch prediction endpoint error: {e}")
         return jsonify({
@@ -94,10 +481,70 @@ def batch_predict():
             "error": f"Internal server error: {str(e)}"
         }), 500
 
+@bp.route('/api/predict/stream', methods=['POST'])
+def stream_predict():
+    """Score a stream of NDJSON records or float32 frames, streaming results back
+    
+    The body is read incrementally and scored in chunks of chunk_size records,
+    so memory stays flat however large the input is. Output is written in the
+    request's format, one result per input record. Post-processing options
+    apply per chunk, as for the other prediction endpoints.
+    """
+    request_format = wire_formats.normalize_mimetype(request.mimetype)
+    if request_format not in wire_formats.STREAM_FORMATS:
+        return jsonify({
+            "success": False,
+            "error": f"Streaming requires one of: {', '.join(wire_formats.STREAM_FORMATS)}"
+        }), 415
+    
+    try:
+        model_name, model_version = get_model_registry().resolve(*_model_selection())
+    except UnknownModelError as e:
+        return _unknown_model(e)
+    
+    try:
+        postprocess = postprocessing.parse_options(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    chunk_size = request.args.get('chunk_size', Config.STREAM_CHUNK_SIZE, type=int)
+    chunk_size = max(1, min(chunk_size, Config.STREAM_CHUNK_SIZE * 16))
+    
+    if request_format == wire_formats.FRAMES:
+        records = wire_formats.iter_frame_records(request.stream, Config.STREAM_MAX_RECORD_BYTES)
+        encode_chunk = wire_formats.encode_frames_chunk
+    else:
+        records = wire_formats.iter_ndjson_records(request.stream, Config.STREAM_MAX_RECORD_BYTES)
+        encode_chunk = wire_formats.encode_ndjson_chunk
+    
+    # A stream holds up to one chunk of rows in flight for as long as it runs
+    admission = get_admission_controller()
+    try:
+        admission.acquire(_client_id(), rows=chunk_size)
+    except AdmissionRejected as e:
+        return _rejected(e)
+    
+    def generate():
+        try:
+            with get_model_registry().lease(model_name, model_version) as service:
+                for chunk in service.stream_predict(records, chunk_size, postprocess=postprocess):
+                    yield encode_chunk(chunk)
+        except Exception as e:
+            # Headers are already sent, so the failure can only be reported in-band
+            logger.error(f"Streaming prediction error: {e}")
+            if request_format == wire_formats.NDJSON:
+                yield (json.dumps({"error": f"Internal server error: {str(e)}"}) + '\n').encode('utf-8')
+    
+    response = Response(stream_with_context(generate()), mimetype=request_format)
+    # Released when the response is closed, even if the body is never iterated
+    response.call_on_close(lambda: admission.release(rows=chunk_size))
+    return response
+
 @bp.route('/api/example', methods=['GET'])
 def get_example():
     """Get example input format"""
-    model_info = prediction_service.get_model_capabilities()
+    with lease_prediction_service() as service:
+        model_info = service.get_model_capabilities()
     input_size = model_info['model_info'].get('input_size', 'unknown')
     
     example_input = {
@@ -0,0 +1,492 @@
+"""
+ASGI entry point serving the same API as the Flask app
+
+    uvicorn --factory app.asgi:create_asgi_app
+
+Request bodies are received and responses sent on the event loop, so idle
+or slow connections cost a coroutine rather than a worker. Parsing,
+inference and serialization run in a bounded thread pool.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+from app.api.routes import (arm_profiler, deploy_model_version, device_info, get_admission_controller,
+                            get_model_registry, is_admin, lease_prediction_service, model_loaded, profiler,
+                            readiness, serving_stats, start_warm_up)
+from app.services.admission import AdmissionController, AdmissionRejected
+from app.services.model_registry import UnknownModelError
+from app.utils import metrics, postprocessing, wire_formats
+from app.utils.metrics import stage
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+# Same URLs as the Flask app: '/api/...' routes on a blueprint mounted at '/api'
+URL_PREFIX = '/api'
+
+# (status, headers, body)
+HandlerResult = Tuple[int, Dict[str, str], bytes]
+
+class Request:
+    """The parts of an ASGI HTTP request the handlers need"""
+    __slots__ = ('method', 'path', 'query', 'headers', 'body', 'remote_addr')
+    
+    def __init__(self, scope: Dict[str, Any], body: bytes = b''):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.remote_addr = scope['client'][0] if scope.get('client') else None
+        self.query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        self.body = body
+    
+    @property
+    def mimetype(self) -> str:
+        return self.headers.get('content-type', '').split(';')[0].strip().lower()
+    
+    @property
+    def accept_mimetypes(self) -> MIMEAccept:
+        return parse_accept_header(self.headers.get('accept'), MIMEAccept)
+    
+    @property
+    def args(self) -> Dict[str, str]:
+        """First value of each query parameter, like Flask's request.args"""
+        return {name: values[0] for name, values in self.query.items() if values}
+    
+    def query_value(self, name: str) -> Optional[str]:
+        values = self.query.get(name)
+        return values[0] if values else None
+    
+    def model_selection(self) -> Tuple[Optional[str], Optional[str]]:
+        """Model name and version, as in the Flask routes"""
+        return (
+            self.query_value('model') or self.headers.get('x-model'),
+            self.query_value('version') or self.headers.get('x-model-version')
+        )
+    
+    def client_id(self) -> str:
+        """Rate-limit key, as in the Flask routes"""
+        if Config.ADMISSION_CLIENT_HEADER:
+            client = self.headers.get(Config.ADMISSION_CLIENT_HEADER.lower())
+            if client:
+                return client
+        return self.remote_addr or 'unknown'
+    
+    def query_int(self, name: str, default: int) -> int:
+        try:
+            return int(self.query[name][0])
+        except (KeyError, IndexError, ValueError):
+            return default
+
+def _json(payload: Any, status: int = 200) -> HandlerResult:
+    return status, {'Content-Type': wire_formats.JSON}, json.dumps(payload).encode('utf-8')
+
+def _rejected(e: AdmissionRejected) -> HandlerResult:
+    status, headers, body = _json({"success": False, "error": str(e), "retry_after": e.retry_after}, e.status)
+    headers['Retry-After'] = str(e.retry_after)
+    return status, headers, body
+
+class AsgiApp:
+    """Minimal ASGI application exposing the Cyber Sentinel API"""
+    
+    def __init__(self, inference_threads: int = 4, max_pending: int = 64,
+                 admission: Optional[AdmissionController] = None):
+        self.executor = ThreadPoolExecutor(max_workers=inference_threads, thread_name_prefix='inference')
+        self.max_pending = max_pending
+        self._pending: Optional[asyncio.Semaphore] = None
+        # Defaults to the one the Flask routes use
+        self.admission = admission or get_admission_controller()
+        
+        # path -> (methods, endpoint name, handler, runs on the executor)
+        self.routes: Dict[str, Tuple[Tuple[str, ...], str, Callable, bool]] = {
+            URL_PREFIX + '/api/health': (('GET',), 'api.health_check', self.health_check, False),
+            URL_PREFIX + '/api/health/live': (('GET',), 'api.liveness_check', self.liveness_check, False),
+            URL_PREFIX + '/api/health/ready': (('GET',), 'api.readiness_check', self.readiness_check, False),
+            URL_PREFIX + '/metrics': (('GET',), 'api.get_metrics', self.get_metrics, False),
+            URL_PREFIX + '/api/model/info': (('GET',), 'api.get_model_info', self.get_model_info, True),
+            URL_PREFIX + '/api/monitoring/features': (('GET',), 'api.feature_monitoring',
+                                                      self.feature_monitoring, True),
+            URL_PREFIX + '/api/models': (('GET',), 'api.list_models', self.list_models, True),
+            URL_PREFIX + '/api/admin/profile': (('GET', 'POST'), 'api.profile_capture', self.profile_capture, True),
+            URL_PREFIX + '/api/stats': (('GET',), 'api.get_stats', self.get_stats, True),
+            URL_PREFIX + '/api/example': (('GET',), 'api.get_example', self.get_example, True),
+            URL_PREFIX + '/api/predict': (('POST',), 'api.predict', self.predict, True),
+            URL_PREFIX + '/api/predict/batch': (('POST',), 'api.batch_predict', self.batch_predict, True)
+        }
+        self.stream_path = URL_PREFIX + '/api/predict/stream'
+        self.deploy_prefix = URL_PREFIX + '/api/models/'
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._handle_http(scope, receive, send)
+    
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Warms up in the background: the server starts answering (not ready) right away
+                start_warm_up()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def run_blocking(self, fn: Callable, *args) -> Any:
+        """Run fn on the inference pool, waiting on the loop while the pool is saturated"""
+        if self._pending is None:
+            # Created lazily so it binds to the server's running loop
+            self._pending = asyncio.Semaphore(self.max_pending)
+        
+        async with self._pending:
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(self.executor, context.run, fn, *args)
+    
+    async def _handle_http(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        start_time = time.perf_counter()
+        metrics.REQUESTS_IN_FLIGHT.inc()
+        metrics.start_request_timings()
+        endpoint = 'unmatched'
+        status = 500
+        
+        try:
+            path = scope['path']
+            if path == self.stream_path:
+                endpoint = 'api.stream_predict'
+                if scope['method'] != 'POST':
+                    status = 405
+                    await self._send(send, *_json({"success": False, "error": "Method not allowed"}, 405))
+                else:
+                    status = await self._stream_predict(Request(scope), receive, send)
+                return
+            
+            route = self.routes.get(path)
+            if route is None and path.startswith(self.deploy_prefix) and path.endswith('/deploy'):
+                name = path[len(self.deploy_prefix):-len('/deploy')]
+                route = (('POST',), 'api.deploy_model', lambda request: self.deploy_model(request, name), True)
+            
+            if route is None:
+                result = _json({"success": False, "error": "Not found"}, 404)
+            elif scope['method'] not in route[0]:
+                endpoint = route[1]
+                result = _json({"success": False, "error": "Method not allowed"}, 405)
+            else:
+                _, endpoint, handler, blocking = route
+                request = Request(scope, await self._read_body(receive))
+                if blocking and profiler.armed:
+                    # Captured on the executor thread, where parsing, inference and serialization run
+                    result = await self.run_blocking(profiler.run, endpoint, handler, request)
+                elif blocking:
+                    result = await self.run_blocking(handler, request)
+                else:
+                    result = handler(request)
+            
+            status, headers, body = result
+            elapsed = time.perf_counter() - start_time
+            headers['Server-Timing'] = metrics.format_server_timing(metrics.pop_request_timings(), elapsed)
+            await self._send(send, status, headers, body)
+        
+        except Exception as e:
+            logger.error(f"ASGI request error: {e}")
+            status = 500
+            await self._send(send, *_json({"success": False, "error": f"Internal server error: {str(e)}"}, 500))
+        
+        finally:
+            metrics.REQUEST_LATENCY.observe(time.perf_counter() - start_time, endpoint)
+            metrics.REQUESTS.inc(endpoint, str(status))
+            metrics.REQUESTS_IN_FLIGHT.dec()
+    
+    async def _read_body(self, receive: Callable) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
+    
+    async def _send(self, send: Callable, status: int, headers: Dict[str, str], body: bytes) -> None:
+        headers = dict(headers, **{'Content-Length': str(len(body))})
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+    
+    # Handlers. Those flagged to run on the executor may block.
+    
+    def health_check(self, request: Request) -> HandlerResult:
+        return _json({
+            "status": "healthy",
+            "model_loaded": model_loaded(),
+            "ready": readiness.ready,
+            "service": "cyber_sentinel"
+        })
+    
+    def liveness_check(self, request: Request) -> HandlerResult:
+        return _json({"status": "alive", "service": "cyber_sentinel"})
+    
+    def readiness_check(self, request: Request) -> HandlerResult:
+        state = readiness.to_dict()
+        return _json({"status": state["state"], "model_loaded": model_loaded(), **state}, 200 if state["ready"] else 503)
+    
+    def get_metrics(self, request: Request) -> HandlerResult:
+        return 200, {'Content-Type': 'text/plain; version=0.0.4'}, metrics.render_metrics().encode('utf-8')
+    
+    def get_model_info(self, request: Request) -> HandlerResult:
+        try:
+            with lease_prediction_service(*request.model_selection()) as service:
+                return _json(service.get_model_capabilities())
+        except UnknownModelError as e:
+            return _json({"success": False, "error": str(e)}, 404)
+    
+    def feature_monitoring(self, request: Request) -> HandlerResult:
+        try:
+            with lease_prediction_service(*request.model_selection()) as service:
+                return _json(service.get_monitoring_stats())
+        except UnknownModelError as e:
+            return _json({"success": False, "error": str(e)}, 404)
+    
+    def list_models(self, request: Request) -> HandlerResult:
+        return _json(get_model_registry().get_stats())
+    
+    def deploy_model(self, request: Request, name: str) -> HandlerResult:
+        try:
+            data = json.loads(request.body) if request.body else {}
+        except json.JSONDecodeError:
+            data = {}
+        payload, status = deploy_model_version(name, data if isinstance(data, dict) else {})
+        return _json(payload, status)
+    
+    def profile_capture(self, request: Request) -> HandlerResult:
+        if not is_admin(request.headers.get('x-admin-token')):
+            return _json({"success": False, "error": "Admin token required"}, 403)
+        if request.method == 'GET':
+            return _json(profiler.get_status())
+        
+        try:
+            data = json.loads(request.body) if request.body else {}
+        except json.JSONDecodeError:
+            data = {}
+        return _json(*arm_profiler(data))
+    
+    def get_stats(self, request: Request) -> HandlerResult:
+        from app.utils.model_utils import get_process_memory
+        
+        return _json({
+            **serving_stats(),
+            "models": get_model_registry().get_stats(),
+            "admission": self.admission.get_stats(),
+            "memory": get_process_memory(),
+            "device": device_info()
+        })
+    
+    def get_example(self, request: Request) -> HandlerResult:
+        with lease_prediction_service() as service:
+            model_info = service.get_model_capabilities()
+        input_size = model_info['model_info'].get('input_size', 'unknown')
+        width = input_size if isinstance(input_size, int) else 10
+        
+        return _json({
+            "description": "Example input format for the model",
+            "input_size": input_size,
+            "single_prediction": {"input": [0.1] * width},
+            "batch_prediction": {"inputs": [[0.1] * width, [0.2] * width]}
+        })
+    
+    def predict(self, request: Request) -> HandlerResult:
+        return self._predict(request, 'input', 'prediction', "No input data provided. Use 'input' key.", batch=False)
+    
+    def batch_predict(self, request: Request) -> HandlerResult:
+        return self._predict(request, 'inputs', 'predictions',
+                             "No input data provided. Use 'inputs' key for batch processing.", batch=True)
+    
+    def _predict(self, request: Request, key: str, result_key: str, missing_error: str, batch: bool) -> HandlerResult:
+        """Shared body of the single and batch prediction endpoints, as in the Flask routes"""
+        try:
+            with stage('parse'):
+                input_data = self._read_input(request, key)
+        except ValueError as e:
+            return _json({"success": False, "error": f"Invalid request body: {str(e)}"}, 400)
+        
+        if input_data is None:
+            return _json({"success": False, "error": missing_error}, 400)
+        if batch and not isinstance(input_data, (list, np.ndarray)):
+            return _json({"success": False, "error": "Batch data must be a list of inputs"}, 400)
+        
+        try:
+            postprocess = postprocessing.parse_options(request.args)
+        except ValueError as e:
+            return _json({"success": False, "error": str(e)}, 400)
+        
+        response_format = self._response_format(request)
+        as_numpy = wire_formats.is_binary(response_format)
+        try:
+            with self.admission.admit(request.client_id(), rows=len(input_data) if batch else 1):
+                with get_model_registry().lease(*request.model_selection()) as service:
+                    if batch:
+                        result = service.batch_predict(input_data, as_numpy=as_numpy, postprocess=postprocess)
+                    else:
+                        result = service.predict(input_data, as_numpy=as_numpy, postprocess=postprocess)
+        except AdmissionRejected as e:
+            return _rejected(e)
+        except UnknownModelError as e:
+            return _json({"success": False, "error": str(e)}, 404)
+        
+        if not result['success']:
+            return _json(result, 500)
+        
+        with stage('serialize'):
+            if as_numpy:
+                try:
+                    body, headers = wire_formats.encode_result(result, result_key, response_format)
+                except wire_formats.RowErrorsTooLarge as e:
+                    return _json({"success": False, "error": str(e), "errors": result.get("errors")}, 422)
+                return 200, dict(headers, **{'Content-Type': response_format}), body
+            return _json(result)
+    
+    def _read_input(self, request: Request, key: str) -> Any:
+        """Decode the request body; None when the expected key is missing"""
+        request_format = wire_formats.normalize_mimetype(request.mimetype)
+        if wire_formats.is_binary(request_format):
+            return wire_formats.decode_body(
+                request.body, request_format, key,
+                shape_header=request.headers.get(wire_formats.SHAPE_HEADER.lower())
+            )
+        
+        try:
+            data = json.loads(request.body) if request.body else None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Malformed JSON: {e}")
+        if not isinstance(data, dict) or key not in data:
+            return None
+        return data[key]
+    
+    def _response_format(self, request: Request) -> str:
+        """Pick the response encoding from the Accept header, defaulting to the request format"""
+        request_format = wire_formats.normalize_mimetype(request.mimetype)
+        if request_format not in wire_formats.SUPPORTED_FORMATS:
+            request_format = wire_formats.JSON
+        
+        offered = [request_format] + [
+            mimetype for mimetype in wire_formats.SUPPORTED_FORMATS if mimetype != request_format
+        ] + list(wire_formats.MIMETYPE_ALIASES)
+        accept = request.accept_mimetypes
+        best = accept.best_match(offered) if accept else None
+        
+        return wire_formats.normalize_mimetype(best or request_format)
+    
+    async def _stream_predict(self, request: Request, receive: Callable, send: Callable) -> int:
+        """Stream NDJSON or frame records through the model, reading and writing as it goes"""
+        request_format = wire_formats.normalize_mimetype(request.mimetype)
+        if request_format not in wire_formats.STREAM_FORMATS:
+            await self._send(send, *_json({
+                "success": False,
+                "error": f"Streaming requires one of: {', '.join(wire_formats.STREAM_FORMATS)}"
+            }, 415))
+            return 415
+        
+        try:
+            # The first call builds the registry, which hashes the model files
+            model_name, model_version = await self.run_blocking(
+                lambda: get_model_registry().resolve(*request.model_selection())
+            )
+        except UnknownModelError as e:
+            await self._send(send, *_json({"success": False, "error": str(e)}, 404))
+            return 404
+        
+        try:
+            postprocess = postprocessing.parse_options(request.args)
+        except ValueError as e:
+            await self._send(send, *_json({"success": False, "error": str(e)}, 400))
+            return 400
+        
+        chunk_size = request.query_int('chunk_size', Config.STREAM_CHUNK_SIZE)
+        chunk_size = max(1, min(chunk_size, Config.STREAM_CHUNK_SIZE * 16))
+        
+        # A stream holds up to one chunk of rows in flight for as long as it runs
+        try:
+            self.admission.acquire(request.client_id(), rows=chunk_size)
+        except AdmissionRejected as e:
+            await self._send(send, *_rejected(e))
+            return e.status
+        
+        if request_format == wire_formats.FRAMES:
+            reader = wire_formats.FrameRecordReader(Config.STREAM_MAX_RECORD_BYTES)
+            encode_chunk = wire_formats.encode_frames_chunk
+        else:
+            reader = wire_formats.NdjsonRecordReader(Config.STREAM_MAX_RECORD_BYTES)
+            encode_chunk = wire_formats.encode_ndjson_chunk
+        
+        try:
+            lease = get_model_registry().lease(model_name, model_version)
+            service = await self.run_blocking(lease.__enter__)
+            try:
+                await send({
+                    'type': 'http.response.start',
+                    'status': 200,
+                    'headers': [(b'content-type', request_format.encode('latin-1'))]
+                })
+                
+                def score(records: list, offset: int) -> bytes:
+                    rows = [reader.decode(record) for record in records]
+                    chunk = next(service.stream_predict(rows, len(rows), postprocess=postprocess, offset=offset))
+                    return encode_chunk(chunk)
+                
+                # Records are read and split here on the loop; only whole chunks go to the pool
+                try:
+                    records = []
+                    offset = 0
+                    more_body = True
+                    while more_body or records:
+                        if more_body and len(records) < chunk_size:
+                            message = await receive()
+                            if message['type'] == 'http.request':
+                                records += reader.feed(message.get('body', b''))
+                                more_body = message.get('more_body', False)
+                            else:
+                                more_body = False
+                            if not more_body:
+                                records += reader.close()
+                            continue
+                        
+                        chunk, records = records[:chunk_size], records[chunk_size:]
+                        body = await self.run_blocking(score, chunk, offset)
+                        offset += len(chunk)
+                        await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+                except Exception as e:
+                    # Headers are already sent, so the failure can only be reported in-band
+                    logger.error(f"Streaming prediction error: {e}")
+                    if request_format == wire_formats.NDJSON:
+                        error = json.dumps({"error": f"Internal server error: {str(e)}"}) + '\n'
+                        await send({'type': 'http.response.body', 'body': error.encode('utf-8'), 'more_body': True})
+                
+                await send({'type': 'http.response.body', 'body': b''})
+                return 200
+            finally:
+                await self.run_blocking(lease.__exit__, None, None, None)
+        finally:
+            self.admission.release(rows=chunk_size)
+
+def create_asgi_app() -> AsgiApp:
+    """Build the ASGI app from Config"""
+    # Health checks are answered on the event loop, so no worker threads need reserving
+    options = dict(Config.admission_options(), max_concurrent=0)
+    return AsgiApp(
+        inference_threads=Config.ASGI_INFERENCE_THREADS,
+        max_pending=Config.ASGI_MAX_PENDING,
+        admission=AdmissionController(**options)
+    )
\ No newline at end of file
@@ -0,0 +1,145 @@
+import os
+import logging
+import torch
+import torch.nn as nn
+from typing import Any, Optional
+from app.utils.model_utils import convert_to_onnx
+
+try:
+    import onnxruntime
+except ImportError:  # optional dependency
+    onnxruntime = None
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('eager', 'torchscript', 'compile', 'onnxruntime')
+
+class EagerBackend:
+    """Plain PyTorch forward pass"""
+    name = 'eager'
+    
+    def __init__(self, model: nn.Module):
+        self.model = model
+    
+    def __call__(self, input_tensor: torch.Tensor) -> torch.Tensor:
+        return self.model(input_tensor)
+
+class TorchScriptBackend:
+    """Traced and frozen TorchScript module, cached on disk"""
+    name = 'torchscript'
+    
+    def __init__(self, model: nn.Module, example: torch.Tensor, artifact_path: str):
+        if os.path.exists(artifact_path):
+            self.module = torch.jit.load(artifact_path, map_location=example.device)
+            logger.info(f"Loaded cached TorchScript module: {artifact_path}")
+        else:
+            with torch.no_grad():
+                traced = torch.jit.trace(model, example)
+                self.module = torch.jit.freeze(traced)
+            _save_atomically(artifact_path, lambda path: torch.jit.save(self.module, path))
+            logger.info(f"Exported TorchScript module: {artifact_path}")
+    
+    def __call__(self, input_tensor: torch.Tensor) -> torch.Tensor:
+        return self.module(input_tensor)
+
+class CompileBackend:
+    """torch.compile'd module; compiled kernels are cached by torch itself"""
+    name = 'compile'
+    
+    def __init__(self, model: nn.Module):
+        if not hasattr(torch, 'compile'):
+            raise RuntimeError("torch.compile requires torch 2.0 or newer")
+        self.module = torch.compile(model)
+    
+    def __call__(self, input_tensor: torch.Tensor) -> torch.Tensor:
+        return self.module(input_tensor)
+
+class OnnxRuntimeBackend:
+    """ONNX Runtime CPU session over an exported model, cached on disk"""
+    name = 'onnxruntime'
+    
+    def __init__(self, model: nn.Module, input_size: int, artifact_path: str):
+        if onnxruntime is None:
+            raise RuntimeError("The onnxruntime backend requires the 'onnxruntime' package")
+        
+        if os.path.exists(artifact_path):
+            logger.info(f"Using cached ONNX model: {artifact_path}")
+        else:
+            if not _save_atomically(artifact_path, lambda path: convert_to_onnx(model, input_size, path)):
+                raise RuntimeError("ONNX export failed")
+        
+        self.session = onnxruntime.InferenceSession(artifact_path, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+    
+    def __call__(self, input_tensor: torch.Tensor) -> torch.Tensor:
+        output = self.session.run(None, {self.input_name: input_tensor.detach().cpu().numpy()})[0]
+        return torch.from_numpy(output)
+
+def _save_atomically(path: str, save_fn) -> Any:
+    """Write an artifact under a temporary name and move it into place"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        result = save_fn(tmp_path)
+        if result is not False and os.path.exists(tmp_path):
+            os.replace(tmp_path, path)
+        return result
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def create_backend(name: str, model: nn.Module, input_size: Any, device: torch.device,
+                   artifact_key: Optional[str], artifact_dir: str = 'models/.cache',
+                   tolerance: float = 1e-4):
+    """Build an inference backend and check it against eager on a random batch
+    
+    Exported artifacts are cached in artifact_dir under artifact_key, which
+    names the model version and precision, so later restarts with the same
+    model file and precision skip the export. If the backend
+    can't be built or disagrees with eager by more than tolerance, the eager
+    backend is returned instead.
+    """
+    eager = EagerBackend(model)
+    if name == 'eager':
+        return eager
+    if name not in BACKENDS:
+        logger.error(f"Unknown backend '{name}', expected one of {BACKENDS}; using eager")
+        return eager
+    if not isinstance(input_size, int):
+        logger.error(f"Backend '{name}' needs a known input size; using eager")
+        return eager
+    if name == 'onnxruntime' and device.type != 'cpu':
+        logger.error("The onnxruntime backend only runs on CPU; using eager")
+        return eager
+    
+    example = torch.randn(8, input_size, device=device)
+    artifact_stem = os.path.join(artifact_dir, artifact_key or 'unversioned')
+    
+    try:
+        if name == 'torchscript':
+            backend = TorchScriptBackend(model, example, artifact_stem + '.torchscript.pt')
+        elif name == 'compile':
+            backend = CompileBackend(model)
+        else:
+            backend = OnnxRuntimeBackend(model, input_size, artifact_stem + '.onnx')
+        
+        with torch.no_grad():
+            expected = eager(example).cpu()
+            actual = backend(example).cpu()
+        if expected.shape != actual.shape:
+            logger.error(f"Backend '{name}' output shape {tuple(actual.shape)} differs from eager "
+                         f"{tuple(expected.shape)}; using eager")
+            return eager
+        
+        max_diff = (expected - actual).abs().max().item() if expected.numel() else 0.0
+        if max_diff > tolerance:
+            logger.error(f"Backend '{name}' disagrees with eager (max abs diff {max_diff:.3g} > {tolerance}); "
+                         f"using eager")
+            return eager
+        
+        logger.info(f"Using '{name}' backend (max abs diff vs eager: {max_diff:.3g})")
+        return backend
+    
+    except Exception as e:
+        logger.error(f"Failed to build '{name}' backend: {e}; using eager")
+        return eager
\ No newline at end of file
@@ -1,23 +1,73 @@
 import torch
 import torch.nn as nn
+import os
 import logging
+import time
+import numpy as np
 from typing import Dict, Any, Optional
+from app.models.backends import create_backend
+from app.models.precision import build_precision_model, precision_report
+from app.utils.feature_scaling import FeatureScaler, fold_into_linear
+from app.utils.file_utils import file_hash
+from app.utils.model_utils import (get_process_memory, load_pickled_model, mmap_unavailable_reason,
+                                   optimize_model_performance)
+from app.utils import metrics
+from app.utils.metrics import stage
 
 logger = logging.getLogger(__name__)
 
+# 'standard' unpickles weights into private memory; 'mmap' maps them from the
+# file so preforked workers share the same physical pages
+LOAD_MODES = ('standard', 'mmap')
+
 class CyberSentinelModel:
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, load_mode: str = 'standard', backend: str = 'eager',
+                 backend_options: Optional[Dict[str, Any]] = None, precision: str = 'fp32',
+                 precision_reference: Optional[str] = None, scaler_path: Optional[str] = None,
+                 fold_scaler: bool = True):
+        if load_mode not in LOAD_MODES:
+            raise ValueError(f"Unknown load mode '{load_mode}', expected one of {LOAD_MODES}")
+        
         self.model_path = model_path
+        self.load_mode = load_mode
+        self.load_time = None
+        self.backend_name = backend
+        self.backend_options = backend_options or {}
+        self.backend = None
+        self.precision = precision
+        self.precision_reference = precision_reference
+        self.precision_report = None
+        self.scaler_path = scaler_path
+        self.fold_scaler = fold_scaler
+        self.scaler = None
+        self.scaler_folded = False
+        self.inference_model = None
         self.model = None
+        self.model_version = None
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.load_model()
     
     def load_model(self) -> None:
         """Load the Cyber Sentinel model from file"""
         try:
-            self.model = torch.load(self.model_path, map_location=self.device)
-            self.model.eval()
-            logger.info(f"Model loaded successfully on {self.device}")
+            start_time = time.perf_counter()
+            self.model = optimize_model_performance(self._load_weights())
+            self.model_version = file_hash(self.model_path)[:16]
+            self._apply_scaler()
+            self.inference_model = self._build_precision_model()
+            self.backend = create_backend(
+                self.backend_name,
+                self.inference_model,
+                self.get_model_info().get('input_size'),
+                self.device,
+                f"{self.model_version}.{self.precision}",
+                artifact_dir=self.backend_options.get('artifact_dir', 'models/.cache'),
+                tolerance=self.backend_options.get('tolerance', 1e-4)
+            )
+            self.load_time = time.perf_counter() - start_time
+            logger.info(f"Model loaded successfully on {self.device} (version {self.model_version})")
+            logger.info(f"Load mode: {self.load_mode}, load time: {self.load_time:.3f}s, "
+                        f"memory: {get_process_memory()}")
             
             # Log model information
             self._log_model_info()
@@ -26,6 +76,77 @@ class CyberSentinelModel:
             logger.error(f"Failed to load model: {e}")
             raise
     
+    def _load_weights(self) -> nn.Module:
+        """Load the pickled model, memory-mapping its tensors in 'mmap' mode"""
+        if self.load_mode == 'mmap':
+            reason = mmap_unavailable_reason(self.model_path)
+            if reason is None:
+                return load_pickled_model(self.model_path, map_location=self.device, mmap=True)
+            logger.warning(f"Memory-mapped load unavailable ({reason}); falling back to a standard load")
+        
+        return load_pickled_model(self.model_path, map_location=self.device)
+    
+    def _apply_scaler(self) -> None:
+        """Load the fitted feature scaler and fold it into the first layer when possible"""
+        self.scaler = None
+        self.scaler_folded = False
+        if not self.scaler_path:
+            return
+        if not os.path.exists(self.scaler_path):
+            logger.warning(f"Feature normalization is enabled but {self.scaler_path} does not exist "
+                           f"(fit it with 'python main.py fit-scaler'); serving unnormalized inputs")
+            return
+        
+        scaler = FeatureScaler.load(self.scaler_path)
+        input_size = self.get_model_info().get('input_size')
+        if isinstance(input_size, int) and scaler.num_features != input_size:
+            raise ValueError(f"Feature scaler has {scaler.num_features} features, model expects {input_size}")
+        
+        self.scaler = scaler
+        # Exported and quantized artifacts include the scaling, so version them with it
+        self.model_version = f"{self.model_version[:8]}{scaler.digest()[:8]}"
+        if self.fold_scaler:
+            self.scaler_folded = fold_into_linear(self.model, scaler)
+        
+        logger.info(f"Feature scaler loaded from {self.scaler_path} "
+                    f"({'folded into the first layer' if self.scaler_folded else 'applied per batch'})")
+    
+    def _scale_input(self, input_tensor: torch.Tensor) -> torch.Tensor:
+        """Standardize raw inputs unless the scaler is already folded into the weights"""
+        if self.scaler is None or self.scaler_folded:
+            return input_tensor
+        return self.scaler.transform_tensor(input_tensor)
+    
+    def _build_precision_model(self) -> nn.Module:
+        """Build the fp32/bf16/int8 inference model and report its accuracy against fp32"""
+        self.precision_report = None
+        if self.precision == 'fp32':
+            return self.model
+        
+        artifact_dir = self.backend_options.get('artifact_dir', 'models/.cache')
+        reduced = build_precision_model(
+            self.model,
+            self.precision,
+            self.device,
+            artifact_path=os.path.join(artifact_dir, f"{self.model_version}.{self.precision}.pt")
+        )
+        
+        input_size = self.get_model_info().get('input_size')
+        if self.precision_reference and os.path.exists(self.precision_reference):
+            reference_inputs = torch.from_numpy(np.load(self.precision_reference).astype(np.float32))
+        elif isinstance(input_size, int):
+            generator = torch.Generator().manual_seed(0)
+            reference_inputs = torch.randn(256, input_size, generator=generator)
+        else:
+            logger.warning("No reference inputs for the precision report")
+            return reduced
+        
+        self.precision_report = precision_report(
+            self.model, reduced, self._scale_input(reference_inputs.to(self.device)), self.precision
+        )
+        logger.info(f"Precision report: {self.precision_report}")
+        return reduced
+    
     def _log_model_info(self) -> None:
         """Log model architecture and parameters"""
         if self.model is None:
@@ -54,17 +175,39 @@ class CyberSentinelModel:
             "input_size": input_size,
             "device": str(self.device),
             "model_type": type(self.model).__name__,
+            "model_version": self.model_version,
+            "load_mode": self.load_mode,
+            "load_time_seconds": self.load_time,
+            "backend": self.backend.name if self.backend is not None else None,
+            "precision": self.precision,
+            "precision_report": self.precision_report,
+            "normalization": {
+                "scaler_path": self.scaler_path,
+                "folded": self.scaler_folded
+            } if self.scaler is not None else None,
             "parameters": sum(p.numel() for p in self.model.parameters())
         }
     
-    def predict(self, input_tensor: torch.Tensor) -> torch.Tensor:
-        """Make prediction with the model"""
+    def predict(self, input_tensor: torch.Tensor, record_metrics: bool = True) -> torch.Tensor:
+        """Make prediction with the model
+        
+        record_metrics=False keeps the pass out of the serving metrics, for
+        models that run beside the served one (e.g. a shadow candidate).
+        """
         if self.model is None:
             raise ValueError("Model not loaded")
         
-        with torch.no_grad():
-            input_tensor = input_tensor.to(self.device)
-            output = self.model(input_tensor)
+        if not record_metrics:
+            with torch.no_grad():
+                return self.backend(self._scale_input(input_tensor.to(self.device))).cpu()
+        
+        rows = input_tensor.shape[0] if input_tensor.dim() > 1 else 1
+        metrics.FORWARD_BATCH_SIZE.observe(rows)
+        metrics.ROWS_SCORED.inc(amount=rows)
+        
+        with torch.no_grad(), stage('forward'):
+            input_tensor = self._scale_input(input_tensor.to(self.device))
+            output = self.backend(input_tensor)
             return output.cpu()
     
     def predict_batch(self, input_batch: torch.Tensor) -> torch.Tensor:
@@ -0,0 +1,109 @@
+import os
+import copy
+import time
+import logging
+import torch
+import torch.nn as nn
+from typing import Any, Dict, Optional
+from app.utils.model_utils import calculate_model_size, load_pickled_model
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ('fp32', 'bf16', 'int8-dynamic')
+
+try:
+    from torch.ao.quantization import quantize_dynamic
+except ImportError:  # torch < 1.10
+    from torch.quantization import quantize_dynamic
+
+class CastingModule(nn.Module):
+    """Run a reduced-precision module behind a float32 interface"""
+    
+    def __init__(self, module: nn.Module, dtype: torch.dtype):
+        super().__init__()
+        self.module = module
+        self.dtype = dtype
+    
+    def forward(self, input_tensor: torch.Tensor) -> torch.Tensor:
+        return self.module(input_tensor.to(self.dtype)).float()
+
+def build_precision_model(model: nn.Module, precision: str, device: torch.device,
+                          artifact_path: Optional[str] = None) -> nn.Module:
+    """Convert an fp32 model to the requested precision
+    
+    int8-dynamic quantizes the Linear layers with torch.ao dynamic
+    quantization (CPU only) and is cached at artifact_path when given.
+    bf16 keeps a bfloat16 copy of the weights. Both take and return float32.
+    """
+    if precision == 'fp32':
+        return model
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+    
+    if precision == 'bf16':
+        reduced = _copy_module(model).to(dtype=torch.bfloat16)
+        return CastingModule(reduced, torch.bfloat16).eval()
+    
+    if device.type != 'cpu':
+        raise ValueError("int8-dynamic quantization only runs on CPU")
+    
+    if artifact_path and os.path.exists(artifact_path):
+        logger.info(f"Loaded cached int8 model: {artifact_path}")
+        return load_pickled_model(artifact_path, map_location=device).eval()
+    
+    quantized = quantize_dynamic(_copy_module(model), {nn.Linear}, dtype=torch.qint8).eval()
+    if artifact_path:
+        os.makedirs(os.path.dirname(artifact_path) or '.', exist_ok=True)
+        tmp_path = f"{artifact_path}.{os.getpid()}.tmp"
+        torch.save(quantized, tmp_path)
+        os.replace(tmp_path, artifact_path)
+        logger.info(f"Saved int8 model: {artifact_path}")
+    
+    return quantized
+
+def _copy_module(model: nn.Module) -> nn.Module:
+    """Deep-copy a module so conversions leave the fp32 original untouched"""
+    return copy.deepcopy(model)
+
+def precision_report(reference: nn.Module, candidate: nn.Module, inputs: torch.Tensor,
+                     precision: str, timing_runs: int = 20) -> Dict[str, Any]:
+    """Compare a reduced-precision model with fp32 on a reference input set
+    
+    Reports the max abs difference, argmax agreement, size saved and the
+    forward-pass speedup on the same inputs.
+    """
+    with torch.no_grad():
+        expected = reference(inputs).float()
+        actual = candidate(inputs).float()
+        
+        reference_time = _time_forward(reference, inputs, timing_runs)
+        candidate_time = _time_forward(candidate, inputs, timing_runs)
+    
+    if expected.dim() > 1 and expected.shape[-1] > 1:
+        agreement = (expected.argmax(dim=-1) == actual.argmax(dim=-1)).float().mean().item()
+    else:
+        agreement = ((expected > 0.5) == (actual > 0.5)).float().mean().item()
+    
+    fp32_size = calculate_model_size(reference)['total_mb']
+    size = calculate_model_size(candidate)['total_mb']
+    
+    return {
+        "precision": precision,
+        "reference_rows": int(inputs.shape[0]),
+        "max_abs_diff": (expected - actual).abs().max().item() if expected.numel() else 0.0,
+        "argmax_agreement": agreement,
+        "fp32_size_mb": fp32_size,
+        "size_mb": size,
+        "size_saved_mb": fp32_size - size,
+        "fp32_forward_ms": reference_time * 1000,
+        "forward_ms": candidate_time * 1000,
+        "speedup": reference_time / candidate_time if candidate_time > 0 else None
+    }
+
+def _time_forward(model: nn.Module, inputs: torch.Tensor, runs: int) -> float:
+    """Mean seconds per forward pass after one warm-up run"""
+    model(inputs)
+    start_time = time.perf_counter()
+    for _ in range(runs):
+        model(inputs)
+    return (time.perf_counter() - start_time) / max(1, runs)
\ No newline at end of file
@@ -0,0 +1,172 @@
+import math
+import re
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+RATE_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+# Weight of the newest request in the per-row cost estimate
+COST_SMOOTHING = 0.2
+
+def parse_rate_limit(limit: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Parse a limit like '100 per hour' (or '100/hour') into (tokens per second, bucket size)"""
+    if not limit:
+        return None
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*(?:per|/)\s*(second|minute|hour|day)s?\s*', str(limit).lower())
+    if match is None:
+        raise ValueError(f"Invalid rate limit '{limit}', expected e.g. '100 per hour'")
+    
+    count = float(match.group(1))
+    return count / RATE_PERIODS[match.group(2)], count
+
+class AdmissionRejected(Exception):
+    """A request was turned away; status is 429 or 503 and retry_after is in whole seconds"""
+    
+    def __init__(self, message: str, status: int, retry_after: float, reason: str):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+        self.reason = reason
+
+class TokenBucket:
+    """Refills at rate tokens per second up to capacity"""
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+    
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+    
+    def take(self, now: float, amount: float = 1.0) -> float:
+        """Take tokens if there are enough; otherwise return the seconds until there will be"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+class AdmissionController:
+    """Decides, before any inference, whether a prediction request is served
+    
+    Requests are shed with 503 when the worker already has max_concurrent
+    requests or max_inflight_rows rows in flight, or when the estimated wait
+    for the rows ahead of them exceeds latency_slo_ms. Clients over their
+    token-bucket rate limit get 429. Both carry a Retry-After estimate.
+    
+    The wait estimate is the rows in flight times a smoothed per-row cost
+    measured from completed requests, so it adapts to the model and machine.
+    A zero or missing limit disables that check.
+    """
+    
+    def __init__(self, rate_limit: Optional[str] = None, burst: float = 0, max_inflight_rows: int = 0,
+                 max_concurrent: int = 0, latency_slo_ms: float = 0, max_clients: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        rate = parse_rate_limit(rate_limit)
+        self.rate, self.burst = (rate[0], float(burst or rate[1])) if rate else (0.0, 0.0)
+        self.max_inflight_rows = max_inflight_rows
+        self.max_concurrent = max_concurrent
+        self.latency_slo = latency_slo_ms / 1000.0
+        self.max_clients = max_clients
+        self.clock = clock
+        
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.inflight_requests = 0
+        self.inflight_rows = 0
+        self.row_seconds: Optional[float] = None
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+    
+    @contextmanager
+    def admit(self, client: str, rows: int = 1) -> Iterator[None]:
+        """Hold an admission slot for rows rows while the block runs, or raise AdmissionRejected"""
+        self.acquire(client, rows)
+        start_time = self.clock()
+        try:
+            yield
+        finally:
+            self.release(rows, self.clock() - start_time)
+    
+    def acquire(self, client: str, rows: int = 1) -> None:
+        """Admit a request or raise AdmissionRejected; every acquire needs a matching release"""
+        with self._lock:
+            now = self.clock()
+            estimated_wait = self.inflight_rows * (self.row_seconds or 0.0)
+            
+            # Overload is checked first, so shed requests don't spend the client's tokens
+            if self.max_concurrent and self.inflight_requests >= self.max_concurrent:
+                self._reject("Server busy: too many requests in flight", 503, estimated_wait, 'concurrency')
+            if self.max_inflight_rows and self.inflight_rows and self.inflight_rows + rows > self.max_inflight_rows:
+                self._reject(f"Server busy: {self.inflight_rows} rows in flight", 503, estimated_wait, 'queue_full')
+            if self.latency_slo and estimated_wait > self.latency_slo:
+                self._reject(f"Server busy: estimated wait {estimated_wait * 1000:.0f}ms exceeds "
+                             f"the {self.latency_slo * 1000:.0f}ms latency target",
+                             503, estimated_wait - self.latency_slo, 'latency_slo')
+            
+            if self.rate:
+                wait = self._bucket(client, now).take(now)
+                if wait:
+                    self._reject("Rate limit exceeded", 429, wait, 'rate_limited')
+            
+            self.inflight_requests += 1
+            self.inflight_rows += rows
+            self.admitted += 1
+            metrics.ADMITTED_ROWS_IN_FLIGHT.set(self.inflight_rows)
+    
+    def release(self, rows: int = 1, elapsed: Optional[float] = None) -> None:
+        """Release an admitted request; elapsed (seconds) updates the per-row cost estimate"""
+        with self._lock:
+            self.inflight_requests -= 1
+            self.inflight_rows -= rows
+            metrics.ADMITTED_ROWS_IN_FLIGHT.set(self.inflight_rows)
+            
+            if elapsed is not None and rows > 0:
+                cost = elapsed / rows
+                if self.row_seconds is None:
+                    self.row_seconds = cost
+                else:
+                    self.row_seconds += COST_SMOOTHING * (cost - self.row_seconds)
+    
+    def _bucket(self, client: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, now)
+            # Forget the longest-idle clients so unique addresses can't grow memory without bound
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket
+    
+    def _reject(self, message: str, status: int, retry_after: float, reason: str) -> None:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        metrics.ADMISSION_REJECTED.inc(reason)
+        raise AdmissionRejected(message, status, retry_after, reason)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Current load, limits and admission counters"""
+        with self._lock:
+            return {
+                "inflight_requests": self.inflight_requests,
+                "inflight_rows": self.inflight_rows,
+                "row_cost_ms": self.row_seconds * 1000 if self.row_seconds is not None else None,
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+                "limits": {
+                    "rate_per_second": self.rate or None,
+                    "burst": self.burst or None,
+                    "max_inflight_rows": self.max_inflight_rows or None,
+                    "max_concurrent": self.max_concurrent or None,
+                    "latency_slo_ms": self.latency_slo * 1000 or None
+                },
+                "tracked_clients": len(self._buckets)
+            }
\ No newline at end of file
@@ -0,0 +1,241 @@
+import os
+import re
+import json
+import time
+import logging
+import platform
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from app.services.warmup import percentile
+from app.utils.file_utils import file_hash
+from app.utils.topology import available_cpus
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZES = (1, 4, 16, 32, 64, 128)
+# Forward passes timed per setting even when the budget is nearly spent
+MIN_ITERATIONS = 5
+
+# Profile key -> the Config attribute (and environment variable) it overrides
+PROFILE_SETTINGS = {
+    "backend": "MODEL_BACKEND",
+    "workers": "WORKERS",
+    "intra_op_threads": "TOPOLOGY_INTRA_OP_THREADS",
+    "max_batch_size": "BATCHING_MAX_BATCH_SIZE"
+}
+
+def cpu_model() -> str:
+    """The CPU model name, from /proc/cpuinfo where available"""
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key.strip() in ('model name', 'Hardware', 'cpu model') and value.strip():
+                    return value.strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine() or 'unknown'
+
+def machine_prefix(cpu: str, cpus: int) -> str:
+    """The part of a profile file name that identifies the machine
+    
+    The core count is part of the key: the same CPU model comes in machine
+    sizes whose best settings differ.
+    """
+    slug = re.sub(r'[^a-z0-9]+', '-', cpu.lower()).strip('-') or 'unknown'
+    return f"{slug}-{cpus}cpu-"
+
+def profile_name(cpu: str, cpus: int, model_hash: str) -> str:
+    """Profile file name for a CPU model, core count and model file hash"""
+    return f"{machine_prefix(cpu, cpus)}{model_hash[:16]}.json"
+
+def profile_path(profile_dir: str, model_path: str) -> str:
+    """Where this machine's profile for a model file lives"""
+    return os.path.join(profile_dir, profile_name(cpu_model(), len(available_cpus()), file_hash(model_path)))
+
+def has_machine_profiles(profile_dir: str) -> bool:
+    """Whether any profile was saved for this machine, without hashing a model file"""
+    if not os.path.isdir(profile_dir):
+        return False
+    prefix = machine_prefix(cpu_model(), len(available_cpus()))
+    return any(name.startswith(prefix) and name.endswith('.json') for name in os.listdir(profile_dir))
+
+def default_thread_counts(cpus: int) -> List[int]:
+    """Powers of two up to the core count, and the core count itself"""
+    counts = []
+    threads = 1
+    while threads < cpus:
+        counts.append(threads)
+        threads *= 2
+    counts.append(cpus)
+    return counts
+
+def time_calls(fn: Callable[[], Any], seconds: float, min_iterations: int = MIN_ITERATIONS,
+               clock: Callable[[], float] = time.perf_counter) -> List[float]:
+    """Call fn repeatedly for about seconds (at least min_iterations times) and return each call's duration"""
+    fn()
+    timings = []
+    deadline = clock() + seconds
+    while len(timings) < min_iterations or clock() < deadline:
+        start_time = clock()
+        fn()
+        timings.append(clock() - start_time)
+    return timings
+
+def choose_best(results: Sequence[Dict[str, Any]], cpus: int, latency_slo_ms: float) -> Dict[str, Any]:
+    """The setting with the highest estimated machine throughput whose p99 meets the SLO
+    
+    Each setting was measured in one process. With t intra-op threads the
+    machine runs cpus // t such workers side by side, so machine throughput
+    is estimated as per-worker throughput times that worker count. If
+    nothing meets the SLO, the lowest-latency setting is chosen.
+    """
+    if not results:
+        raise ValueError("No autotune measurements to choose from")
+    
+    within_slo = [result for result in results if result["p99_ms"] <= latency_slo_ms]
+    if within_slo:
+        best = max(within_slo, key=lambda r: (r["rows_per_second"] * max(1, cpus // r["threads"]), -r["p99_ms"]))
+    else:
+        best = min(results, key=lambda r: r["p99_ms"])
+    
+    workers = max(1, cpus // best["threads"])
+    return {
+        "backend": best["backend"],
+        "workers": workers,
+        "intra_op_threads": best["threads"],
+        "max_batch_size": best["batch_size"],
+        "p99_ms": best["p99_ms"],
+        "estimated_rows_per_second": best["rows_per_second"] * workers,
+        "meets_slo": bool(within_slo)
+    }
+
+def autotune(model_path: str, budget_seconds: float = 120.0, backends: Sequence[str] = ('eager',),
+             thread_counts: Optional[Sequence[int]] = None, batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+             latency_slo_ms: float = 50.0, model_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Sweep backend, torch thread count and batch size against a model on this machine
+    
+    Every (backend, threads, batch size) setting gets an equal share of
+    what is left of the budget, including time spent building backends;
+    settings the budget doesn't reach are skipped and the profile is marked
+    incomplete. Returns the profile: the best setting and every measurement.
+    """
+    import torch
+    from app.models.cyber_sentinel import CyberSentinelModel
+    
+    cpus = len(available_cpus())
+    thread_counts = list(thread_counts or default_thread_counts(cpus))
+    batch_sizes = list(batch_sizes)
+    model_options = model_options or {}
+    start = time.perf_counter()
+    deadline = start + budget_seconds
+    remaining = len(backends) * len(thread_counts) * len(batch_sizes)
+    original_threads = torch.get_num_threads()
+    results = []
+    
+    try:
+        for backend in backends:
+            model = CyberSentinelModel(model_path, backend=backend, **model_options)
+            if model.backend.name != backend:
+                logger.warning(f"Backend '{backend}' is unavailable for this model; skipping it")
+                remaining -= len(thread_counts) * len(batch_sizes)
+                continue
+            input_size = model.get_model_info().get('input_size')
+            if not isinstance(input_size, int):
+                raise ValueError("Autotuning needs a model with a known input size")
+            generator = torch.Generator().manual_seed(0)
+            
+            for threads in thread_counts:
+                torch.set_num_threads(threads)
+                for batch_size in batch_sizes:
+                    share = (deadline - time.perf_counter()) / remaining
+                    remaining -= 1
+                    if share <= 0:
+                        continue
+                    inputs = torch.randn(batch_size, input_size, generator=generator)
+                    timings = time_calls(lambda: model.predict(inputs, record_metrics=False), share)
+                    mean = sum(timings) / len(timings)
+                    results.append({
+                        "backend": backend,
+                        "threads": threads,
+                        "batch_size": batch_size,
+                        "iterations": len(timings),
+                        "p50_ms": percentile(timings, 50) * 1000.0,
+                        "p99_ms": percentile(timings, 99) * 1000.0,
+                        "rows_per_second": batch_size / mean
+                    })
+                    logger.info(f"Autotune {backend}, {threads} threads, batch {batch_size}: "
+                                f"{results[-1]['rows_per_second']:.0f} rows/s, p99 {results[-1]['p99_ms']:.2f}ms")
+    finally:
+        torch.set_num_threads(original_threads)
+    
+    measured = len(results)
+    planned = len(backends) * len(thread_counts) * len(batch_sizes)
+    return {
+        "cpu_model": cpu_model(),
+        "cpus": cpus,
+        "model_path": model_path,
+        "model_hash": file_hash(model_path),
+        "torch_version": torch.__version__,
+        "created_at": time.time(),
+        "budget_seconds": budget_seconds,
+        "seconds": time.perf_counter() - start,
+        "complete": measured == planned,
+        "latency_slo_ms": latency_slo_ms,
+        "best": choose_best(results, cpus, latency_slo_ms),
+        "results": results
+    }
+
+def save_profile(profile: Dict[str, Any], path: str) -> str:
+    """Write a profile as JSON, replacing any previous file atomically"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved autotune profile: {path}")
+    return path
+
+def apply_profile(config: Any, profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Override Config settings with a profile's best setting; explicit environment variables still win
+    
+    The tuned thread count only takes effect through the worker topology,
+    so that is switched on too (unless TOPOLOGY_ENABLED is set). The tuned
+    batch size only matters to the micro-batcher, so it is left alone while
+    batching is disabled. Returns the settings that were changed.
+    """
+    applied = {}
+    for key, attribute in PROFILE_SETTINGS.items():
+        value = profile["best"].get(key)
+        if value is None or attribute in os.environ:
+            continue
+        if attribute == "BATCHING_MAX_BATCH_SIZE" and not config.BATCHING_ENABLED:
+            logger.info(f"Tuned batch size {value} not applied: micro-batching is disabled")
+            continue
+        setattr(config, attribute, value)
+        applied[attribute] = value
+    if "TOPOLOGY_INTRA_OP_THREADS" in applied and "TOPOLOGY_ENABLED" not in os.environ:
+        config.TOPOLOGY_ENABLED = True
+        applied["TOPOLOGY_ENABLED"] = True
+    return applied
+
+def apply_startup_profile(config: Any) -> Optional[Dict[str, Any]]:
+    """Load this machine's profile for the served model, if one was saved, and apply it to config"""
+    if not config.AUTOTUNE_ENABLED or not os.path.exists(config.MODEL_PATH):
+        return None
+    # Most machines never saved a profile; don't read the whole model file to find that out
+    if not has_machine_profiles(config.AUTOTUNE_PROFILE_DIR):
+        logger.info(f"No autotune profile for this machine in {config.AUTOTUNE_PROFILE_DIR} "
+                    f"(create one with 'python main.py autotune')")
+        return None
+    
+    path = profile_path(config.AUTOTUNE_PROFILE_DIR, config.MODEL_PATH)
+    if not os.path.exists(path):
+        logger.info(f"No autotune profile for this machine and model at {path} "
+                    f"(create one with 'python main.py autotune')")
+        return None
+    
+    with open(path, 'r') as f:
+        profile = json.load(f)
+    applied = apply_profile(config, profile)
+    logger.info(f"Applied autotune profile {path}: {applied}")
+    return applied
\ No newline at end of file
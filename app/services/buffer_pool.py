@@ -0,0 +1,128 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ITEM_BYTES = np.dtype(np.float32).itemsize
+
+def bucket_rows(rows: int) -> int:
+    """Round a row count up to its power-of-two bucket"""
+    return 1 << max(0, int(rows) - 1).bit_length()
+
+class BufferPool:
+    """Reusable contiguous float32 (rows, width) buffers, bucketed by power-of-two row count
+    
+    A lease hands out a C-contiguous view of the first rows rows of a
+    bucket-sized buffer and takes the buffer back when the block exits, so
+    steady traffic reuses the same few buffers instead of allocating per
+    request. The pool never holds more than max_bytes: idle buffers of
+    other shapes are dropped to make room, and when the leased ones alone
+    fill the budget, a plain one-off array is handed out instead.
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 ** 2):
+        self.max_bytes = max(0, int(max_bytes))
+        
+        self._lock = threading.Lock()
+        self._free: Dict[Tuple[int, int], List[np.ndarray]] = {}
+        self._pooled_bytes = 0
+        self._in_use_bytes = 0
+        
+        self.leases = 0
+        self.reuses = 0
+        self.allocations = 0
+        self.overflows = 0
+        self.evictions = 0
+        self.high_water_bytes = 0
+        self.high_water_in_use_bytes = 0
+    
+    @contextmanager
+    def lease(self, rows: int, width: int) -> Iterator[np.ndarray]:
+        """Lend a (rows, width) float32 array for the duration of the block
+        
+        Its contents are undefined, and nothing may keep a reference to it
+        (or a tensor sharing its memory) after the block exits.
+        """
+        buffer, pooled = self._acquire(rows, width)
+        try:
+            yield buffer[:rows]
+        finally:
+            if pooled:
+                self._release(buffer)
+    
+    def _acquire(self, rows: int, width: int) -> Tuple[np.ndarray, bool]:
+        key = (bucket_rows(rows), int(width))
+        nbytes = key[0] * key[1] * ITEM_BYTES
+        
+        with self._lock:
+            self.leases += 1
+            free = self._free.get(key)
+            if free:
+                self.reuses += 1
+                self._mark_in_use_locked(nbytes)
+                return free.pop(), True
+            
+            if self._pooled_bytes + nbytes > self.max_bytes:
+                self._evict_locked(self._pooled_bytes + nbytes - self.max_bytes)
+            if self._pooled_bytes + nbytes > self.max_bytes:
+                self.overflows += 1
+                pooled = False
+            else:
+                self.allocations += 1
+                self._pooled_bytes += nbytes
+                self.high_water_bytes = max(self.high_water_bytes, self._pooled_bytes)
+                self._mark_in_use_locked(nbytes)
+                pooled = True
+        
+        # Allocated outside the lock; only the bookkeeping needs it
+        return np.empty(key if pooled else (rows, width), dtype=np.float32), pooled
+    
+    def _release(self, buffer: np.ndarray) -> None:
+        with self._lock:
+            self._in_use_bytes -= buffer.nbytes
+            self._free.setdefault(buffer.shape, []).append(buffer)
+    
+    def _mark_in_use_locked(self, nbytes: int) -> None:
+        self._in_use_bytes += nbytes
+        self.high_water_in_use_bytes = max(self.high_water_in_use_bytes, self._in_use_bytes)
+    
+    def _evict_locked(self, needed: int) -> None:
+        """Drop idle buffers, largest first, until needed bytes are freed or none are left"""
+        for key in sorted(self._free, key=lambda key: key[0] * key[1], reverse=True):
+            free = self._free[key]
+            while free and needed > 0:
+                buffer = free.pop()
+                self._pooled_bytes -= buffer.nbytes
+                needed -= buffer.nbytes
+                self.evictions += 1
+            if not free:
+                del self._free[key]
+            if needed <= 0:
+                return
+    
+    def clear(self) -> None:
+        """Drop all idle buffers; leased ones are still returned to the pool"""
+        with self._lock:
+            self._evict_locked(self._pooled_bytes)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Lease, reuse and allocation counters plus current and high-water memory"""
+        megabyte = 1024 ** 2
+        with self._lock:
+            return {
+                "leases": self.leases,
+                "reuses": self.reuses,
+                "reuse_ratio": self.reuses / self.leases if self.leases else 0.0,
+                "allocations": self.allocations,
+                "overflows": self.overflows,
+                "evictions": self.evictions,
+                "pooled_mb": self._pooled_bytes / megabyte,
+                "in_use_mb": self._in_use_bytes / megabyte,
+                "high_water_mb": self.high_water_bytes / megabyte,
+                "high_water_in_use_mb": self.high_water_in_use_bytes / megabyte,
+                "max_mb": self.max_bytes / megabyte,
+                "idle_buffers": {f"{rows}x{width}": len(free) for (rows, width), free in sorted(self._free.items())}
+            }
\ No newline at end of file
@@ -0,0 +1,220 @@
+import json
+import logging
+import multiprocessing
+import os
+import time
+import numpy as np
+import torch
+from typing import Dict, Any, Iterator, Optional, Set
+from app.models.cyber_sentinel import CyberSentinelModel
+
+logger = logging.getLogger(__name__)
+
+INPUT_FORMATS = ('npy', 'raw', 'csv')
+
+# Per-process state for pool workers, set up once by _init_worker
+_worker_state: Dict[str, Any] = {}
+
+def detect_format(path: str) -> str:
+    """Guess the input format from the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        return 'npy'
+    elif extension in ('.csv', '.txt'):
+        return 'csv'
+    return 'raw'
+
+def open_input(path: str, input_format: str, num_features: Optional[int] = None) -> np.ndarray:
+    """Memory-map a .npy or raw little-endian float32 input file as an (N, F) array"""
+    if input_format == 'npy':
+        array = np.load(path, mmap_mode='r')
+    elif input_format == 'raw':
+        if not num_features:
+            raise ValueError("Raw float32 input needs --features to know the row width")
+        row_bytes = num_features * 4
+        size = os.path.getsize(path)
+        if size % row_bytes:
+            raise ValueError(f"{path} is {size} bytes, not a whole number of {num_features}-feature rows")
+        array = np.memmap(path, dtype='<f4', mode='r', shape=(size // row_bytes, num_features))
+    else:
+        raise ValueError(f"Cannot memory-map {input_format} input")
+    
+    if array.ndim != 2:
+        raise ValueError(f"Expected a 2-D input, got shape {array.shape}")
+    return array
+
+def iter_csv_chunks(csv_path: str, chunk_rows: int = 65536) -> Iterator[np.ndarray]:
+    """Parse a numeric CSV in (chunk_rows, F) float32 blocks"""
+    with open(csv_path, 'r') as f:
+        lines = []
+        for line in f:
+            if line.strip():
+                lines.append(line)
+            if len(lines) == chunk_rows:
+                yield np.loadtxt(lines, delimiter=',', dtype=np.float32, ndmin=2)
+                lines = []
+        if lines:
+            yield np.loadtxt(lines, delimiter=',', dtype=np.float32, ndmin=2)
+
+def iter_input_chunks(path: str, input_format: str, num_features: Optional[int] = None,
+                      chunk_rows: int = 65536) -> Iterator[np.ndarray]:
+    """Read any supported input file as a stream of row blocks"""
+    if input_format == 'csv':
+        yield from iter_csv_chunks(path, chunk_rows)
+        return
+    
+    inputs = open_input(path, input_format, num_features)
+    for start in range(0, inputs.shape[0], chunk_rows):
+        yield inputs[start:start + chunk_rows]
+
+def csv_to_npy(csv_path: str, npy_path: str, chunk_rows: int = 65536) -> str:
+    """Convert a numeric CSV to .npy in two streaming passes so it can be memory-mapped"""
+    with open(csv_path, 'r') as f:
+        first = f.readline()
+        num_features = len(first.split(','))
+        num_rows = (1 if first.strip() else 0) + sum(1 for line in f if line.strip())
+    
+    # Write to a temporary name so an interrupted conversion is never mistaken for a finished one
+    tmp_path = npy_path + '.tmp'
+    output = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=(num_rows, num_features))
+    row = 0
+    for chunk in iter_csv_chunks(csv_path, chunk_rows):
+        output[row:row + len(chunk)] = chunk
+        row += len(chunk)
+    
+    output.flush()
+    del output
+    os.replace(tmp_path, npy_path)
+    logger.info(f"Converted {csv_path} to {npy_path} ({num_rows} rows x {num_features} features)")
+    return npy_path
+
+def _read_progress(progress_path: str, metadata: Dict[str, Any]) -> Optional[Set[int]]:
+    """Return completed shard ids from a previous run, or None if it can't be resumed"""
+    if not os.path.exists(progress_path):
+        return None
+    
+    with open(progress_path, 'r') as f:
+        lines = f.read().splitlines()
+    if not lines or json.loads(lines[0]) != metadata:
+        return None
+    
+    return {int(line) for line in lines[1:] if line.strip()}
+
+def _init_worker(model_path: str, num_threads: int, input_path: str, input_format: str,
+                 num_features: Optional[int], output_path: str, scaler_path: Optional[str] = None) -> None:
+    """Load the model once per worker process and pin its torch thread count"""
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+    
+    _worker_state['model'] = CyberSentinelModel(model_path, scaler_path=scaler_path)
+    _worker_state['input'] = open_input(input_path, input_format, num_features)
+    _worker_state['output'] = np.load(output_path, mmap_mode='r+')
+
+def _score_shard(shard: int, shard_size: int, batch_size: int) -> int:
+    """Score one shard of rows straight into the output memmap"""
+    model = _worker_state['model']
+    inputs = _worker_state['input']
+    output = _worker_state['output']
+    
+    start = shard * shard_size
+    end = min(start + shard_size, inputs.shape[0])
+    for batch_start in range(start, end, batch_size):
+        batch_end = min(batch_start + batch_size, end)
+        batch = torch.from_numpy(np.ascontiguousarray(inputs[batch_start:batch_end], dtype=np.float32))
+        output[batch_start:batch_end] = model.predict_batch(batch).numpy().reshape(batch_end - batch_start, -1)
+    
+    output.flush()
+    return shard
+
+def score_file(model_path: str, input_path: str, output_path: str,
+               input_format: Optional[str] = None, num_features: Optional[int] = None,
+               workers: Optional[int] = None, threads_per_worker: Optional[int] = None,
+               shard_size: int = 100000, batch_size: int = 4096,
+               scaler_path: Optional[str] = None) -> Dict[str, Any]:
+    """Score every row of an input file into a memory-mapped .npy output
+    
+    Rows are split into shards and scored by a process pool; each worker loads
+    the model once. Completed shards are recorded in <output>.progress so an
+    interrupted run picks up where it stopped when started again. Inputs are
+    standardized with the feature scaler at scaler_path when given.
+    """
+    start_time = time.time()
+    input_format = input_format or detect_format(input_path)
+    if input_format not in INPUT_FORMATS:
+        raise ValueError(f"Unsupported input format: {input_format}")
+    
+    if input_format == 'csv':
+        converted = output_path + '.input.npy'
+        if not os.path.exists(converted):
+            csv_to_npy(input_path, converted)
+        input_path, input_format = converted, 'npy'
+    
+    inputs = open_input(input_path, input_format, num_features)
+    num_rows, num_features = inputs.shape
+    del inputs
+    
+    workers = workers or os.cpu_count() or 1
+    threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    num_shards = (num_rows + shard_size - 1) // shard_size
+    
+    progress_path = output_path + '.progress'
+    metadata = {
+        "input": os.path.abspath(input_path),
+        "rows": num_rows,
+        "features": num_features,
+        "shard_size": shard_size,
+        "model": os.path.abspath(model_path),
+        "scaler": os.path.abspath(scaler_path) if scaler_path else None
+    }
+    completed = _read_progress(progress_path, metadata) if os.path.exists(output_path) else None
+    
+    if completed is None:
+        # Fresh run: probe the output width, then preallocate the whole output file
+        probe = CyberSentinelModel(model_path, scaler_path=scaler_path).predict(torch.zeros(1, num_features))
+        output = np.lib.format.open_memmap(
+            output_path, mode='w+', dtype=np.float32, shape=(num_rows, int(np.prod(probe.shape[1:])))
+        )
+        del output, probe
+        with open(progress_path, 'w') as f:
+            f.write(json.dumps(metadata) + '\n')
+        completed = set()
+    else:
+        logger.info(f"Resuming: {len(completed)} of {num_shards} shards already scored")
+    
+    pending = [shard for shard in range(num_shards) if shard not in completed]
+    logger.info(f"Scoring {num_rows} rows in {len(pending)} shards with {workers} workers "
+                f"x {threads_per_worker} threads")
+    
+    if pending:
+        # spawn, not fork: forking after torch has started its thread pools can deadlock
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(
+            processes=min(workers, len(pending)),
+            initializer=_init_worker,
+            initargs=(model_path, threads_per_worker, input_path, input_format, num_features, output_path,
+                      scaler_path)
+        ) as pool, open(progress_path, 'a') as progress:
+            tasks = [(shard, shard_size, batch_size) for shard in pending]
+            for done, shard in enumerate(pool.imap_unordered(_score_shard_task, tasks), 1):
+                progress.write(f"{shard}\n")
+                progress.flush()
+                os.fsync(progress.fileno())
+                logger.info(f"Shard {shard} done ({done}/{len(pending)})")
+    
+    elapsed = time.time() - start_time
+    logger.info(f"Scored {num_rows} rows in {elapsed:.1f}s")
+    return {
+        "rows": num_rows,
+        "shards": num_shards,
+        "shards_scored": len(pending),
+        "output": output_path,
+        "elapsed_seconds": elapsed,
+        "rows_per_second": num_rows / elapsed if elapsed > 0 else 0.0
+    }
+
+def _score_shard_task(task) -> int:
+    """imap_unordered adapter for _score_shard"""
+    return _score_shard(*task)
\ No newline at end of file
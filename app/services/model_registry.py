@@ -0,0 +1,290 @@
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from app.utils.file_utils import file_hash
+
+logger = logging.getLogger(__name__)
+
+class UnknownModelError(LookupError):
+    """The requested model name or version isn't registered"""
+
+class _Entry:
+    """A resident (loaded) model version"""
+    __slots__ = ('name', 'version', 'service', 'size_mb', 'leases', 'last_used', 'retired')
+    
+    def __init__(self, name: str, version: str, service: Any, size_mb: float):
+        self.name = name
+        self.version = version
+        self.service = service
+        self.size_mb = size_mb
+        self.leases = 0
+        self.last_used = time.time()
+        self.retired = False
+
+class ModelRegistry:
+    """Named, versioned prediction services with hot-swap and LRU eviction
+    
+    Each model name has one active version that requests get by default;
+    any registered version can also be asked for explicitly. Versions are
+    loaded on first use, or ahead of time by deploy(), which loads and warms
+    the new version in the background and then switches the active version
+    in one step. Requests lease the service they use, so a version that is
+    swapped out or evicted is only closed once its last request finishes;
+    a swapped-out version asked for by name afterwards is loaded again.
+    Versions added in memory with add() can't be reloaded and stay resident
+    across swaps.
+    
+    With a memory budget, the least recently used versions are evicted when
+    the loaded models outgrow it; evicted versions reload on their next use.
+    """
+    
+    def __init__(self, service_factory: Callable[[str], Any], memory_budget_mb: float = 0,
+                 default_model: Optional[str] = None):
+        self.service_factory = service_factory
+        self.memory_budget_mb = float(memory_budget_mb or 0)
+        self.default_model = default_model
+        
+        self._lock = threading.Lock()
+        self._paths: Dict[str, Dict[str, Optional[str]]] = {}
+        self._active: Dict[str, str] = {}
+        self._resident: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._loading: Dict[Tuple[str, str], threading.Event] = {}
+        self._deployments: Dict[str, Dict[str, Any]] = {}
+    
+    def register(self, name: str, path: str, version: Optional[str] = None, activate: bool = True) -> str:
+        """Make a model file available under name/version without loading it
+        
+        The version defaults to a hash of the model file.
+        """
+        if version is None:
+            version = file_hash(path)[:16] if os.path.exists(path) else 'latest'
+        
+        with self._lock:
+            self._paths.setdefault(name, {})[version] = path
+            if activate or name not in self._active:
+                self._active[name] = version
+            if self.default_model is None:
+                self.default_model = name
+        
+        logger.info(f"Registered model {name}/{version}: {path}")
+        return version
+    
+    def add(self, name: str, service: Any, version: Optional[str] = None, activate: bool = True) -> str:
+        """Register an already-loaded service, e.g. one built by the caller"""
+        if version is None:
+            version = service.model.model_version or 'latest'
+        entry = _Entry(name, version, service, self._size_of(service))
+        
+        with self._lock:
+            self._paths.setdefault(name, {})[version] = None
+            if activate or name not in self._active:
+                self._active[name] = version
+            if self.default_model is None:
+                self.default_model = name
+            self._resident[(name, version)] = entry
+            evicted = self._evict_locked(keep=(name, version))
+        
+        self._close_all(evicted)
+        return version
+    
+    def resolve(self, name: Optional[str] = None, version: Optional[str] = None) -> Tuple[str, str]:
+        """Resolve an optional name/version to a registered (name, version)"""
+        name = name or self.default_model
+        with self._lock:
+            versions = self._paths.get(name)
+            if versions is None:
+                raise UnknownModelError(f"Unknown model '{name}'")
+            version = version or self._active[name]
+            if version not in versions:
+                raise UnknownModelError(f"Unknown version '{version}' of model '{name}'")
+        return name, version
+    
+    def is_loaded(self, name: Optional[str] = None, version: Optional[str] = None) -> bool:
+        """Whether a registered version is resident, without loading it"""
+        try:
+            key = self.resolve(name, version)
+        except UnknownModelError:
+            return False
+        with self._lock:
+            return key in self._resident
+    
+    @contextmanager
+    def lease(self, name: Optional[str] = None, version: Optional[str] = None) -> Iterator[Any]:
+        """Hold a model version's service for the duration of a request"""
+        entry = self._acquire(*self.resolve(name, version))
+        try:
+            yield entry.service
+        finally:
+            self._release(entry)
+    
+    def deploy(self, name: str, path: str, version: Optional[str] = None) -> str:
+        """Load and warm a new version in the background, then make it the active one
+        
+        Until the swap, requests keep going to the current version; requests
+        already running on it finish there.
+        """
+        version = self.register(name, path, version=version, activate=name not in self._active)
+        with self._lock:
+            self._deployments[name] = {"version": version, "path": path, "state": "loading", "error": None}
+        
+        def run() -> None:
+            try:
+                entry = self._load(name, version)
+                warm_up = getattr(entry.service, 'warm_up', None)
+                if warm_up is not None:
+                    warm_up()
+                with self._lock:
+                    previous = self._active.get(name)
+                    self._active[name] = version
+                    self._deployments[name]["state"] = "active"
+                    retired = self._retire_locked((name, previous)) if previous != version else []
+                logger.info(f"Model {name} switched from version {previous} to {version}")
+                self._close_all(retired)
+            except Exception as e:
+                logger.error(f"Deploying model {name}/{version} failed: {e}")
+                with self._lock:
+                    self._deployments[name].update(state="failed", error=str(e))
+        
+        threading.Thread(target=run, name=f"deploy-{name}", daemon=True).start()
+        return version
+    
+    def _acquire(self, name: str, version: str) -> _Entry:
+        key = (name, version)
+        while True:
+            with self._lock:
+                entry = self._resident.get(key)
+                if entry is not None:
+                    self._resident.move_to_end(key)
+                    entry.leases += 1
+                    entry.last_used = time.time()
+                    return entry
+            self._load(name, version)
+    
+    def _release(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.leases -= 1
+            close = entry.retired and entry.leases == 0
+        if close:
+            self._close(entry)
+    
+    def _load(self, name: str, version: str) -> _Entry:
+        """Load a version unless it's resident; concurrent loads of one version are coalesced"""
+        key = (name, version)
+        with self._lock:
+            entry = self._resident.get(key)
+            if entry is not None:
+                return entry
+            loading = self._loading.get(key)
+            if loading is None:
+                loading = self._loading[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+            path = self._paths[name][version]
+        
+        if not owner:
+            loading.wait()
+            with self._lock:
+                entry = self._resident.get(key)
+            if entry is None:
+                raise RuntimeError(f"Loading model {name}/{version} failed")
+            return entry
+        
+        try:
+            if path is None:
+                raise RuntimeError(f"Model {name}/{version} was added in memory and has been evicted")
+            start_time = time.perf_counter()
+            service = self.service_factory(path)
+            entry = _Entry(name, version, service, self._size_of(service))
+            logger.info(f"Loaded model {name}/{version} ({entry.size_mb:.1f} MB) "
+                        f"in {time.perf_counter() - start_time:.2f}s")
+            
+            with self._lock:
+                self._resident[key] = entry
+                evicted = self._evict_locked(keep=key)
+            self._close_all(evicted)
+            return entry
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            loading.set()
+    
+    def _evict_locked(self, keep: Tuple[str, str]) -> list:
+        """Drop least recently used versions until the budget fits; returns those now closeable"""
+        if self.memory_budget_mb <= 0:
+            return []
+        
+        closeable = []
+        used = sum(entry.size_mb for entry in self._resident.values())
+        for key in list(self._resident):
+            if used <= self.memory_budget_mb:
+                break
+            if key == keep:
+                continue
+            entry = self._resident[key]
+            used -= entry.size_mb
+            logger.info(f"Evicted model {entry.name}/{entry.version} ({entry.size_mb:.1f} MB) "
+                        f"to stay within {self.memory_budget_mb:.0f} MB")
+            closeable.extend(self._unload_locked(key))
+        
+        if used > self.memory_budget_mb:
+            logger.warning(f"Loaded models use {used:.1f} MB, over the {self.memory_budget_mb:.0f} MB budget")
+        return closeable
+    
+    def _retire_locked(self, key: Tuple[str, str]) -> list:
+        """Unload a swapped-out version unless it was added in memory; returns it if closeable now"""
+        if key not in self._resident or self._paths[key[0]].get(key[1]) is None:
+            return []
+        return self._unload_locked(key)
+    
+    def _unload_locked(self, key: Tuple[str, str]) -> list:
+        """Drop a resident version; it's closed now if idle, else by the release of its last lease"""
+        entry = self._resident.pop(key)
+        entry.retired = True
+        return [entry] if entry.leases == 0 else []
+    
+    def _close(self, entry: _Entry) -> None:
+        close = getattr(entry.service, 'close', None)
+        if close is not None:
+            close()
+    
+    def _close_all(self, entries: list) -> None:
+        for entry in entries:
+            self._close(entry)
+    
+    def _size_of(self, service: Any) -> float:
+        get_memory_mb = getattr(service, 'get_memory_mb', None)
+        return get_memory_mb() if get_memory_mb is not None else 0.0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Registered models, their versions, and what is loaded"""
+        with self._lock:
+            models = {}
+            for name, versions in self._paths.items():
+                version_stats = {}
+                for version, path in versions.items():
+                    entry = self._resident.get((name, version))
+                    version_stats[version] = {
+                        "path": path,
+                        "resident": entry is not None,
+                        "size_mb": entry.size_mb if entry else None,
+                        "in_flight": entry.leases if entry else 0,
+                        "last_used": entry.last_used if entry else None
+                    }
+                
+                models[name] = {
+                    "active_version": self._active.get(name),
+                    "deployment": dict(self._deployments[name]) if name in self._deployments else None,
+                    "versions": version_stats
+                }
+            
+            return {
+                "default_model": self.default_model,
+                "memory_budget_mb": self.memory_budget_mb or None,
+                "memory_used_mb": sum(entry.size_mb for entry in self._resident.values()),
+                "models": models
+            }
\ No newline at end of file
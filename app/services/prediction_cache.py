@@ -0,0 +1,184 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping cost on top of the cached array itself
+ENTRY_OVERHEAD_BYTES = 200
+
+class PredictionCache:
+    """LRU cache of per-row predictions keyed by a digest of the float32 input bytes
+    
+    Entries expire after ttl_seconds and are evicted least-recently-used once
+    max_entries or max_bytes is exceeded. Keys are seeded with the model
+    version, and the cache empties itself when it sees a new version;
+    computations still running for the old version are then neither stored
+    nor joined by later callers.
+    """
+    
+    def __init__(self, max_entries: int = 100000, max_bytes: int = 64 * 1024 ** 2,
+                 ttl_seconds: float = 300.0):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.ttl = float(ttl_seconds)
+        
+        self._entries: "OrderedDict[bytes, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._inflight: Dict[bytes, Future] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._version: Optional[str] = None
+        self._version_key = b''
+        
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def set_version(self, version: Optional[str]) -> None:
+        """Switch to a new model version, dropping everything cached for the old one"""
+        with self._lock:
+            if version == self._version:
+                return
+            self._switch_version_locked(version)
+        logger.info(f"Prediction cache cleared for model version {version}")
+    
+    def _switch_version_locked(self, version: Optional[str]) -> None:
+        self._clear_locked()
+        # Callers computing for the old version resolve their own futures; a fresh
+        # map keeps new callers from waiting on them
+        self._inflight = {}
+        self._version = version
+        self._version_key = hashlib.blake2b((version or '').encode('utf-8'), digest_size=32).digest()
+    
+    def clear(self) -> None:
+        """Drop all cached predictions"""
+        with self._lock:
+            self._clear_locked()
+    
+    def _clear_locked(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+    
+    def _digest(self, row: np.ndarray, version_key: bytes) -> bytes:
+        """Hash one contiguous float32 row together with the model version"""
+        return hashlib.blake2b(row, digest_size=16, key=version_key).digest()
+    
+    def get_or_compute(self, rows: np.ndarray, compute: Callable[[np.ndarray], np.ndarray],
+                       version: Optional[str] = None) -> np.ndarray:
+        """Return predictions for (N, F) rows, computing only the cache misses
+        
+        compute is called at most once, with just the rows that are neither
+        cached nor already being computed by another caller. Rows in flight
+        elsewhere are waited on instead of being recomputed.
+        """
+        with self._lock:
+            if version != self._version:
+                self._switch_version_locked(version)
+                logger.info(f"Prediction cache cleared for model version {version}")
+            version_key = self._version_key
+        
+        rows = np.ascontiguousarray(rows, dtype=np.float32)
+        keys = [self._digest(row, version_key) for row in rows]
+        results: List[Any] = [None] * len(keys)
+        owned: "OrderedDict[bytes, List[int]]" = OrderedDict()
+        futures: Dict[bytes, Future] = {}
+        waiting: Dict[int, Future] = {}
+        now = time.monotonic()
+        
+        with self._lock:
+            if self._version_key != version_key:
+                # The version changed while hashing: these keys belong to neither version's cache
+                return compute(rows)
+            inflight = self._inflight
+            for index, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[0] > now:
+                        self._entries.move_to_end(key)
+                        results[index] = entry[1]
+                        self.hits += 1
+                        continue
+                    self._remove_locked(key)
+                    self.expirations += 1
+                
+                if key in owned:
+                    owned[key].append(index)
+                    self.coalesced += 1
+                elif key in inflight:
+                    waiting[index] = inflight[key]
+                    self.coalesced += 1
+                else:
+                    futures[key] = inflight[key] = Future()
+                    owned[key] = [index]
+                    self.misses += 1
+        
+        if owned:
+            try:
+                outputs = compute(rows[[indices[0] for indices in owned.values()]])
+            except BaseException as e:
+                with self._lock:
+                    for key in owned:
+                        inflight.pop(key, None)
+                        futures[key].set_exception(e)
+                raise
+            
+            expires_at = time.monotonic() + self.ttl
+            with self._lock:
+                # Results computed for a version that has since been replaced are returned, not cached
+                current = self._version_key == version_key
+                for position, (key, indices) in enumerate(owned.items()):
+                    # Copy so a cached row doesn't pin the whole batch output
+                    value = np.array(outputs[position], copy=True)
+                    if current:
+                        self._store_locked(key, value, expires_at)
+                    inflight.pop(key, None)
+                    futures[key].set_result(value)
+                    for index in indices:
+                        results[index] = value
+        
+        for index, future in waiting.items():
+            results[index] = future.result()
+        
+        return np.stack(results)
+    
+    def _store_locked(self, key: bytes, value: np.ndarray, expires_at: float) -> None:
+        if key in self._entries:
+            self._remove_locked(key)
+        self._entries[key] = (expires_at, value)
+        self._bytes += value.nbytes + ENTRY_OVERHEAD_BYTES
+        
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove_locked(oldest)
+            self.evictions += 1
+    
+    def _remove_locked(self, key: bytes) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= value.nbytes + ENTRY_OVERHEAD_BYTES
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "in_flight": len(self._inflight),
+                "model_version": self._version
+            }
\ No newline at end of file
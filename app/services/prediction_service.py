@@ -1,45 +1,376 @@
+import os
 import torch
 import numpy as np
 import logging
-from typing import Dict, List, Any, Union
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
+from itertools import islice
+from typing import Dict, List, Any, Union, Optional, Callable, Tuple, Iterable, Iterator
 from app.models.cyber_sentinel import CyberSentinelModel
+from app.services.buffer_pool import BufferPool
+from app.services.prediction_cache import PredictionCache
+from app.services.shadow import ShadowEvaluator
+from app.services.warmup import settle_latency
 from app.utils.data_preprocessor import DataPreprocessor
+from app.utils.feature_monitor import FeatureMonitor, ReferenceStats, default_reference_path
+from app.utils.feature_scaling import default_scaler_path
+from app.utils.feature_schema import FeatureSchema
+from app.utils.postprocessing import PostProcessing
+from app.utils.model_utils import calculate_model_size
+from app.utils.metrics import stage
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_WARMUP_BATCH_SIZES = (1, 8, 64)
+
+class MicroBatcher:
+    """Coalesce concurrent single-row predictions into one forward pass"""
+    
+    def __init__(self, predict_fn: Callable[[torch.Tensor], torch.Tensor],
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0,
+                 timeout_ms: float = 1000.0, buffer_pool: Optional[BufferPool] = None):
+        self.predict_fn = predict_fn
+        self.buffer_pool = buffer_pool
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.timeout = float(timeout_ms) / 1000.0 if timeout_ms else None
+        
+        self._queue: "queue.Queue[Tuple[torch.Tensor, Future]]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.batch_size_histogram: Dict[int, int] = {}
+        self.batches_run = 0
+        self.rows_processed = 0
+        
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+        logger.info(f"Micro-batching enabled (max_batch_size={self.max_batch_size}, "
+                    f"max_wait_ms={max_wait_ms})")
+    
+    def submit(self, input_tensor: torch.Tensor) -> torch.Tensor:
+        """Queue a (1, F) tensor and block until its output row is ready"""
+        if self._stopped.is_set():
+            raise RuntimeError("Micro-batcher has been shut down")
+        
+        future: Future = Future()
+        self._queue.put((input_tensor, future))
+        return future.result(timeout=self.timeout)
+    
+    def _run(self) -> None:
+        """Worker loop: gather up to max_batch_size rows or until max_wait elapses"""
+        while not self._stopped.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            self._execute(batch)
+    
+    def _execute(self, batch: List[Tuple[torch.Tensor, Future]]) -> None:
+        """Run one forward pass per feature width and hand each caller its row"""
+        groups: Dict[int, List[Tuple[torch.Tensor, Future]]] = {}
+        for item in batch:
+            groups.setdefault(item[0].shape[-1], []).append(item)
+        
+        for items in groups.values():
+            try:
+                output = self._predict_group([tensor for tensor, _ in items])
+            except Exception as e:
+                logger.error(f"Batched prediction failed: {e}")
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            
+            for row, (_, future) in enumerate(items):
+                future.set_result(output[row:row + 1])
+        
+        with self._stats_lock:
+            size = len(batch)
+            self.batch_size_histogram[size] = self.batch_size_histogram.get(size, 0) + 1
+            self.batches_run += 1
+            self.rows_processed += size
+    
+    def _predict_group(self, tensors: List[torch.Tensor]) -> torch.Tensor:
+        """Concatenate rows (into a pooled buffer when there is one) and run the forward pass"""
+        if self.buffer_pool is None or tensors[0].dtype != torch.float32:
+            return self.predict_fn(torch.cat(tensors, dim=0))
+        
+        with self.buffer_pool.lease(len(tensors), tensors[0].shape[-1]) as buffer:
+            return self.predict_fn(torch.cat(tensors, dim=0, out=torch.from_numpy(buffer)))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and batch-size distribution"""
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches_run": self.batches_run,
+                "rows_processed": self.rows_processed,
+                "mean_batch_size": self.rows_processed / self.batches_run if self.batches_run else 0.0,
+                "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0
+            }
+    
+    def shutdown(self) -> None:
+        """Stop the worker thread and fail anything still queued"""
+        self._stopped.set()
+        self._worker.join(timeout=1.0)
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(RuntimeError("Micro-batcher has been shut down"))
+
 class PredictionService:
-    def __init__(self, model_path: str):
-        self.model = CyberSentinelModel(model_path)
-        self.preprocessor = DataPreprocessor()
+    def __init__(self, model_path: str, batching: Optional[Dict[str, Any]] = None,
+                 cache: Optional[Dict[str, Any]] = None, load_mode: str = 'standard',
+                 backend: Optional[Dict[str, Any]] = None,
+                 preprocessing: Optional[Dict[str, Any]] = None,
+                 buffer_pool: Optional[Dict[str, Any]] = None,
+                 shadow: Optional[Dict[str, Any]] = None,
+                 warmup: Optional[Dict[str, Any]] = None,
+                 monitoring: Optional[Dict[str, Any]] = None):
+        backend = backend or {}
+        preprocessing = preprocessing or {}
+        self.warmup_options = warmup or {}
+        scaler_path = None
+        if preprocessing.get('normalize'):
+            scaler_path = preprocessing.get('scaler_path') or default_scaler_path(model_path)
+        
+        self.model = CyberSentinelModel(
+            model_path,
+            load_mode=load_mode,
+            backend=backend.get('name', 'eager'),
+            backend_options=backend,
+            precision=backend.get('precision', 'fp32'),
+            precision_reference=backend.get('precision_reference'),
+            scaler_path=scaler_path,
+            fold_scaler=preprocessing.get('fold', True)
+        )
         self.model_info = self.model.get_model_info()
         
+        # Optional declared schema for named-feature (dict) inputs
+        schema = None
+        if preprocessing.get('feature_schema'):
+            schema = FeatureSchema.load(preprocessing['feature_schema'])
+            input_size = self.model_info.get('input_size')
+            if isinstance(input_size, int) and schema.num_features != input_size:
+                raise ValueError(f"Feature schema has {schema.num_features} features, model expects {input_size}")
+        
+        # Optional running statistics of the inputs, for spotting feature drift
+        monitor = None
+        if monitoring and monitoring.get('enabled'):
+            monitor = self._build_monitor(monitoring, model_path, schema)
+        self.preprocessor = DataPreprocessor(scaler=self.model.scaler, schema=schema, monitor=monitor)
+        
+        # Optional pool of reusable input buffers that requests are parsed into
+        self.buffer_pool = None
+        if buffer_pool and buffer_pool.get('enabled'):
+            self.buffer_pool = BufferPool(max_bytes=int(buffer_pool.get('max_mb', 64) * 1024 ** 2))
+        
+        # Optional dynamic micro-batching of concurrent single requests
+        self.batcher = None
+        if batching and batching.get('enabled'):
+            self.batcher = MicroBatcher(
+                self.model.predict,
+                max_batch_size=batching.get('max_batch_size', 64),
+                max_wait_ms=batching.get('max_wait_ms', 5.0),
+                timeout_ms=batching.get('timeout_ms', 1000.0),
+                buffer_pool=self.buffer_pool
+            )
+        
+        # Optional cache of per-row predictions for repeated feature vectors
+        self.cache = None
+        if cache and cache.get('enabled'):
+            self.cache = PredictionCache(
+                max_entries=cache.get('max_entries', 100000),
+                max_bytes=int(cache.get('max_mb', 64) * 1024 ** 2),
+                ttl_seconds=cache.get('ttl_seconds', 300)
+            )
+            self.cache.set_version(self.model.model_version)
+        
+        # Optional candidate model scored on a sample of requests in the background
+        self.shadow_model = None
+        self.shadow = None
+        if shadow and shadow.get('enabled') and shadow.get('model_path'):
+            self.shadow_model, self.shadow = self._build_shadow(shadow, load_mode, backend, preprocessing)
+        
         logger.info("Prediction service initialized")
         logger.info(f"Model info: {self.model_info}")
     
-    def preprocess_input(self, raw_data: Union[List, np.ndarray, Dict]) -> torch.Tensor:
+    def _build_monitor(self, monitoring: Dict[str, Any], model_path: str,
+                       schema: Optional[FeatureSchema]) -> FeatureMonitor:
+        """Input-distribution monitor, with the model's reference statistics for drift scores when saved"""
+        reference = None
+        input_size = self.model_info.get('input_size')
+        reference_path = monitoring.get('reference_path') or default_reference_path(model_path)
+        if os.path.exists(reference_path):
+            reference = ReferenceStats.load(reference_path)
+            if isinstance(input_size, int) and reference.num_features != input_size:
+                raise ValueError(f"Reference statistics have {reference.num_features} features, "
+                                 f"model expects {input_size}")
+            logger.info(f"Input drift scored against reference statistics in {reference_path}")
+        else:
+            logger.info(f"No reference statistics at {reference_path} (fit them with 'python main.py "
+                        f"fit-reference'); input monitoring runs without drift scores")
+        
+        return FeatureMonitor(
+            sample_rate=monitoring.get('sample_rate', 0.1),
+            reservoir_size=monitoring.get('reservoir_size', 2048),
+            reference=reference,
+            feature_names=schema.names if schema is not None else None,
+            psi_threshold=monitoring.get('psi_threshold', 0.2),
+            num_features=input_size if isinstance(input_size, int) else None
+        )
+    
+    def _build_shadow(self, shadow: Dict[str, Any], load_mode: str, backend: Dict[str, Any],
+                      preprocessing: Dict[str, Any]) -> Tuple[CyberSentinelModel, ShadowEvaluator]:
+        """Load the candidate model the same way as the primary and start its evaluator"""
+        candidate_path = shadow['model_path']
+        candidate = CyberSentinelModel(
+            candidate_path,
+            load_mode=load_mode,
+            backend=backend.get('name', 'eager'),
+            backend_options=backend,
+            precision=backend.get('precision', 'fp32'),
+            precision_reference=backend.get('precision_reference'),
+            scaler_path=default_scaler_path(candidate_path) if preprocessing.get('normalize') else None,
+            fold_scaler=preprocessing.get('fold', True)
+        )
+        input_size = candidate.get_model_info().get('input_size')
+        if input_size != self.model_info.get('input_size'):
+            raise ValueError(f"Shadow model expects {input_size} features, "
+                             f"the primary model {self.model_info.get('input_size')}")
+        
+        evaluator = ShadowEvaluator(
+            lambda rows: candidate.predict(torch.from_numpy(rows), record_metrics=False).numpy(),
+            sample_rate=shadow.get('sample_rate', 0.05),
+            max_queue=shadow.get('max_queue', 64),
+            max_inflight_requests=shadow.get('max_inflight_requests', 1),
+            decision_threshold=shadow.get('decision_threshold', 0.5)
+        )
+        logger.info(f"Shadow model {candidate_path} (version {candidate.model_version}) "
+                    f"evaluated against {self.model.model_path}")
+        return candidate, evaluator
+    
+    def reload_model(self) -> None:
+        """Reload the model from disk; cached predictions are dropped"""
+        self.model.load_model()
+        self.model_info = self.model.get_model_info()
+        self.preprocessor.scaler = self.model.scaler
+        if self.cache is not None:
+            self.cache.set_version(self.model.model_version)
+    
+    def preprocess_input(self, raw_data: Union[List, np.ndarray, Dict],
+                         out: Optional[np.ndarray] = None) -> torch.Tensor:
         """Preprocess input data for the model"""
-        return self.preprocessor.process(raw_data, self.model_info.get('input_size'))
+        return self.preprocessor.process(raw_data, self.model_info.get('input_size'), out=out)
+    
+    def _input_buffer(self, rows: int):
+        """Lease a (rows, input_size) buffer to parse a request into; yields None without a pool
+        
+        The model runs on a view of the buffer, so everything that reads the
+        input tensor has to happen inside the block. Outputs are separate
+        arrays and can outlive it.
+        """
+        input_size = self.model_info.get('input_size')
+        if self.buffer_pool is None or not isinstance(input_size, int) or rows <= 0:
+            return nullcontext()
+        return self.buffer_pool.lease(rows, input_size)
+    
+    def _micro_batched(self, input_tensor: torch.Tensor) -> bool:
+        return self.batcher is not None and input_tensor.shape[0] == 1
+    
+    def _forward(self, input_tensor: torch.Tensor) -> np.ndarray:
+        """Run the model, routing single rows through the micro-batcher when enabled"""
+        if self._micro_batched(input_tensor):
+            # The forward pass itself is timed on the batcher thread
+            with stage('batch_wait'):
+                return self.batcher.submit(input_tensor).numpy()
+        
+        with torch.no_grad():
+            return self.model.predict(input_tensor).numpy()
+    
+    def _infer(self, input_tensor: torch.Tensor) -> np.ndarray:
+        """Run inference, answering repeated rows from the cache when enabled
+        
+        With a shadow model, a sample of inputs is handed to it afterwards;
+        it runs on its own thread, so this only pays for the sampling check
+        (and, for sampled requests, one copy of the input). Only requests the
+        primary model computed in full are handed over, with the time of the
+        forward pass alone: cache hits and queueing would skew the comparison.
+        """
+        computed = {}
+        
+        def forward(rows: torch.Tensor) -> np.ndarray:
+            start_time = time.perf_counter()
+            output = self._forward(rows)
+            computed["rows"] = rows.shape[0] if rows.dim() > 1 else 1
+            # Micro-batched rows share a pass with other requests and include the batch wait
+            computed["seconds"] = None if self._micro_batched(rows) else time.perf_counter() - start_time
+            return output
+        
+        if self.cache is None or input_tensor.dim() != 2:
+            output = forward(input_tensor)
+        else:
+            output = self.cache.get_or_compute(
+                input_tensor.numpy(),
+                lambda rows: forward(torch.from_numpy(rows)),
+                version=self.model.model_version
+            )
+        
+        rows = input_tensor.shape[0] if input_tensor.dim() > 1 else 1
+        if self.shadow is not None and computed.get("rows") == rows:
+            self.shadow.submit(input_tensor, output, computed["seconds"])
+        return output
     
-    def predict(self, input_data: Union[List, np.ndarray, Dict]) -> Dict[str, Any]:
-        """Make prediction with proper error handling"""
+    def predict(self, input_data: Union[List, np.ndarray, Dict], as_numpy: bool = False,
+                postprocess: Optional[PostProcessing] = None) -> Dict[str, Any]:
+        """Make prediction with proper error handling
+        
+        With as_numpy=True the prediction is returned as an ndarray, for
+        callers that serialize it in a binary format. postprocess reduces the
+        raw outputs (activation, top-k, threshold, rounding) before that.
+        """
         try:
-            # Preprocess input
-            input_tensor = self.preprocess_input(input_data)
+            with self._input_buffer(1) as buffer:
+                # Preprocess input
+                with stage('preprocess'):
+                    input_tensor = self.preprocess_input(input_data, out=buffer)
+                
+                # Make prediction
+                with stage('inference'):
+                    prediction_np = self._infer(input_tensor)
             
-            # Make prediction
-            with torch.no_grad():
-                prediction = self.model.predict(input_tensor)
-            
-            # Convert to Python native types
-            prediction_np = prediction.numpy()
-            
-            return {
-                "success": True,
-                "prediction": prediction_np.tolist(),
-                "shape": list(prediction_np.shape),
-                "model_info": self.model_info
-            }
+            with stage('postprocess'):
+                prediction_np, scores_np = postprocess.apply(prediction_np) if postprocess else (prediction_np, None)
+                result = {
+                    "success": True,
+                    "prediction": prediction_np if as_numpy else prediction_np.tolist(),
+                    "shape": list(prediction_np.shape)
+                }
+                if scores_np is not None:
+                    result["scores"] = scores_np if as_numpy else scores_np.tolist()
             
+            if postprocess is None or postprocess.include_model_info:
+                result["model_info"] = self.model_info
+            return result
+        
         except Exception as e:
             logger.error(f"Prediction failed: {e}")
             return {
@@ -49,24 +380,51 @@ class PredictionService:
                 "model_info": self.model_info
             }
     
-    def batch_predict(self, batch_data: List) -> Dict[str, Any]:
-        """Process multiple predictions"""
+    def batch_predict(self, batch_data: Union[List, np.ndarray], as_numpy: bool = False,
+                      postprocess: Optional[PostProcessing] = None) -> Dict[str, Any]:
+        """Process multiple predictions
+        
+        With as_numpy=True the predictions come back as one ndarray holding
+        only the accepted rows, instead of a list aligned with the request.
+        postprocess is applied to the whole batch at once, as in predict().
+        """
         try:
-            processed_batch = [self.preprocess_input(data) for data in batch_data]
-            input_tensor = torch.stack(processed_batch)
-            
-            with torch.no_grad():
-                predictions = self.model.predict_batch(input_tensor)
+            # Binary bodies are already float32 arrays; only lists are parsed into a pooled buffer
+            with self._input_buffer(len(batch_data) if isinstance(batch_data, list) else 0) as buffer:
+                # One (N, F) tensor for the whole batch; bad rows are reported individually
+                with stage('preprocess'):
+                    input_tensor, row_indices, row_errors = self.preprocessor.process_batch(
+                        batch_data, self.model_info.get('input_size'), out=buffer
+                    )
+                errors = [{"index": index, "error": message} for index, message in sorted(row_errors.items())]
+                
+                if not row_indices:
+                    return {
+                        "success": False,
+                        "error": "No valid inputs in batch",
+                        "errors": errors,
+                        "predictions": None
+                    }
+                
+                with stage('inference'):
+                    predictions_np = self._infer(input_tensor)
             
-            predictions_np = predictions.numpy()
+            with stage('postprocess'):
+                predictions_np, scores_np = postprocess.apply(predictions_np) if postprocess else (predictions_np, None)
+                result = {
+                    "success": True,
+                    "predictions": self._align(predictions_np, row_indices, len(batch_data), as_numpy),
+                    "batch_size": len(batch_data),
+                    "shape": list(predictions_np.shape)
+                }
+                if scores_np is not None:
+                    result["scores"] = self._align(scores_np, row_indices, len(batch_data), as_numpy)
             
-            return {
-                "success": True,
-                "predictions": predictions_np.tolist(),
-                "batch_size": len(batch_data),
-                "shape": list(predictions_np.shape)
-            }
+            if errors:
+                result["errors"] = errors
             
+            return result
+        
         except Exception as e:
             logger.error(f"Batch prediction failed: {e}")
             return {
@@ -75,11 +433,183 @@ class PredictionService:
                 "predictions": None
             }
     
+    def _align(self, rows: np.ndarray, row_indices: List[int], size: int, as_numpy: bool) -> Any:
+        """Rows as a list aligned with the request, None for rejected rows"""
+        if as_numpy:
+            return rows
+        if len(row_indices) == size:
+            return rows.tolist()
+        
+        aligned = [None] * size
+        for index, row in zip(row_indices, rows.tolist()):
+            aligned[index] = row
+        return aligned
+    
+    def stream_predict(self, records: Iterable[Any], chunk_size: int = 1024,
+                       postprocess: Optional[PostProcessing] = None, offset: int = 0) -> Iterator[Dict[str, Any]]:
+        """Score an unbounded stream of records in fixed-size chunks
+        
+        Only one chunk is held in memory at a time. Each yielded dict has the
+        chunk's offset and size, the predictions for its accepted rows, their
+        positions within the chunk, and an error message for every rejected
+        row. Records that arrive as exceptions (e.g. unparseable lines) are
+        reported as errors without reaching the model. With postprocess, a
+        chunk may also carry a scores array alongside its predictions. Offsets
+        start at offset, for callers that feed a stream in one chunk at a time.
+        """
+        input_size = self.model_info.get('input_size')
+        records = iter(records)
+        
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            
+            row_errors = {i: str(record) for i, record in enumerate(chunk) if isinstance(record, Exception)}
+            positions = [i for i in range(len(chunk)) if i not in row_errors]
+            row_indices = []
+            predictions_np = None
+            scores_np = None
+            
+            if positions:
+                # Chunks are all the same size, so they keep reusing one pooled buffer
+                with self._input_buffer(len(positions)) as buffer:
+                    with stage('preprocess'):
+                        input_tensor, accepted, errors = self.preprocessor.process_batch(
+                            [chunk[i] for i in positions], input_size, out=buffer
+                        )
+                    row_errors.update({positions[i]: message for i, message in errors.items()})
+                    row_indices = [positions[i] for i in accepted]
+                    
+                    if accepted:
+                        with stage('inference'):
+                            predictions_np = self._infer(input_tensor)
+                
+                if predictions_np is not None and postprocess is not None:
+                    with stage('postprocess'):
+                        predictions_np, scores_np = postprocess.apply(predictions_np)
+            
+            chunk_result = {
+                "offset": offset,
+                "size": len(chunk),
+                "predictions": predictions_np,
+                "row_indices": row_indices,
+                "errors": row_errors
+            }
+            if scores_np is not None:
+                chunk_result["scores"] = scores_np
+            yield chunk_result
+            offset += len(chunk)
+    
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """Get micro-batching queue depth and batch-size histogram"""
+        if self.batcher is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.batcher.get_stats()}
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get prediction cache hit/miss/eviction counters"""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.get_stats()}
+    
+    def get_buffer_pool_stats(self) -> Dict[str, Any]:
+        """Get input buffer pool reuse, allocation and memory counters"""
+        if self.buffer_pool is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.buffer_pool.get_stats()}
+    
+    def get_monitoring_stats(self) -> Dict[str, Any]:
+        """Get running per-feature input statistics and drift scores"""
+        monitor = self.preprocessor.monitor
+        if monitor is None:
+            return {"enabled": False}
+        return {"enabled": True, **monitor.get_stats()}
+    
+    def get_shadow_stats(self) -> Dict[str, Any]:
+        """Get shadow-model agreement, drift, drop counters and both models' latencies"""
+        if self.shadow is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "model_path": self.shadow_model.model_path,
+            "model_version": self.shadow_model.model_version,
+            **self.shadow.get_stats()
+        }
+    
+    def warm_up(self) -> Dict[str, Any]:
+        """Run synthetic batches through the model until each batch size's p99 latency settles
+        
+        First requests would otherwise pay for lazy kernel selection,
+        allocator growth and JIT work. Inputs go through pooled buffers, so
+        the pool is grown for every warmed batch size too. Passes are kept
+        out of the serving metrics. Returns the settle report.
+        """
+        input_size = self.model_info.get('input_size')
+        if not isinstance(input_size, int):
+            return {}
+        
+        options = self.warmup_options
+        batch_sizes = [int(size) for size in options.get('batch_sizes') or DEFAULT_WARMUP_BATCH_SIZES]
+        generator = torch.Generator().manual_seed(0)
+        inputs = {size: torch.randn(size, input_size, generator=generator) for size in batch_sizes}
+        
+        def run(batch_size: int) -> None:
+            with self._input_buffer(batch_size) as buffer:
+                input_tensor = inputs[batch_size]
+                if buffer is not None:
+                    input_tensor = torch.from_numpy(buffer).copy_(input_tensor)
+                self.model.predict(input_tensor, record_metrics=False)
+        
+        if self.shadow_model is not None:
+            for input_tensor in inputs.values():
+                self.shadow_model.predict(input_tensor, record_metrics=False)
+        
+        report = settle_latency(
+            run,
+            batch_sizes,
+            iterations=options.get('iterations', 50),
+            tolerance=options.get('tolerance', 0.1),
+            max_seconds=options.get('max_seconds', 30.0)
+        )
+        p99 = ', '.join(f"{size}: {stats['p99_ms']:.2f}ms" for size, stats in report['batch_sizes'].items())
+        if report['settled']:
+            logger.info(f"Warm-up settled after {report['rounds']} rounds in {report['seconds']:.2f}s "
+                        f"(p99 by batch size: {p99})")
+        else:
+            logger.warning(f"Warm-up stopped after {report['seconds']:.2f}s before p99 latency settled "
+                           f"(p99 by batch size: {p99})")
+        return report
+    
+    def get_memory_mb(self) -> float:
+        """Approximate memory held by the model weights (and a reduced-precision copy, if any)"""
+        size = calculate_model_size(self.model.model)['total_mb']
+        if self.model.inference_model is not None and self.model.inference_model is not self.model.model:
+            size += calculate_model_size(self.model.inference_model)['total_mb']
+        if self.shadow_model is not None:
+            size += calculate_model_size(self.shadow_model.model)['total_mb']
+            inference_model = self.shadow_model.inference_model
+            if inference_model is not None and inference_model is not self.shadow_model.model:
+                size += calculate_model_size(inference_model)['total_mb']
+        return size
+    
+    def close(self) -> None:
+        """Stop background work so the model can be freed"""
+        if self.batcher is not None:
+            self.batcher.shutdown()
+        if self.shadow is not None:
+            self.shadow.shutdown()
+        if self.buffer_pool is not None:
+            self.buffer_pool.clear()
+    
     def get_model_capabilities(self) -> Dict[str, Any]:
         """Get information about what the model can do"""
         return {
             "model_info": self.model_info,
             "supported_input_types": ["list", "numpy_array", "dict"],
             "batch_support": True,
+            "micro_batching": self.batcher is not None,
+            "prediction_cache": self.cache is not None,
+            "shadow_evaluation": self.shadow is not None,
             "device": self.model_info.get('device', 'cpu')
         }
\ No newline at end of file
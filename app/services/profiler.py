@@ -0,0 +1,233 @@
+import os
+import sys
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Requests never worth a capture slot: the admin endpoint itself and monitoring probes
+SKIP_ENDPOINTS = frozenset({'api.profile_capture', 'api.health_check', 'api.liveness_check',
+                            'api.readiness_check', 'api.get_metrics'})
+
+class StackSampler:
+    """Samples the Python stacks of selected threads into collapsed-stack counts"""
+    
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self.samples = 0
+        self._threads: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+    
+    def start(self) -> None:
+        self._worker.start()
+    
+    def stop(self) -> None:
+        self._stopped.set()
+        self._worker.join(timeout=1.0)
+    
+    def add_thread(self, ident: int) -> None:
+        with self._lock:
+            self._threads.add(ident)
+    
+    def remove_thread(self, ident: int) -> None:
+        with self._lock:
+            self._threads.discard(ident)
+    
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                threads = tuple(self._threads)
+            if not threads:
+                continue
+            
+            frames = sys._current_frames()
+            for ident in threads:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    key = ';'.join(reversed(stack))
+                    self.counts[key] = self.counts.get(key, 0) + 1
+                    self.samples += 1
+    
+    def write_collapsed(self, path: str) -> str:
+        """Write 'root;...;leaf count' lines, the input format of flamegraph.pl and speedscope"""
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+        return path
+
+class ProfilerCapture:
+    """Profiles the next N requests (or the next T seconds of requests) on this worker
+    
+    Each captured request runs under torch.profiler and is written out as a
+    Chrome trace (chrome://tracing or Perfetto), with the serving stages as
+    labelled spans. A sampling thread records the Python stacks of the
+    captured requests into one collapsed-stack file for a flamegraph.
+    
+    Requests are captured one at a time, since torch.profiler sessions can't
+    overlap; requests arriving while one is being captured run normally.
+    When nothing is armed, serving pays one attribute check per request.
+    """
+    
+    def __init__(self, output_dir: str = 'profiles', max_seconds: float = 300.0):
+        self.output_dir = output_dir
+        self.max_seconds = max_seconds
+        self.armed = False
+        
+        self._lock = threading.Lock()
+        self._capture: Optional[Dict[str, Any]] = None
+        self._sampler: Optional[StackSampler] = None
+        self._active: Optional[int] = None
+        self._record_function: Optional[Callable] = None
+        self.last_capture: Optional[Dict[str, Any]] = None
+    
+    def arm(self, requests: int = 10, seconds: Optional[float] = None,
+            sample_interval_ms: float = 5.0) -> Dict[str, Any]:
+        """Start a capture; raises ValueError for bad limits and RuntimeError if one is running"""
+        if not 1 <= requests <= 1000:
+            raise ValueError("requests must be between 1 and 1000")
+        seconds = self.max_seconds if seconds is None else float(seconds)
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"seconds must be between 0 and {self.max_seconds:g}")
+        if not 1 <= sample_interval_ms <= 1000:
+            raise ValueError("sample_interval_ms must be between 1 and 1000")
+        
+        # Imported here so serving never loads the profiler unless a capture is asked for
+        from torch.profiler import record_function
+        
+        with self._lock:
+            if self._capture is not None:
+                raise RuntimeError(f"Capture {self._capture['id']} is already running")
+            
+            capture_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+            directory = os.path.join(self.output_dir, capture_id)
+            os.makedirs(directory, exist_ok=True)
+            self._capture = capture = {
+                "id": capture_id,
+                "pid": os.getpid(),
+                "state": "armed",
+                "directory": directory,
+                "requests": requests,
+                "seconds": seconds,
+                "deadline": time.monotonic() + seconds,
+                "profiled": 0,
+                "traces": [],
+                "flamegraph": None,
+                "samples": 0
+            }
+            self._sampler = StackSampler(sample_interval_ms / 1000.0)
+            self._sampler.start()
+            self._record_function = record_function
+            metrics.set_stage_hook(self._stage_span)
+            self.armed = True
+        
+        timer = threading.Timer(seconds, self._finish, args=(capture,))
+        timer.daemon = True
+        timer.start()
+        logger.info(f"Profiler armed for {requests} requests or {seconds:g}s, writing to {directory}")
+        return self.get_status()
+    
+    def begin_request(self, name: str) -> Optional[Dict[str, Any]]:
+        """Start profiling the current request if a capture wants it; pass the result to end_request"""
+        if not self.armed or name in SKIP_ENDPOINTS:
+            return None
+        
+        ident = threading.get_ident()
+        with self._lock:
+            capture = self._capture
+            if capture is None or self._active is not None or capture["profiled"] >= capture["requests"]:
+                return None
+            index = capture["profiled"]
+            capture["profiled"] += 1
+            self._active = ident
+        
+        try:
+            from torch.profiler import ProfilerActivity, profile
+            session = profile(activities=[ProfilerActivity.CPU], record_shapes=True)
+            session.start()
+        except Exception as e:
+            logger.error(f"Could not start the profiler: {e}")
+            with self._lock:
+                self._active = None
+            return None
+        
+        self._sampler.add_thread(ident)
+        return {"capture": capture, "index": index, "name": name, "session": session, "thread": ident}
+    
+    def end_request(self, handle: Dict[str, Any]) -> None:
+        """Stop profiling a request and write its trace"""
+        capture = handle["capture"]
+        path = os.path.join(capture["directory"], f"{handle['index']:03d}-{handle['name']}.trace.json")
+        try:
+            handle["session"].stop()
+            handle["session"].export_chrome_trace(path)
+        except Exception as e:
+            logger.error(f"Could not write profiler trace {path}: {e}")
+            path = None
+        finally:
+            sampler = self._sampler
+            if sampler is not None:
+                sampler.remove_thread(handle["thread"])
+            with self._lock:
+                self._active = None
+                if path:
+                    capture["traces"].append(path)
+                done = capture["profiled"] >= capture["requests"]
+        
+        if done:
+            self._finish(capture)
+    
+    def run(self, name: str, fn: Callable, *args) -> Any:
+        """Call fn, profiling it as request name if a capture wants it"""
+        handle = self.begin_request(name)
+        try:
+            return fn(*args)
+        finally:
+            if handle is not None:
+                self.end_request(handle)
+    
+    def _stage_span(self, name: str) -> Any:
+        """Label serving stages in the trace, only on the thread being captured"""
+        if self._active != threading.get_ident():
+            return None
+        return self._record_function(name)
+    
+    def _finish(self, capture: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._capture is not capture:
+                return
+            self._capture = None
+            self.armed = False
+            metrics.set_stage_hook(None)
+            sampler, self._sampler = self._sampler, None
+        
+        sampler.stop()
+        if sampler.samples:
+            capture["flamegraph"] = sampler.write_collapsed(os.path.join(capture["directory"], 'stacks.collapsed'))
+        capture["samples"] = sampler.samples
+        capture["state"] = "done"
+        self.last_capture = capture
+        logger.info(f"Profiler capture {capture['id']} done: {len(capture['traces'])} traces, "
+                    f"{sampler.samples} stack samples in {capture['directory']}")
+    
+    def get_status(self) -> Dict[str, Any]:
+        """The running capture, or else the last finished one"""
+        with self._lock:
+            capture = self._capture or self.last_capture
+            if capture is None:
+                return {"state": "idle", "pid": os.getpid()}
+            status = {key: value for key, value in capture.items() if key != "deadline"}
+            status["traces"] = list(capture["traces"])
+            if capture is self._capture:
+                status["remaining_seconds"] = max(0.0, capture["deadline"] - time.monotonic())
+            return status
\ No newline at end of file
@@ -0,0 +1,247 @@
+import logging
+import queue
+import random
+import threading
+import time
+import numpy as np
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+class ShadowEvaluator:
+    """Score a sample of live requests with a candidate model, off the request path
+    
+    submit() is called after the primary model has answered: a sampled
+    request's input is copied onto a bounded queue together with the primary
+    output, and a background worker runs the candidate on it and folds the
+    comparison into running totals. Shadow work is the first thing dropped
+    under load: when the queue is full, or while more than
+    max_inflight_requests requests are being served, sampled work is counted
+    and discarded instead of queued or run.
+    
+    Outputs are compared row-wise in one vectorized pass per request: label
+    agreement (argmax, or a threshold for single-output models), absolute
+    and squared differences, per-output mean shift and the distance between
+    the two models' label distributions. Both models' forward-pass
+    latencies on the same sampled inputs are kept for a like-for-like
+    comparison, for requests whose primary pass was timed on its own.
+    """
+    
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray], sample_rate: float = 0.05,
+                 max_queue: int = 64, max_inflight_requests: int = 1, decision_threshold: float = 0.5,
+                 busy: Optional[Callable[[], bool]] = None, seed: Optional[int] = None):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"sample_rate must be between 0 and 1, got {sample_rate}")
+        
+        self.predict_fn = predict_fn
+        self.sample_rate = float(sample_rate)
+        self.max_inflight_requests = int(max_inflight_requests)
+        self.decision_threshold = float(decision_threshold)
+        self.busy = busy or self._requests_in_flight_over_limit
+        self._random = random.Random(seed)
+        
+        self._queue: "queue.Queue[Tuple[np.ndarray, np.ndarray, float]]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        
+        self.sampled = 0
+        self.dropped_full = 0
+        self.dropped_busy = 0
+        self.errors = 0
+        self.compared_requests = 0
+        self.compared_rows = 0
+        self.agreeing_rows = 0
+        self.compared_values = 0
+        self.sum_abs_diff = 0.0
+        self.sum_sq_diff = 0.0
+        self.max_abs_diff = 0.0
+        self.primary_sums: Optional[np.ndarray] = None
+        self.shadow_sums: Optional[np.ndarray] = None
+        self.primary_labels: Optional[np.ndarray] = None
+        self.shadow_labels: Optional[np.ndarray] = None
+        self.timed_requests = 0
+        self.timed_rows = 0
+        self.primary_seconds = 0.0
+        self.shadow_seconds = 0.0
+        
+        self._worker = threading.Thread(target=self._run, name='shadow-evaluator', daemon=True)
+        self._worker.start()
+        logger.info(f"Shadow evaluation enabled (sample_rate={self.sample_rate}, max_queue={self._queue.maxsize})")
+    
+    def _requests_in_flight_over_limit(self) -> bool:
+        return metrics.REQUESTS_IN_FLIGHT.value() > self.max_inflight_requests
+    
+    def submit(self, inputs: Any, primary_output: np.ndarray, primary_seconds: Optional[float]) -> bool:
+        """Queue a sampled request for the candidate model; never blocks
+        
+        primary_seconds is the primary model's forward pass over exactly
+        these inputs, or None when it has no time of its own (e.g. it ran
+        inside a micro-batch); such requests are compared on outputs only.
+        Returns whether the request was queued. Only queued inputs are
+        copied (the caller's buffer may be reused as soon as it returns);
+        the primary output is kept as is and must not be modified afterwards.
+        """
+        if self._stopped.is_set() or self._random.random() >= self.sample_rate:
+            return False
+        
+        with self._lock:
+            self.sampled += 1
+        if self.busy():
+            self._drop('busy')
+            return False
+        
+        # Counted before it's queued so wait_idle() never sees the worker finish it first
+        with self._lock:
+            self._pending += 1
+        try:
+            self._queue.put_nowait((np.array(inputs, dtype=np.float32), primary_output, primary_seconds))
+        except queue.Full:
+            with self._lock:
+                self._pending -= 1
+            self._drop('queue_full')
+            return False
+        return True
+    
+    def _drop(self, reason: str) -> None:
+        with self._lock:
+            if reason == 'busy':
+                self.dropped_busy += 1
+            else:
+                self.dropped_full += 1
+        metrics.SHADOW_DROPPED.inc(reason)
+    
+    def _run(self) -> None:
+        """Worker loop: run the candidate on queued inputs while the server isn't busy"""
+        while not self._stopped.is_set():
+            try:
+                inputs, primary_output, primary_seconds = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            
+            try:
+                if self.busy():
+                    self._drop('busy')
+                    continue
+                
+                start_time = time.perf_counter()
+                try:
+                    shadow_output = np.asarray(self.predict_fn(inputs))
+                    self._compare(primary_output, shadow_output, primary_seconds, time.perf_counter() - start_time)
+                except Exception as e:
+                    logger.warning(f"Shadow evaluation failed: {e}")
+                    with self._lock:
+                        self.errors += 1
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    self._idle.notify_all()
+    
+    def _labels(self, outputs: np.ndarray) -> np.ndarray:
+        """Predicted class per row: argmax, or the decision threshold for single-output models"""
+        if outputs.shape[1] == 1:
+            return (outputs[:, 0] > self.decision_threshold).astype(np.intp)
+        return outputs.argmax(axis=1)
+    
+    def _compare(self, primary: Any, shadow: Any, primary_seconds: Optional[float], shadow_seconds: float) -> None:
+        """Fold one request's pair of outputs into the running agreement and drift totals"""
+        primary = np.asarray(primary, dtype=np.float64)
+        shadow = np.asarray(shadow, dtype=np.float64)
+        if primary.shape != shadow.shape:
+            raise ValueError(f"Candidate output shape {shadow.shape} differs from the primary's {primary.shape}")
+        primary = primary.reshape(primary.shape[0], -1) if primary.ndim else primary.reshape(1, 1)
+        shadow = shadow.reshape(primary.shape)
+        
+        abs_diff = np.abs(shadow - primary)
+        primary_labels = self._labels(primary)
+        shadow_labels = self._labels(shadow)
+        classes = max(2, primary.shape[1])
+        
+        with self._lock:
+            if self.primary_sums is None:
+                self.primary_sums = np.zeros(primary.shape[1])
+                self.shadow_sums = np.zeros(primary.shape[1])
+                self.primary_labels = np.zeros(classes, dtype=np.int64)
+                self.shadow_labels = np.zeros(classes, dtype=np.int64)
+            elif self.primary_sums.shape[0] != primary.shape[1]:
+                raise ValueError(f"Expected {self.primary_sums.shape[0]} outputs per row, got {primary.shape[1]}")
+            
+            self.compared_requests += 1
+            self.compared_rows += primary.shape[0]
+            self.agreeing_rows += int(np.count_nonzero(primary_labels == shadow_labels))
+            self.compared_values += abs_diff.size
+            self.sum_abs_diff += float(abs_diff.sum())
+            self.sum_sq_diff += float(np.square(abs_diff).sum())
+            self.max_abs_diff = max(self.max_abs_diff, float(abs_diff.max(initial=0.0)))
+            self.primary_sums += primary.sum(axis=0)
+            self.shadow_sums += shadow.sum(axis=0)
+            self.primary_labels += np.bincount(primary_labels, minlength=classes)
+            self.shadow_labels += np.bincount(shadow_labels, minlength=classes)
+            if primary_seconds is not None:
+                self.timed_requests += 1
+                self.timed_rows += primary.shape[0]
+                self.primary_seconds += primary_seconds
+                self.shadow_seconds += shadow_seconds
+        
+        if primary_seconds is not None:
+            metrics.MODEL_LATENCY.observe(primary_seconds, 'primary')
+            metrics.MODEL_LATENCY.observe(shadow_seconds, 'shadow')
+    
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far has been evaluated (or dropped)"""
+        with self._lock:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout=timeout)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Sampling and drop counters, agreement, drift and both models' latencies"""
+        with self._lock:
+            rows = self.compared_rows
+            requests = self.compared_requests
+            timed = self.timed_requests
+            timed_rows = self.timed_rows
+            stats = {
+                "sample_rate": self.sample_rate,
+                "sampled": self.sampled,
+                "queued": self._pending,
+                "dropped": {"queue_full": self.dropped_full, "busy": self.dropped_busy},
+                "errors": self.errors,
+                "compared_requests": requests,
+                "compared_rows": rows,
+                "agreement_rate": self.agreeing_rows / rows if rows else None,
+                "mean_abs_diff": self.sum_abs_diff / self.compared_values if self.compared_values else None,
+                "rms_diff": float(np.sqrt(self.sum_sq_diff / self.compared_values)) if self.compared_values else None,
+                "max_abs_diff": self.max_abs_diff if rows else None,
+                "latency_ms": {
+                    "timed_requests": timed,
+                    "primary": self.primary_seconds * 1000.0 / timed if timed else None,
+                    "shadow": self.shadow_seconds * 1000.0 / timed if timed else None,
+                    "primary_per_row": self.primary_seconds * 1000.0 / timed_rows if timed_rows else None,
+                    "shadow_per_row": self.shadow_seconds * 1000.0 / timed_rows if timed_rows else None
+                }
+            }
+            if not rows:
+                return stats
+            
+            primary_dist = self.primary_labels / rows
+            shadow_dist = self.shadow_labels / rows
+            stats["mean_shift"] = ((self.shadow_sums - self.primary_sums) / rows).tolist()
+            stats["label_distribution"] = {"primary": primary_dist.tolist(), "shadow": shadow_dist.tolist()}
+            # Total variation distance: 0 for identical label mixes, 1 for disjoint ones
+            stats["label_distance"] = float(0.5 * np.abs(primary_dist - shadow_dist).sum())
+            return stats
+    
+    def shutdown(self) -> None:
+        """Stop the worker thread and discard anything still queued"""
+        self._stopped.set()
+        self._worker.join(timeout=1.0)
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._pending -= 1
+        with self._lock:
+            self._idle.notify_all()
\ No newline at end of file
@@ -0,0 +1,115 @@
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Round-to-round p99 changes smaller than this are timer and scheduler noise, not warm-up
+SETTLE_FLOOR_SECONDS = 0.0001
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty sample"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def settle_latency(run: Callable[[int], Any], batch_sizes: Sequence[int], iterations: int = 50,
+                   tolerance: float = 0.1, max_seconds: float = 30.0, min_rounds: int = 2,
+                   clock: Callable[[], float] = time.perf_counter) -> Dict[str, Any]:
+    """Call run(batch_size) in rounds until every batch size's p99 latency stops moving
+    
+    Each round times iterations calls per batch size. Latency has settled
+    once, after at least min_rounds, every batch size's p99 is within
+    tolerance (relative) of the previous round's. Rounds stop after
+    max_seconds whether or not it has settled.
+    """
+    if not batch_sizes:
+        raise ValueError("Warm-up needs at least one batch size")
+    
+    start = clock()
+    previous: Dict[int, float] = {}
+    samples: Dict[int, List[float]] = {}
+    rounds = 0
+    settled = False
+    
+    while not settled:
+        rounds += 1
+        for batch_size in batch_sizes:
+            timings = samples[batch_size] = []
+            for _ in range(max(1, iterations)):
+                call_start = clock()
+                run(batch_size)
+                timings.append(clock() - call_start)
+        
+        p99 = {batch_size: percentile(samples[batch_size], 99) for batch_size in batch_sizes}
+        settled = bool(previous) and rounds >= min_rounds and all(
+            abs(p99[size] - previous[size]) <= max(tolerance * previous[size], SETTLE_FLOOR_SECONDS)
+            for size in batch_sizes
+        )
+        previous = p99
+        if clock() - start >= max_seconds:
+            break
+    
+    return {
+        "settled": settled,
+        "rounds": rounds,
+        "seconds": clock() - start,
+        "batch_sizes": {
+            str(size): {
+                "p50_ms": percentile(samples[size], 50) * 1000.0,
+                "p99_ms": previous[size] * 1000.0
+            }
+            for size in batch_sizes
+        }
+    }
+
+class Readiness:
+    """A worker's warm-up state, as reported by the readiness endpoint
+    
+    'idle' until a warm-up is started (there is nothing to wait for, so it
+    counts as ready), then 'warming', then 'ready' or 'failed'.
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.state = 'idle'
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.report: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+    
+    @property
+    def ready(self) -> bool:
+        return self.state in ('idle', 'ready')
+    
+    def begin(self) -> bool:
+        """Move to 'warming'; False if a warm-up has already been started"""
+        with self._lock:
+            if self.state != 'idle':
+                return False
+            self.state = 'warming'
+            self.started_at = self.clock()
+            return True
+    
+    def finish(self, report: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            self.state = 'ready'
+            self.finished_at = self.clock()
+            self.report = report
+    
+    def fail(self, error: str) -> None:
+        with self._lock:
+            self.state = 'failed'
+            self.finished_at = self.clock()
+            self.error = error
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished_at if self.finished_at is not None else self.clock()
+            return {
+                "state": self.state,
+                "ready": self.ready,
+                "warm_up_seconds": end - self.started_at if self.started_at is not None else None,
+                "warm_up": self.report,
+                "error": self.error
+            }
\ No newline at end of file
@@ -1,45 +1,207 @@
 import numpy as np
 import torch
 import logging
-from typing import Union, List, Dict, Any
+from typing import Union, List, Dict, Any, Optional, Tuple
+from app.utils.feature_monitor import FeatureMonitor
+from app.utils.feature_scaling import FeatureScaler
+from app.utils.feature_schema import FeatureSchema
 
 logger = logging.getLogger(__name__)
 
 class DataPreprocessor:
-    def __init__(self):
+    def __init__(self, scaler: Optional[FeatureScaler] = None, schema: Optional[FeatureSchema] = None,
+                 monitor: Optional[FeatureMonitor] = None):
         self.required_input_size = None
+        self.scaler = scaler
+        self.schema = schema
+        # Optional input-distribution statistics, fed a sample of every accepted batch
+        self.monitor = monitor
     
-    def process(self, raw_data: Union[List, np.ndarray, Dict], input_size: Any = None) -> torch.Tensor:
-        """Process raw data into model-ready tensor"""
+    def process(self, raw_data: Union[List, np.ndarray, Dict], input_size: Any = None,
+                out: Optional[np.ndarray] = None) -> torch.Tensor:
+        """Process raw data into model-ready tensor
+        
+        out is an optional preallocated (1, F) float32 buffer; a list input
+        that fits it exactly is written into it instead of a new array.
+        """
         try:
             # Convert to numpy array first
-            if isinstance(raw_data, Dict):
-                array_data = self._dict_to_array(raw_data)
-            elif isinstance(raw_data, List):
-                array_data = np.array(raw_data, dtype=np.float32)
-            elif isinstance(raw_data, np.ndarray):
-                array_data = raw_data.astype(np.float32)
-            else:
-                raise ValueError(f"Unsupported data type: {type(raw_data)}")
+            array_data = self._to_array(raw_data, out)
             
             # Ensure correct shape and type
             tensor_data = self._array_to_tensor(array_data, input_size)
             
+            # Only inputs the model can take count towards the input statistics
+            if self.monitor is not None and (not isinstance(input_size, int) or tensor_data.shape[-1] == input_size):
+                self.monitor.observe(tensor_data.numpy())
             return tensor_data
             
         except Exception as e:
             logger.error(f"Data preprocessing failed: {e}")
             raise
     
-    def _dict_to_array(self, data_dict: Dict) -> np.ndarray:
+    def process_batch(self, batch_data: Union[List, np.ndarray], input_size: Any = None,
+                      out: Optional[np.ndarray] = None) -> Tuple[torch.Tensor, List[int], Dict[int, str]]:
+        """Process a list of rows into a single (N, F) tensor
+        
+        Homogeneous batches (equal-length numeric rows, or dicts with a
+        'features' key) are converted in one numpy call and handed to torch
+        without a copy. Named-feature records go through the feature schema
+        when one is configured. Ragged or mixed batches fall back to per-row
+        validation so one bad row doesn't fail the whole request.
+        
+        out is an optional preallocated (N, F) float32 buffer that list and
+        named-feature batches are written straight into; the returned tensor
+        may then share its memory.
+        
+        Returns the tensor, the batch indices of the rows it holds, and an
+        error message for every rejected row.
+        """
+        tensor_data, row_indices, row_errors = self._process_batch(batch_data, input_size, out)
+        if self.monitor is not None and row_indices:
+            self.monitor.observe(tensor_data.numpy())
+        return tensor_data, row_indices, row_errors
+    
+    def _process_batch(self, batch_data: Union[List, np.ndarray], input_size: Any,
+                       out: Optional[np.ndarray]) -> Tuple[torch.Tensor, List[int], Dict[int, str]]:
+        if self._is_named_batch(batch_data):
+            if out is not None and out.shape != (len(batch_data), self.schema.num_features):
+                out = None
+            array_data, row_indices, row_errors = self.schema.records_to_array(batch_data, out=out)
+            if row_errors:
+                logger.warning(f"Rejected {len(row_errors)} of {len(batch_data)} batch rows")
+            return torch.from_numpy(array_data), row_indices, row_errors
+        
+        array_data = self._batch_to_array(batch_data, out)
+        expected = input_size if isinstance(input_size, int) else None
+        
+        if array_data is not None and (expected is None or array_data.shape[1] == expected):
+            return torch.from_numpy(array_data), list(range(len(batch_data))), {}
+        
+        return self._process_rows(batch_data, expected)
+    
+    def _is_named_batch(self, batch_data: Union[List, np.ndarray]) -> bool:
+        """Whether a batch holds named-feature records for the schema"""
+        return (
+            self.schema is not None
+            and isinstance(batch_data, List)
+            and bool(batch_data)
+            and isinstance(batch_data[0], Dict)
+            and 'features' not in batch_data[0]
+        )
+    
+    def _to_array(self, raw_data: Union[List, np.ndarray, Dict], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Convert a single raw input to a float32 numpy array"""
+        if isinstance(raw_data, Dict):
+            return self._dict_to_array(raw_data, out)
+        elif isinstance(raw_data, List):
+            if out is not None and self._fill_rows(out, self._as_rows(raw_data)):
+                return out
+            return np.array(raw_data, dtype=np.float32)
+        elif isinstance(raw_data, np.ndarray):
+            # No copy when the array is already float32 (e.g. np.frombuffer views)
+            return np.asarray(raw_data, dtype=np.float32)
+        else:
+            raise ValueError(f"Unsupported data type: {type(raw_data)}")
+    
+    def _batch_to_array(self, batch_data: Union[List, np.ndarray],
+                        out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Convert a homogeneous batch to a contiguous (N, F) float32 array in one pass"""
+        if isinstance(batch_data, np.ndarray):
+            array_data = np.ascontiguousarray(batch_data, dtype=np.float32)
+            return array_data if array_data.ndim == 2 else None
+        
+        if not batch_data:
+            return None
+        
+        try:
+            if isinstance(batch_data[0], Dict):
+                rows = [item['features'] for item in batch_data]
+            else:
+                rows = batch_data
+            if out is not None and self._fill_rows(out, rows):
+                return out
+            array_data = np.array(rows, dtype=np.float32)
+        except (KeyError, TypeError, ValueError):
+            return None
+        
+        return array_data if array_data.ndim == 2 else None
+    
+    def _as_rows(self, raw_data: List) -> List:
+        """A single input as a list of rows: a flat vector is one row"""
+        if raw_data and isinstance(raw_data[0], (List, np.ndarray)):
+            return raw_data
+        return [raw_data]
+    
+    def _fill_rows(self, out: np.ndarray, rows: List) -> bool:
+        """Write rows into out if they match its shape exactly; False leaves the caller to allocate
+        
+        The shape is checked up front because assignment would otherwise
+        broadcast, e.g. a batch of one-feature rows (or of strings) across
+        every column.
+        """
+        width = out.shape[1]
+        try:
+            if len(rows) != out.shape[0] or any(
+                not isinstance(row, (List, tuple, np.ndarray)) or len(row) != width for row in rows
+            ):
+                return False
+            out[...] = rows
+        except (TypeError, ValueError):
+            return False
+        return True
+    
+    def _process_rows(self, batch_data: Union[List, np.ndarray], expected: Optional[int]) -> Tuple[torch.Tensor, List[int], Dict[int, str]]:
+        """Validate rows one at a time, keeping the good ones and reporting the rest"""
+        rows = []
+        row_indices = []
+        row_errors = {}
+        
+        for index, item in enumerate(batch_data):
+            try:
+                row = self._to_array(item)
+                if row.ndim == 2 and row.shape[0] == 1:
+                    row = row[0]
+                if row.ndim != 1:
+                    raise ValueError(f"Expected a flat feature vector, got shape {row.shape}")
+                if expected is None:
+                    expected = row.shape[0]
+                if row.shape[0] != expected:
+                    raise ValueError(f"Expected {expected} features, got {row.shape[0]}")
+            except Exception as e:
+                row_errors[index] = str(e)
+                continue
+            
+            rows.append(row)
+            row_indices.append(index)
+        
+        if row_errors:
+            logger.warning(f"Rejected {len(row_errors)} of {len(batch_data)} batch rows")
+        
+        if not rows:
+            return torch.empty((0, expected or 0)), row_indices, row_errors
+        
+        return torch.from_numpy(np.stack(rows)), row_indices, row_errors
+    
+    def _dict_to_array(self, data_dict: Dict, out: Optional[np.ndarray] = None) -> np.ndarray:
         """Convert dictionary to numpy array"""
-        # Extract values and convert to array
-        # You might need to adjust this based on your data structure
         if 'features' in data_dict:
-            return np.array(data_dict['features'], dtype=np.float32)
-        else:
-            # Use all values if no specific key
-            return np.array(list(data_dict.values()), dtype=np.float32)
+            features = data_dict['features']
+            if out is not None and isinstance(features, List) and self._fill_rows(out, self._as_rows(features)):
+                return out
+            return np.array(features, dtype=np.float32)
+        
+        if self.schema is not None:
+            # Named features, placed by the schema regardless of key order
+            if out is not None and out.shape != (1, self.schema.num_features):
+                out = None
+            array_data, _, row_errors = self.schema.records_to_array([data_dict], out=out)
+            if row_errors:
+                raise ValueError(row_errors[0])
+            return array_data
+        
+        # Without a schema, fall back to the dict's own key order
+        return np.array(list(data_dict.values()), dtype=np.float32)
     
     def _array_to_tensor(self, array_data: np.ndarray, input_size: Any) -> torch.Tensor:
         """Convert array to properly shaped tensor"""
@@ -59,10 +221,10 @@ class DataPreprocessor:
         return tensor_data
     
     def normalize_features(self, features: np.ndarray) -> np.ndarray:
-        """Normalize features (adjust based on your model's needs)"""
-        # Implement normalization logic here
-        # This is a placeholder - adjust based on your data
-        return (features - np.mean(features, axis=0)) / (np.std(features, axis=0) + 1e-8)
+        """Standardize features with the scaler fitted on training data"""
+        if self.scaler is None:
+            raise ValueError("No fitted feature scaler; run 'python main.py fit-scaler' first")
+        return self.scaler.transform(features)
     
     def validate_input_shape(self, tensor: torch.Tensor, expected_size: int) -> bool:
         """Validate input tensor shape"""
@@ -0,0 +1,279 @@
+import os
+import json
+import random
+import logging
+import threading
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from app.utils.feature_scaling import MIN_STD
+
+logger = logging.getLogger(__name__)
+
+# Quantiles reported for every feature, from the reservoir sample
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+# Floor on bin fractions in the stability index, so empty bins don't divide by zero
+PSI_EPSILON = 1e-4
+
+def default_reference_path(model_path: str) -> str:
+    """Reference statistics live next to the model: models/x.pkl -> models/x.reference.json"""
+    return os.path.splitext(model_path)[0] + '.reference.json'
+
+class ReferenceStats:
+    """Per-feature statistics of the training data, saved with the model for drift scoring
+    
+    Besides moments and range, each feature has quantile bin edges and the
+    fraction of training rows in each bin; live traffic is counted into the
+    same bins.
+    """
+    
+    def __init__(self, mean: Any, std: Any, minimum: Any, maximum: Any, edges: Any, fractions: Any, count: int = 0):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        self.minimum = np.asarray(minimum, dtype=np.float64)
+        self.maximum = np.asarray(maximum, dtype=np.float64)
+        self.edges = np.asarray(edges, dtype=np.float32)
+        self.fractions = np.asarray(fractions, dtype=np.float64)
+        self.count = int(count)
+        if self.edges.ndim != 2 or self.edges.shape[0] != self.num_features \
+                or self.fractions.shape != (self.num_features, self.edges.shape[1] + 1):
+            raise ValueError(f"Bin edges {self.edges.shape} and fractions {self.fractions.shape} "
+                             f"don't match {self.num_features} features")
+    
+    @property
+    def num_features(self) -> int:
+        return self.mean.shape[0]
+    
+    @property
+    def bins(self) -> int:
+        return self.fractions.shape[1]
+    
+    def bin_counts(self, rows: np.ndarray) -> np.ndarray:
+        """Count (N, F) rows into each feature's bins in one pass; returns (F, bins)"""
+        bins = self.bins
+        # A value's bin is the number of that feature's edges below it
+        indices = (rows[:, :, None] > self.edges[None, :, :]).sum(axis=2)
+        indices += np.arange(self.num_features) * bins
+        return np.bincount(indices.ravel(), minlength=self.num_features * bins).reshape(self.num_features, bins)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "num_features": self.num_features,
+            "count": self.count,
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+            "min": self.minimum.tolist(),
+            "max": self.maximum.tolist(),
+            "edges": self.edges.tolist(),
+            "fractions": self.fractions.tolist()
+        }
+    
+    def save(self, path: str) -> str:
+        """Write the statistics as JSON, replacing any previous file atomically"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved reference statistics ({self.num_features} features, {self.count} rows): {path}")
+        return path
+    
+    @classmethod
+    def load(cls, path: str) -> "ReferenceStats":
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return cls(data['mean'], data['std'], data['min'], data['max'], data['edges'], data['fractions'],
+                   data.get('count', 0))
+
+class FeatureMonitor:
+    """Running per-feature statistics of incoming model inputs, for spotting drift
+    
+    Each observed batch is reduced with numpy and merged into the running
+    totals: mean and variance with Chan's parallel form of Welford's
+    update, plus min and max. Quantiles come from a uniform reservoir sample
+    of rows (Algorithm R, applied to a whole batch at once). Only a sampled
+    subset of rows is observed; single-row requests skip it with one random
+    draw.
+    
+    With reference statistics, sampled rows are also counted into the
+    reference's quantile bins, so per-feature drift (population stability
+    index and standardized mean shift) is a few array operations when
+    asked for, and never per-row Python.
+    
+    The number of features comes from the reference statistics, or
+    num_features; without either it is taken from the first sampled batch.
+    Batches of any other width are counted as skipped.
+    """
+    
+    def __init__(self, sample_rate: float = 0.1, reservoir_size: int = 2048,
+                 reference: Optional[ReferenceStats] = None, feature_names: Optional[Sequence[str]] = None,
+                 psi_threshold: float = 0.2, num_features: Optional[int] = None, seed: Optional[int] = None):
+        if not 0.0 < sample_rate <= 1.0:
+            raise ValueError(f"sample_rate must be in (0, 1], got {sample_rate}")
+        
+        self.sample_rate = float(sample_rate)
+        self.reservoir_size = max(1, int(reservoir_size))
+        self.reference = reference
+        self.feature_names = list(feature_names) if feature_names else None
+        self.psi_threshold = float(psi_threshold)
+        self._random = random.Random(seed)
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        
+        self.rows_offered = 0
+        self.skipped_rows = 0
+        self.non_finite_rows = 0
+        self.width: Optional[int] = None
+        if reference is not None:
+            self._reset(reference.num_features)
+        elif num_features:
+            self._reset(int(num_features))
+    
+    def _reset(self, width: int) -> None:
+        self.width = width
+        self.count = 0
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.minimum = np.full(width, np.inf)
+        self.maximum = np.full(width, -np.inf)
+        self.reservoir = np.empty((self.reservoir_size, width), dtype=np.float32)
+        self.reservoir_seen = 0
+        self.bin_counts = np.zeros((width, self.reference.bins), dtype=np.int64) if self.reference else None
+    
+    def observe(self, rows: np.ndarray) -> None:
+        """Fold a sample of an (N, F) or (F,) batch of raw inputs into the statistics"""
+        rows = np.asarray(rows)
+        if rows.ndim == 1:
+            rows = rows[None, :]
+        if rows.ndim != 2 or not rows.shape[0]:
+            return
+        if rows.shape[0] == 1 and self._random.random() >= self.sample_rate:
+            with self._lock:
+                self.rows_offered += 1
+            return
+        
+        with self._lock:
+            self.rows_offered += rows.shape[0]
+            if self.width is None:
+                self._reset(rows.shape[1])
+            if rows.shape[1] != self.width:
+                self.skipped_rows += rows.shape[0]
+                return
+            
+            if rows.shape[0] > 1 and self.sample_rate < 1.0:
+                rows = rows[self._rng.random(rows.shape[0]) < self.sample_rate]
+            batch = rows.astype(np.float64)
+            finite = np.isfinite(batch).all(axis=1)
+            if not finite.all():
+                self.non_finite_rows += int(np.count_nonzero(~finite))
+                batch = batch[finite]
+            if not batch.shape[0]:
+                return
+            
+            self._merge_moments(batch)
+            samples = batch.astype(np.float32)
+            self._sample_into_reservoir(samples)
+            if self.bin_counts is not None:
+                self.bin_counts += self.reference.bin_counts(samples)
+    
+    def _merge_moments(self, batch: np.ndarray) -> None:
+        batch_count = batch.shape[0]
+        batch_mean = batch.mean(axis=0)
+        batch_m2 = np.square(batch - batch_mean).sum(axis=0)
+        
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        self.mean += delta * (batch_count / total)
+        self.m2 += batch_m2 + np.square(delta) * (self.count * batch_count / total)
+        self.count = total
+        np.minimum(self.minimum, batch.min(axis=0), out=self.minimum)
+        np.maximum(self.maximum, batch.max(axis=0), out=self.maximum)
+    
+    def _sample_into_reservoir(self, rows: np.ndarray) -> None:
+        """Algorithm R for a whole batch: row i of the stream replaces a random slot with probability size/(i+1)"""
+        size = self.reservoir_size
+        seen = self.reservoir_seen
+        fill = min(max(size - seen, 0), rows.shape[0])
+        if fill:
+            self.reservoir[seen:seen + fill] = rows[:fill]
+        
+        rest = rows[fill:]
+        if rest.shape[0]:
+            positions = seen + fill + np.arange(rest.shape[0])
+            slots = (self._rng.random(rest.shape[0]) * (positions + 1)).astype(np.int64)
+            keep = slots < size
+            self.reservoir[slots[keep]] = rest[keep]
+        self.reservoir_seen = seen + rows.shape[0]
+    
+    def to_reference(self, bins: int = 10) -> ReferenceStats:
+        """Reference statistics from everything observed so far, with quantile bins from the reservoir"""
+        with self._lock:
+            if self.width is None or not self.count:
+                raise ValueError("Cannot build reference statistics from an empty sample")
+            sample = self.reservoir[:min(self.reservoir_seen, self.reservoir_size)]
+            edges = np.quantile(sample, np.linspace(0.0, 1.0, bins + 1)[1:-1], axis=0).T.astype(np.float32)
+            reference = ReferenceStats(
+                self.mean, np.sqrt(self.m2 / self.count), self.minimum, self.maximum,
+                edges, np.zeros((self.width, bins)), self.count
+            )
+            # Near-equal fractions, except where ties (e.g. constant or discrete features) merge bins
+            reference.fractions = reference.bin_counts(sample) / sample.shape[0]
+            return reference
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-feature moments, range, quantiles and (with reference statistics) drift scores"""
+        with self._lock:
+            stats = {
+                "sample_rate": self.sample_rate,
+                "rows_offered": self.rows_offered,
+                "rows_sampled": self.count if self.width is not None else 0,
+                "skipped_rows": self.skipped_rows,
+                "non_finite_rows": self.non_finite_rows,
+                "num_features": self.width,
+                "feature_names": self.feature_names
+            }
+            if self.width is None or not self.count:
+                return stats
+            
+            sample = self.reservoir[:min(self.reservoir_seen, self.reservoir_size)]
+            quantiles = np.quantile(sample, QUANTILES, axis=0)
+            stats.update({
+                "mean": self.mean.tolist(),
+                "std": np.sqrt(self.m2 / self.count).tolist(),
+                "min": self.minimum.tolist(),
+                "max": self.maximum.tolist(),
+                "quantiles": {f"p{round(q * 100):02d}": values.tolist() for q, values in zip(QUANTILES, quantiles)},
+                "drift": self._drift() if self.bin_counts is not None else None
+            })
+            return stats
+    
+    def _drift(self) -> Dict[str, Any]:
+        """Population stability index over the reference bins, and mean shift in reference std units"""
+        reference = self.reference
+        live = np.clip(self.bin_counts / self.count, PSI_EPSILON, None)
+        expected = np.clip(reference.fractions, PSI_EPSILON, None)
+        psi = ((live - expected) * np.log(live / expected)).sum(axis=1)
+        mean_shift = (self.mean - reference.mean) / np.where(reference.std > MIN_STD, reference.std, 1.0)
+        
+        drifted: List[Any] = np.flatnonzero(psi > self.psi_threshold).tolist()
+        if self.feature_names:
+            drifted = [self.feature_names[i] for i in drifted]
+        return {
+            "psi": psi.tolist(),
+            "mean_shift_std": mean_shift.tolist(),
+            "max_psi": float(psi.max()),
+            "psi_threshold": self.psi_threshold,
+            "drifted_features": drifted
+        }
+
+def fit_reference(chunks: Iterable[np.ndarray], bins: int = 10, reservoir_size: int = 100000,
+                  seed: int = 0) -> ReferenceStats:
+    """Compute reference statistics in one streaming pass over (rows, F) training chunks"""
+    monitor = FeatureMonitor(sample_rate=1.0, reservoir_size=reservoir_size, seed=seed)
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if chunk.ndim != 2:
+            raise ValueError(f"Expected (rows, features) chunks, got shape {chunk.shape}")
+        if monitor.width is not None and chunk.shape[1] != monitor.width:
+            raise ValueError(f"Expected {monitor.width} features, got {chunk.shape[1]}")
+        monitor.observe(chunk)
+    return monitor.to_reference(bins)
\ No newline at end of file
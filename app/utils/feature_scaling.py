@@ -0,0 +1,159 @@
+import os
+import json
+import hashlib
+import logging
+import numpy as np
+import torch
+import torch.nn as nn
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Features with a smaller std than this are only centred, not scaled
+MIN_STD = 1e-8
+
+def default_scaler_path(model_path: str) -> str:
+    """Scaler statistics live next to the model: models/x.pkl -> models/x.scaler.json"""
+    return os.path.splitext(model_path)[0] + '.scaler.json'
+
+class FeatureScaler:
+    """Per-feature standardization fitted on training data
+    
+    Standardizing is the affine map x * scale + offset, with scale = 1/std
+    and offset = -mean/std, so it can run as one fused pass or be folded
+    into the model's first Linear layer.
+    """
+    
+    def __init__(self, mean: Any, std: Any, count: int = 0):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        if self.mean.shape != self.std.shape or self.mean.ndim != 1:
+            raise ValueError(f"mean and std must be matching 1-D arrays, got {self.mean.shape} and {self.std.shape}")
+        
+        self.count = int(count)
+        safe_std = np.where(self.std > MIN_STD, self.std, 1.0)
+        self.scale = (1.0 / safe_std).astype(np.float32)
+        self.offset = (-self.mean / safe_std).astype(np.float32)
+        self._tensors: Dict[torch.device, Tuple[torch.Tensor, torch.Tensor]] = {}
+    
+    @property
+    def num_features(self) -> int:
+        return self.mean.shape[0]
+    
+    def digest(self) -> str:
+        """Short hash of the transform, used to version artifacts built with it"""
+        return hashlib.blake2b(self.scale.tobytes() + self.offset.tobytes(), digest_size=8).hexdigest()
+    
+    def transform(self, array: np.ndarray) -> np.ndarray:
+        """Standardize a float32 array in place, copying first if it is read-only or another dtype"""
+        if array.dtype != np.float32 or not array.flags.writeable:
+            # Decoded request bodies are read-only views of the request buffer
+            array = np.array(array, dtype=np.float32)
+        np.multiply(array, self.scale, out=array)
+        np.add(array, self.offset, out=array)
+        return array
+    
+    def transform_tensor(self, tensor: torch.Tensor) -> torch.Tensor:
+        """Standardize a tensor in one fused pass, leaving the input untouched"""
+        tensors = self._tensors.get(tensor.device)
+        if tensors is None:
+            tensors = self._tensors[tensor.device] = (
+                torch.from_numpy(self.scale).to(tensor.device),
+                torch.from_numpy(self.offset).to(tensor.device)
+            )
+        scale, offset = tensors
+        return torch.addcmul(offset, tensor, scale)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "num_features": self.num_features,
+            "count": self.count,
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist()
+        }
+    
+    def save(self, path: str) -> str:
+        """Write the statistics as JSON, replacing any previous file atomically"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved feature scaler ({self.num_features} features, {self.count} rows): {path}")
+        return path
+    
+    @classmethod
+    def load(cls, path: str) -> "FeatureScaler":
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return cls(data['mean'], data['std'], data.get('count', 0))
+
+def fit_scaler(chunks: Iterable[np.ndarray]) -> FeatureScaler:
+    """Fit per-feature mean and std in one streaming pass over (rows, F) chunks
+    
+    Each chunk is reduced in float64 and merged into the running totals with
+    Chan's parallel update, so the training file never has to fit in memory.
+    """
+    count = 0
+    mean = None
+    m2 = None
+    
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim != 2:
+            raise ValueError(f"Expected (rows, features) chunks, got shape {chunk.shape}")
+        if not chunk.shape[0]:
+            continue
+        
+        chunk_count = chunk.shape[0]
+        chunk_mean = chunk.mean(axis=0)
+        chunk_m2 = np.square(chunk - chunk_mean).sum(axis=0)
+        
+        if mean is None:
+            count, mean, m2 = chunk_count, chunk_mean, chunk_m2
+            continue
+        if chunk.shape[1] != mean.shape[0]:
+            raise ValueError(f"Expected {mean.shape[0]} features, got {chunk.shape[1]}")
+        
+        total = count + chunk_count
+        delta = chunk_mean - mean
+        mean = mean + delta * (chunk_count / total)
+        m2 = m2 + chunk_m2 + np.square(delta) * (count * chunk_count / total)
+        count = total
+    
+    if mean is None:
+        raise ValueError("Cannot fit a feature scaler on an empty input")
+    
+    return FeatureScaler(mean, np.sqrt(m2 / count), count)
+
+def first_linear_layer(model: nn.Module) -> Optional[nn.Linear]:
+    """The Linear layer that sees the raw model input, if the model is a Sequential chain"""
+    module = model
+    while isinstance(module, nn.Sequential) and len(module):
+        module = module[0]
+    return module if isinstance(module, nn.Linear) else None
+
+def fold_into_linear(model: nn.Module, scaler: FeatureScaler) -> bool:
+    """Fold the scaler into the model's first Linear layer so it costs nothing per request
+    
+    W(x * scale + offset) + b == (W * scale)x + (W @ offset + b). Only models
+    whose input goes straight into a Linear layer can be folded; for anything
+    else this returns False and the caller applies the transform itself.
+    """
+    layer = first_linear_layer(model)
+    if layer is None or layer.in_features != scaler.num_features:
+        return False
+    
+    with torch.no_grad():
+        weight = layer.weight.detach().double()
+        scale = torch.from_numpy(scaler.scale).to(weight.device, torch.float64)
+        offset = torch.from_numpy(scaler.offset).to(weight.device, torch.float64)
+        bias = weight @ offset
+        if layer.bias is not None:
+            bias = bias + layer.bias.detach().double()
+        
+        # New parameters rather than in-place writes: the weights may be memory-mapped
+        layer.weight = nn.Parameter((weight * scale).to(layer.weight.dtype), requires_grad=False)
+        layer.bias = nn.Parameter(bias.to(layer.weight.dtype), requires_grad=False)
+    
+    return True
\ No newline at end of file
@@ -0,0 +1,131 @@
+import math
+import logging
+import yaml
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DTYPES = ('float', 'int', 'bool')
+
+class FeatureSchema:
+    """Declared named features, compiled once into a name -> column index
+    
+    Each feature has a name, an optional default (features without one are
+    required) and a dtype. Records are dicts of feature name to value, in
+    any key order.
+    """
+    
+    def __init__(self, features: Sequence[Dict[str, Any]]):
+        if not features:
+            raise ValueError("A feature schema needs at least one feature")
+        
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.dtypes: List[str] = []
+        defaults = []
+        
+        for column, feature in enumerate(features):
+            name = feature.get('name')
+            dtype = feature.get('dtype', 'float')
+            if not name:
+                raise ValueError(f"Feature {column} has no name")
+            if name in self.index:
+                raise ValueError(f"Duplicate feature name '{name}'")
+            if dtype not in DTYPES:
+                raise ValueError(f"Feature '{name}' has unknown dtype '{dtype}', expected one of {DTYPES}")
+            
+            self.names.append(name)
+            self.index[name] = column
+            self.dtypes.append(dtype)
+            default = feature.get('default')
+            defaults.append(math.nan if default is None else float(default))
+        
+        # One template row: defaults, with NaN marking required features
+        self.defaults = np.array(defaults, dtype=np.float32)
+        self.required_columns = np.flatnonzero(np.isnan(self.defaults))
+        self.integral_columns = np.array([i for i, dtype in enumerate(self.dtypes) if dtype != 'float'], dtype=np.intp)
+        self.bool_columns = np.array([i for i, dtype in enumerate(self.dtypes) if dtype == 'bool'], dtype=np.intp)
+    
+    @property
+    def num_features(self) -> int:
+        return len(self.names)
+    
+    @classmethod
+    def load(cls, path: str) -> "FeatureSchema":
+        """Load a schema from a YAML (or JSON) file with a top-level 'features' list"""
+        with open(path, 'r') as f:
+            data = yaml.safe_load(f) or {}
+        schema = cls(data.get('features') or [])
+        logger.info(f"Loaded feature schema with {schema.num_features} features: {path}")
+        return schema
+    
+    def records_to_array(self, records: Sequence[Any],
+                         out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, List[int], Dict[int, str]]:
+        """Convert named-feature records into an (N, F) float32 array in one pass
+        
+        Values are written straight into a preallocated array (or out, if
+        given) prefilled with the defaults. Records with unknown keys,
+        non-numeric values, missing required features or values that don't
+        fit their dtype are rejected.
+        
+        Returns the array of accepted rows, their record indices, and an
+        error message for every rejected record.
+        """
+        num_rows = len(records)
+        width = self.num_features
+        if out is None:
+            out = np.empty((num_rows, width), dtype=np.float32)
+        elif out.shape != (num_rows, width) or out.dtype != np.float32 or not out.flags.c_contiguous:
+            raise ValueError(f"out must be a C-contiguous float32 array of shape {(num_rows, width)}")
+        out[:] = self.defaults
+        
+        # Scalar writes through a flat memoryview skip numpy's per-item indexing overhead
+        flat = memoryview(out.reshape(-1))
+        index = self.index
+        row_errors: Dict[int, str] = {}
+        
+        for row, record in enumerate(records):
+            if not isinstance(record, dict):
+                row_errors[row] = f"Expected a feature record, got {type(record).__name__}"
+                continue
+            
+            base = row * width
+            for name, value in record.items():
+                column = index.get(name)
+                if column is None:
+                    row_errors[row] = f"Unknown feature '{name}'"
+                    break
+                try:
+                    flat[base + column] = float(value)
+                except (TypeError, ValueError):
+                    row_errors[row] = f"Feature '{name}' is not numeric: {value!r}"
+                    break
+        
+        self._check_columns(out, row_errors)
+        
+        if not row_errors:
+            return out, list(range(num_rows)), row_errors
+        
+        row_indices = [row for row in range(num_rows) if row not in row_errors]
+        return out[row_indices], row_indices, row_errors
+    
+    def _check_columns(self, array: np.ndarray, row_errors: Dict[int, str]) -> None:
+        """Reject rows with missing required features or non-integral int/bool values, column-wise"""
+        if self.required_columns.size:
+            missing = np.isnan(array[:, self.required_columns])
+            for row in np.flatnonzero(missing.any(axis=1)):
+                if row not in row_errors:
+                    names = [self.names[self.required_columns[i]] for i in np.flatnonzero(missing[row])]
+                    row_errors[int(row)] = f"Missing required features: {', '.join(names)}"
+        
+        if self.integral_columns.size:
+            values = array[:, self.integral_columns]
+            bad = values != np.floor(values)
+            if self.bool_columns.size:
+                bools = array[:, self.bool_columns]
+                bad[:, np.isin(self.integral_columns, self.bool_columns)] |= (bools != 0) & (bools != 1)
+            for row in np.flatnonzero(bad.any(axis=1)):
+                if row not in row_errors:
+                    name = self.names[self.integral_columns[np.flatnonzero(bad[row])[0]]]
+                    row_errors[int(row)] = f"Feature '{name}' must be {self.dtypes[self.index[name]]}-valued"
\ No newline at end of file
@@ -0,0 +1,212 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from 100us to 10s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+
+# Every metric created below registers itself here, in render order
+REGISTRY: List["_Metric"] = []
+
+# Stage timings collected for the current request (None outside a request)
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar('request_timings', default=None)
+
+# Called with each stage name on entry while a profiler capture is armed; may return
+# a context manager (e.g. a trace span) to wrap the stage in. None the rest of the time.
+_stage_hook: Optional[Callable[[str], Any]] = None
+
+class _Metric:
+    kind = ''
+    
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+    
+    def _labels(self, label_values: Tuple[str, ...]) -> str:
+        if not self.label_names:
+            return ''
+        pairs = ','.join(f'{name}="{value}"' for name, value in zip(self.label_names, label_values))
+        return '{' + pairs + '}'
+    
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels"""
+    kind = 'counter'
+    
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()):
+        super().__init__(name, description, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+    
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{self._labels(label_values)} {value}")
+        return lines
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    kind = 'gauge'
+    
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._value = 0.0
+    
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+    
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+    
+    def set(self, value: float) -> None:
+        self._value = value
+    
+    def value(self) -> float:
+        return self._value
+    
+    def render(self) -> List[str]:
+        return super().render() + [f"{self.name} {self._value}"]
+
+class Histogram(_Metric):
+    """Bucketed distribution with sum and count, optionally split by labels"""
+    kind = 'histogram'
+    
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+    
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+    
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            snapshot = {labels: (list(series[0]), series[1], series[2]) for labels, series in self._series.items()}
+        
+        for label_values, (counts, total, count) in sorted(snapshot.items()):
+            labels = self._labels(label_values)
+            prefix = labels[:-1] + ',' if labels else '{'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{prefix}le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+REQUEST_LATENCY = Histogram('cyber_sentinel_request_seconds', 'HTTP request latency', ('endpoint',))
+REQUESTS = Counter('cyber_sentinel_requests_total', 'HTTP requests by endpoint and status', ('endpoint', 'status'))
+REQUESTS_IN_FLIGHT = Gauge('cyber_sentinel_requests_in_flight', 'HTTP requests currently being handled')
+STAGE_LATENCY = Histogram('cyber_sentinel_stage_seconds', 'Latency of each serving stage', ('stage',))
+STAGE_ERRORS = Counter('cyber_sentinel_stage_errors_total', 'Exceptions raised per serving stage', ('stage',))
+FORWARD_BATCH_SIZE = Histogram('cyber_sentinel_forward_batch_size', 'Rows per model forward pass',
+                               buckets=BATCH_SIZE_BUCKETS)
+ROWS_SCORED = Counter('cyber_sentinel_rows_scored_total', 'Rows passed through the model')
+ADMISSION_REJECTED = Counter('cyber_sentinel_admission_rejected_total', 'Requests shed by admission control',
+                             ('reason',))
+ADMITTED_ROWS_IN_FLIGHT = Gauge('cyber_sentinel_admitted_rows_in_flight', 'Rows admitted and not yet answered')
+MODEL_LATENCY = Histogram('cyber_sentinel_shadow_model_seconds',
+                          'Primary and shadow model latency on the same sampled requests', ('model',))
+SHADOW_DROPPED = Counter('cyber_sentinel_shadow_dropped_total', 'Sampled shadow requests dropped under load',
+                         ('reason',))
+
+class stage:
+    """Time a block as a named serving stage
+    
+        with stage('preprocess'):
+            ...
+    
+    The duration goes into the stage latency histogram and, inside a
+    request, into that request's Server-Timing header.
+    """
+    __slots__ = ('name', 'start', 'span')
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.span = None
+    
+    def __enter__(self) -> "stage":
+        if _stage_hook is not None:
+            self.span = _stage_hook(self.name)
+            if self.span is not None:
+                self.span.__enter__()
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = time.perf_counter() - self.start
+        if self.span is not None:
+            self.span.__exit__(exc_type, exc, tb)
+        STAGE_LATENCY.observe(elapsed, self.name)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(self.name)
+        
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.name, elapsed))
+        return False
+
+def set_stage_hook(hook: Optional[Callable[[str], Any]]) -> None:
+    """Install (or with None, remove) the stage-entry hook"""
+    global _stage_hook
+    _stage_hook = hook
+
+def start_request_timings() -> None:
+    """Begin collecting stage timings for the current request"""
+    _request_timings.set([])
+
+def pop_request_timings() -> List[Tuple[str, float]]:
+    """Return and stop collecting the current request's stage timings"""
+    timings = _request_timings.get() or []
+    _request_timings.set(None)
+    return timings
+
+def format_server_timing(timings: List[Tuple[str, float]], total: Optional[float] = None) -> str:
+    """Format stage timings as a Server-Timing header, summing repeated stages"""
+    durations: Dict[str, float] = {}
+    for name, elapsed in timings:
+        durations[name] = durations.get(name, 0.0) + elapsed
+    if total is not None:
+        durations['total'] = total
+    
+    return ', '.join(f"{name};dur={elapsed * 1000:.3f}" for name, elapsed in durations.items())
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
\ No newline at end of file
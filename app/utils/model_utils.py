@@ -1,12 +1,17 @@
 import torch
-import numpy as np
+import inspect
 import logging
-from typing import Dict, Any
+import os
+import zipfile
+from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
-def get_device_info() -> Dict[str, Any]:
-    """Get information about available computing devices"""
+# Keyword arguments this torch version's torch.load accepts (weights_only: 1.13+, mmap: 2.1+)
+TORCH_LOAD_PARAMETERS = frozenset(inspect.signature(torch.load).parameters)
+
+def get_device_info(topology: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Get information about available computing devices, plus the CPU layout if given"""
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
     device_info = {
         'device': str(device),
@@ -22,8 +27,67 @@ def get_device_info() -> Dict[str, Any]:
             'memory_cached': torch.cuda.memory_reserved()
         })
     
+    if topology is not None:
+        device_info['topology'] = topology
+    
     return device_info
 
+def get_process_memory() -> Dict[str, float]:
+    """Resident memory of this process in MB
+    
+    On Linux this is split into file-backed pages (shared between processes
+    that map the same file, e.g. memory-mapped model weights) and anonymous
+    pages private to this process.
+    """
+    fields = {'VmRSS': 'rss_mb', 'RssAnon': 'rss_anon_mb', 'RssFile': 'rss_file_mb', 'RssShmem': 'rss_shmem_mb'}
+    memory = {}
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in fields:
+                    memory[fields[key]] = int(value.split()[0]) / 1024
+    except OSError:
+        import resource
+        import sys
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        memory['max_rss_mb'] = max_rss / 1024 ** 2 if sys.platform == 'darwin' else max_rss / 1024
+    
+    return memory
+
+def mmap_unavailable_reason(path: str) -> Optional[str]:
+    """Why a checkpoint can't be loaded with mmap=True, or None if it can"""
+    if 'mmap' not in TORCH_LOAD_PARAMETERS:
+        return f"torch {torch.__version__} can't memory-map checkpoints"
+    if not zipfile.is_zipfile(path):
+        return "the checkpoint is in torch's legacy format (see save_mmap_compatible)"
+    return None
+
+def load_pickled_model(path: str, map_location: Any = 'cpu', mmap: bool = False) -> torch.nn.Module:
+    """torch.load a whole pickled module
+    
+    torch >= 2.6 defaults to weights_only=True, which refuses full modules,
+    and torch < 1.13 doesn't know the argument at all. Errors from loading
+    the file itself are raised as they are.
+    """
+    kwargs = {'weights_only': False} if 'weights_only' in TORCH_LOAD_PARAMETERS else {}
+    if mmap:
+        kwargs['mmap'] = True
+    return torch.load(path, map_location=map_location, **kwargs)
+
+def save_mmap_compatible(model_path: str, output_path: str) -> bool:
+    """Re-save a model in torch's zip format so it can be loaded with mmap=True"""
+    try:
+        model = load_pickled_model(model_path)
+        torch.save(model, output_path, _use_new_zipfile_serialization=True)
+        logger.info(f"Saved mmap-compatible model: {output_path} ({os.path.getsize(output_path) / 1024 ** 2:.1f} MB)")
+        return True
+    
+    except Exception as e:
+        logger.error(f"Model conversion failed: {e}")
+        return False
+
 def optimize_model_performance(model: torch.nn.Module) -> torch.nn.Module:
     """Apply performance optimizations to the model"""
     # Enable cuDNN auto-tuner
@@ -71,10 +135,17 @@ def calculate_model_size(model: torch.nn.Module) -> Dict[str, float]:
     for buffer in model.buffers():
         buffer_size += buffer.nelement() * buffer.element_size()
     
-    size_all_mb = (param_size + buffer_size) / 1024**2
+    # Dynamically quantized layers keep their weights in packed params, outside parameters()
+    packed_size = 0
+    for value in model.state_dict().values():
+        if isinstance(value, (tuple, list)):
+            packed_size += sum(t.nelement() * t.element_size() for t in value if isinstance(t, torch.Tensor))
+    
+    size_all_mb = (param_size + buffer_size + packed_size) / 1024**2
     
     return {
         'parameters_mb': param_size / 1024**2,
         'buffers_mb': buffer_size / 1024**2,
+        'packed_mb': packed_size / 1024**2,
         'total_mb': size_all_mb
     }
\ No newline at end of file
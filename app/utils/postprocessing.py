@@ -0,0 +1,120 @@
+import logging
+import numpy as np
+from typing import Any, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ACTIVATIONS = ('none', 'softmax', 'sigmoid')
+MAX_PRECISION = 10
+
+class PostProcessing:
+    """Per-request reduction of raw model outputs before they are serialized
+    
+    Every step runs on the whole (N, C) output array at once:
+    
+    - activation: 'softmax' or 'sigmoid' over the output columns
+    - top_k: keep the k best columns per row; predictions become their
+      indices and the values move to a separate scores array (argmax is top_k=1)
+    - threshold: with top_k, labels scoring below it become -1; without,
+      every output becomes a 0/1 flag
+    - precision: round scores to this many decimal places
+    - include_model_info: whether the response carries model_info
+    """
+    __slots__ = ('activation', 'top_k', 'threshold', 'precision', 'include_model_info')
+    
+    def __init__(self, activation: str = 'none', top_k: int = 0, threshold: Optional[float] = None,
+                 precision: Optional[int] = None, include_model_info: bool = True):
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unknown activation '{activation}', expected one of {ACTIVATIONS}")
+        if top_k < 0:
+            raise ValueError(f"top_k must be positive, got {top_k}")
+        if precision is not None and not 0 <= precision <= MAX_PRECISION:
+            raise ValueError(f"precision must be between 0 and {MAX_PRECISION}, got {precision}")
+        
+        self.activation = activation
+        self.top_k = top_k
+        self.threshold = threshold
+        self.precision = precision
+        self.include_model_info = include_model_info
+    
+    def apply(self, outputs: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Post-process model outputs, returning (predictions, scores)
+        
+        scores is None unless top_k is set. The input array is never
+        modified, since it may be shared with the prediction cache.
+        """
+        scores = self._activate(outputs)
+        
+        if self.top_k:
+            labels, scores = self._top_k(scores)
+            if self.threshold is not None:
+                labels = np.where(scores >= self.threshold, labels, -1)
+            return labels, self._round(scores)
+        
+        if self.threshold is not None:
+            return (scores >= self.threshold).astype(np.int8), None
+        return self._round(scores), None
+    
+    def _activate(self, outputs: np.ndarray) -> np.ndarray:
+        if self.activation == 'none':
+            return outputs
+        
+        # One copy, then in-place ufuncs
+        scores = np.array(outputs, dtype=np.float32)
+        with np.errstate(over='ignore'):
+            if self.activation == 'softmax':
+                scores -= scores.max(axis=-1, keepdims=True)
+                np.exp(scores, out=scores)
+                scores /= scores.sum(axis=-1, keepdims=True)
+            else:
+                np.negative(scores, out=scores)
+                np.exp(scores, out=scores)
+                scores += 1.0
+                np.reciprocal(scores, out=scores)
+        return scores
+    
+    def _top_k(self, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and values of the k highest scores per row, best first"""
+        if self.top_k == 1:
+            labels = scores.argmax(axis=-1)
+            return labels, np.take_along_axis(scores, labels[..., None], axis=-1)[..., 0]
+        
+        k = min(self.top_k, scores.shape[-1])
+        # Partition first so only k values per row are fully sorted
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=-1)
+        order = np.argsort(-candidate_scores, axis=-1, kind='stable')
+        return np.take_along_axis(candidates, order, axis=-1), np.take_along_axis(candidate_scores, order, axis=-1)
+    
+    def _round(self, scores: np.ndarray) -> np.ndarray:
+        if self.precision is None:
+            return scores
+        # Rounded in float64 so the values print as short decimals
+        return np.round(scores.astype(np.float64), self.precision)
+
+def parse_options(params: Mapping[str, Any]) -> Optional[PostProcessing]:
+    """Build post-processing options from request query parameters
+    
+    Recognized parameters are activation, top_k, argmax, threshold, precision
+    and model_info. Returns None when none of them are given, so the response
+    keeps its full shape; raises ValueError for invalid values.
+    """
+    if not any(name in params for name in ('activation', 'top_k', 'argmax', 'threshold', 'precision', 'model_info')):
+        return None
+    
+    try:
+        top_k = int(params.get('top_k') or 0)
+        if str(params.get('argmax', 'false')).lower() == 'true':
+            top_k = 1
+        threshold = params.get('threshold')
+        precision = params.get('precision')
+        
+        return PostProcessing(
+            activation=str(params.get('activation') or 'none').lower(),
+            top_k=top_k,
+            threshold=float(threshold) if threshold not in (None, '') else None,
+            precision=int(precision) if precision not in (None, '') else None,
+            include_model_info=str(params.get('model_info', 'true')).lower() == 'true'
+        )
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid post-processing options: {e}")
\ No newline at end of file
@@ -0,0 +1,100 @@
+import os
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Layout applied to this process by apply_worker_topology, if any
+_applied: Optional[Dict[str, Any]] = None
+
+def available_cpus() -> List[int]:
+    """CPUs this process is allowed to run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+# Captured at import (in the server master, before any worker pins itself)
+_machine_cpus = available_cpus()
+
+def plan_topology(workers: int, cpus: Optional[List[int]] = None,
+                  intra_op_threads: Optional[int] = None,
+                  interop_threads: int = 1) -> List[Dict[str, Any]]:
+    """Split the available CPUs into one contiguous block per worker
+    
+    Each worker gets an intra-op thread count equal to its share of cores
+    (unless intra_op_threads is given), so the workers together never ask
+    for more threads than there are cores. With more workers than cores,
+    cores are shared round-robin and each worker runs single-threaded.
+    """
+    cpus = cpus if cpus is not None else _machine_cpus
+    workers = max(1, int(workers))
+    layout = []
+    
+    if workers > len(cpus):
+        for index in range(workers):
+            layout.append({"worker": index, "cpus": [cpus[index % len(cpus)]]})
+    else:
+        base, extra = divmod(len(cpus), workers)
+        start = 0
+        for index in range(workers):
+            size = base + (1 if index < extra else 0)
+            layout.append({"worker": index, "cpus": cpus[start:start + size]})
+            start += size
+    
+    for slot in layout:
+        slot["intra_op_threads"] = intra_op_threads or len(slot["cpus"])
+        slot["interop_threads"] = max(1, int(interop_threads))
+    
+    return layout
+
+def apply_worker_topology(worker_index: int, workers: int, pin_cpus: bool = False,
+                          intra_op_threads: Optional[int] = None,
+                          interop_threads: int = 1) -> Dict[str, Any]:
+    """Set this worker's torch thread counts and optionally pin it to its CPU block
+    
+    Call this in a freshly forked worker, before it runs any inference:
+    torch only accepts an inter-op thread count before its first parallel op.
+    """
+    global _applied
+    layout = plan_topology(workers, intra_op_threads=intra_op_threads, interop_threads=interop_threads)
+    slot = dict(layout[worker_index % len(layout)])
+    
+    # Picked up by OpenMP/MKL if torch hasn't been imported yet
+    os.environ['OMP_NUM_THREADS'] = str(slot["intra_op_threads"])
+    os.environ['MKL_NUM_THREADS'] = str(slot["intra_op_threads"])
+    
+    import torch
+    torch.set_num_threads(slot["intra_op_threads"])
+    try:
+        torch.set_num_interop_threads(slot["interop_threads"])
+    except RuntimeError as e:
+        logger.warning(f"Could not set inter-op threads: {e}")
+    
+    slot["pinned"] = False
+    if pin_cpus and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, slot["cpus"])
+            slot["pinned"] = True
+        except OSError as e:
+            logger.warning(f"Could not pin worker {worker_index} to CPUs {slot['cpus']}: {e}")
+    
+    slot["workers"] = workers
+    slot["pid"] = os.getpid()
+    _applied = slot
+    logger.info(f"Worker topology: {slot}")
+    return slot
+
+def get_topology_info(workers: int, intra_op_threads: Optional[int] = None,
+                      interop_threads: int = 1) -> Dict[str, Any]:
+    """Planned CPU layout for all workers, plus what this process applied"""
+    info = {
+        "available_cpus": len(_machine_cpus),
+        "workers": workers,
+        "layout": plan_topology(workers, intra_op_threads=intra_op_threads, interop_threads=interop_threads),
+        "applied": _applied
+    }
+    
+    import torch
+    info["torch_threads"] = torch.get_num_threads()
+    info["torch_interop_threads"] = torch.get_num_interop_threads()
+    return info
\ No newline at end of file
@@ -0,0 +1,394 @@
+import io
+import json
+import struct
+import numpy as np
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+JSON = 'application/json'
+OCTET_STREAM = 'application/octet-stream'
+NPY = 'application/x-npy'
+MSGPACK = 'application/msgpack'
+
+BINARY_FORMATS = (OCTET_STREAM, NPY, MSGPACK)
+SUPPORTED_FORMATS = (JSON,) + BINARY_FORMATS
+
+# Streaming formats: one JSON record per line, or length-prefixed float32 frames
+NDJSON = 'application/x-ndjson'
+FRAMES = 'application/x-float32-frames'
+STREAM_FORMATS = (NDJSON, FRAMES)
+
+# Alternative spellings clients send for the same formats
+MIMETYPE_ALIASES = {
+    'application/npy': NPY,
+    'application/x-msgpack': MSGPACK,
+    'application/vnd.msgpack': MSGPACK,
+    'application/ndjson': NDJSON,
+    'application/jsonl': NDJSON
+}
+
+# Raw float32 bodies carry their shape in a header, e.g. "X-Shape: 32,100"
+SHAPE_HEADER = 'X-Shape'
+DTYPE_HEADER = 'X-Dtype'
+RAW_DTYPE = np.dtype('<f4')
+
+# Raw and .npy batch responses hold only the accepted rows; these headers say
+# which request rows were rejected (comma-separated indices) and how many
+REJECTED_ROWS_HEADER = 'X-Rejected-Rows'
+ROW_ERRORS_HEADER = 'X-Row-Errors'
+# Longer index lists don't fit in a header proxies will pass on (nginx buffers 4KB by default)
+MAX_REJECTED_ROWS_HEADER_BYTES = 4096
+
+# Each frame is a little-endian uint32 byte length followed by one float32 row
+FRAME_HEADER = struct.Struct('<I')
+
+class RowErrorsTooLarge(ValueError):
+    """Raised when a raw or .npy response can't say which rows were rejected"""
+
+def normalize_mimetype(mimetype: Optional[str]) -> str:
+    """Map a mimetype alias onto its canonical name"""
+    mimetype = (mimetype or '').lower()
+    return MIMETYPE_ALIASES.get(mimetype, mimetype)
+
+def is_binary(mimetype: Optional[str]) -> bool:
+    """Check whether a mimetype is one of the binary wire formats"""
+    return normalize_mimetype(mimetype) in BINARY_FORMATS
+
+def parse_shape(shape_header: str) -> Tuple[int, ...]:
+    """Parse a shape header such as '32,100' or '32x100'"""
+    try:
+        return tuple(int(dim) for dim in shape_header.replace('x', ',').split(',') if dim.strip())
+    except ValueError:
+        raise ValueError(f"Invalid {SHAPE_HEADER} header: {shape_header!r}")
+
+def decode_body(body: bytes, mimetype: str, key: str, shape_header: Optional[str] = None) -> Any:
+    """Decode a binary request body into model input
+    
+    Raw float32 and .npy bodies are wrapped with np.frombuffer, so the
+    returned array is a read-only view over the request bytes.
+    """
+    mimetype = normalize_mimetype(mimetype)
+    if mimetype == OCTET_STREAM:
+        return decode_raw(body, shape_header)
+    elif mimetype == NPY:
+        return decode_npy(body)
+    elif mimetype == MSGPACK:
+        return decode_msgpack(body, key)
+    else:
+        raise ValueError(f"Unsupported content type: {mimetype}")
+
+def decode_raw(body: bytes, shape_header: Optional[str] = None) -> np.ndarray:
+    """Decode little-endian float32 bytes"""
+    if len(body) % RAW_DTYPE.itemsize:
+        raise ValueError(f"Body length {len(body)} is not a multiple of {RAW_DTYPE.itemsize} bytes")
+    
+    array = np.frombuffer(body, dtype=RAW_DTYPE)
+    if shape_header:
+        shape = parse_shape(shape_header)
+        if int(np.prod(shape)) != array.size:
+            raise ValueError(f"{SHAPE_HEADER} {shape} does not match {array.size} float32 values")
+        array = array.reshape(shape)
+    
+    return array
+
+def decode_npy(body: bytes) -> np.ndarray:
+    """Decode a .npy file body without copying the array data"""
+    stream = io.BytesIO(body)
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    else:
+        return np.load(io.BytesIO(body), allow_pickle=False)
+    
+    if dtype.hasobject:
+        raise ValueError("Object arrays are not accepted")
+    
+    count = int(np.prod(shape))
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+    if fortran_order:
+        return array.reshape(shape[::-1]).T
+    return array.reshape(shape)
+
+def decode_msgpack(body: bytes, key: str) -> Any:
+    """Decode a msgpack map; binary values are read as float32 with an optional 'shape'"""
+    if msgpack is None:
+        raise ValueError("msgpack support requires the 'msgpack' package")
+    
+    payload = msgpack.unpackb(body, raw=False)
+    if not isinstance(payload, dict) or key not in payload:
+        raise ValueError(f"msgpack body must be a map with an '{key}' key")
+    
+    value = payload[key]
+    if isinstance(value, (bytes, bytearray)):
+        try:
+            dtype = np.dtype(payload.get('dtype', '<f4'))
+        except TypeError:
+            raise ValueError(f"Invalid msgpack dtype: {payload.get('dtype')!r}")
+        array = np.frombuffer(value, dtype=dtype)
+        if 'shape' in payload:
+            try:
+                array = array.reshape(tuple(payload['shape']))
+            except TypeError:
+                raise ValueError(f"Invalid msgpack shape: {payload['shape']!r}")
+        return array
+    
+    return value
+
+def encode_result(result: Dict[str, Any], key: str, mimetype: str) -> Tuple[bytes, Dict[str, str]]:
+    """Encode the array under result[key] in a binary format
+    
+    Returns the response body and any headers describing it. Only msgpack
+    carries the rest of the result dict; raw and .npy bodies hold the array
+    alone, so rejected rows are listed in the X-Rejected-Rows header (output
+    row i belongs to the i-th request row not listed there). Raises
+    RowErrorsTooLarge when that list is too long for a header.
+    """
+    mimetype = normalize_mimetype(mimetype)
+    array = np.ascontiguousarray(result[key], dtype=RAW_DTYPE)
+    headers = {
+        SHAPE_HEADER: ','.join(str(dim) for dim in array.shape),
+        DTYPE_HEADER: 'float32'
+    }
+    
+    errors = result.get('errors')
+    if errors and mimetype in (OCTET_STREAM, NPY):
+        rejected = ','.join(str(error['index']) for error in errors)
+        if len(rejected) > MAX_REJECTED_ROWS_HEADER_BYTES:
+            raise RowErrorsTooLarge(f"{len(errors)} rows were rejected, too many to list in a "
+                                    f"{REJECTED_ROWS_HEADER} header; use JSON or msgpack")
+        headers[REJECTED_ROWS_HEADER] = rejected
+        headers[ROW_ERRORS_HEADER] = str(len(errors))
+    
+    if mimetype == OCTET_STREAM:
+        return array.tobytes(), headers
+    elif mimetype == NPY:
+        buffer = io.BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+        return buffer.getvalue(), headers
+    elif mimetype == MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack support requires the 'msgpack' package")
+        payload = {name: value.tolist() if isinstance(value, np.ndarray) else value
+                   for name, value in result.items() if name != key}
+        payload.update({key: array.tobytes(), 'shape': list(array.shape), 'dtype': '<f4'})
+        return msgpack.packb(payload, use_bin_type=True), headers
+    else:
+        raise ValueError(f"Unsupported response type: {mimetype}")
+
+def iter_ndjson_records(stream, max_record_bytes: int) -> Iterator[Any]:
+    """Read newline-delimited JSON records from a stream one line at a time
+    
+    Records that can't be parsed are yielded as ValueError instances so the
+    caller can report them against their position in the stream.
+    """
+    while True:
+        line = stream.readline(max_record_bytes + 1)
+        if not line:
+            break
+        
+        if len(line) > max_record_bytes and not line.endswith(b'\n'):
+            # Skip the rest of an oversized record without buffering it
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_record_bytes)
+            yield ValueError(f"Record exceeds {max_record_bytes} bytes")
+            continue
+        
+        line = line.strip()
+        if line:
+            yield parse_ndjson_record(line)
+
+def parse_ndjson_record(line: bytes) -> Any:
+    """Parse one NDJSON line, returning a ValueError instance if it isn't valid JSON"""
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON record: {e}")
+
+def iter_frame_records(stream, max_record_bytes: int) -> Iterator[Any]:
+    """Read length-prefixed float32 frames from a stream one row at a time"""
+    while True:
+        header = _read_exact(stream, FRAME_HEADER.size)
+        if not header:
+            break
+        if len(header) < FRAME_HEADER.size:
+            yield ValueError("Truncated frame header")
+            break
+        
+        (length,) = FRAME_HEADER.unpack(header)
+        if length > max_record_bytes or length % RAW_DTYPE.itemsize:
+            yield ValueError(f"Invalid frame length {length}")
+            if _skip(stream, length) < length:
+                break
+            continue
+        
+        payload = _read_exact(stream, length)
+        if len(payload) < length:
+            yield ValueError("Truncated frame")
+            break
+        
+        yield np.frombuffer(payload, dtype=RAW_DTYPE)
+
+def _read_exact(stream, size: int) -> bytes:
+    """Read up to size bytes, stopping early only at end of stream"""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        data = stream.read(remaining)
+        if not data:
+            break
+        chunks.append(data)
+        remaining -= len(data)
+    
+    return b''.join(chunks)
+
+def _skip(stream, size: int) -> int:
+    """Discard up to size bytes in bounded reads, returning how many were skipped"""
+    skipped = 0
+    while skipped < size:
+        data = stream.read(min(size - skipped, 1 << 16))
+        if not data:
+            break
+        skipped += len(data)
+    
+    return skipped
+
+class NdjsonRecordReader:
+    """Split NDJSON body data into lines as it arrives, for readers that can't block
+    
+    feed() returns the lines completed so far and close() any last unterminated
+    one; oversized lines come back as ValueError instances, as from
+    iter_ndjson_records. parse_ndjson_record() turns a line into its record.
+    """
+    
+    def __init__(self, max_record_bytes: int):
+        self.max_record_bytes = max_record_bytes
+        self._buffer = bytearray()
+        self._skipping = False
+    
+    def feed(self, data: bytes) -> List[Any]:
+        self._buffer += data
+        lines = []
+        while True:
+            end = self._buffer.find(b'\n')
+            if end < 0:
+                if len(self._buffer) > self.max_record_bytes:
+                    # Drop the rest of an oversized record without buffering it
+                    if not self._skipping:
+                        lines.append(ValueError(f"Record exceeds {self.max_record_bytes} bytes"))
+                        self._skipping = True
+                    self._buffer.clear()
+                return lines
+            
+            line = bytes(self._buffer[:end])
+            del self._buffer[:end + 1]
+            if self._skipping:
+                self._skipping = False
+            elif len(line) > self.max_record_bytes:
+                lines.append(ValueError(f"Record exceeds {self.max_record_bytes} bytes"))
+            elif line.strip():
+                lines.append(line.strip())
+    
+    def close(self) -> List[Any]:
+        line = bytes(self._buffer).strip()
+        self._buffer.clear()
+        return [line] if line and not self._skipping else []
+    
+    @staticmethod
+    def decode(record: Any) -> Any:
+        return record if isinstance(record, Exception) else parse_ndjson_record(record)
+
+class FrameRecordReader:
+    """Split length-prefixed frame data into payloads as it arrives, for readers that can't block
+    
+    The counterpart of iter_frame_records: feed() returns the frames completed
+    so far and close() reports a truncated last frame.
+    """
+    
+    def __init__(self, max_record_bytes: int):
+        self.max_record_bytes = max_record_bytes
+        self._buffer = bytearray()
+        self._skip = 0
+    
+    def feed(self, data: bytes) -> List[Any]:
+        self._buffer += data
+        frames = []
+        while True:
+            if self._skip:
+                skipped = min(self._skip, len(self._buffer))
+                del self._buffer[:skipped]
+                self._skip -= skipped
+                if self._skip:
+                    return frames
+            if len(self._buffer) < FRAME_HEADER.size:
+                return frames
+            
+            (length,) = FRAME_HEADER.unpack_from(self._buffer)
+            if length > self.max_record_bytes or length % RAW_DTYPE.itemsize:
+                frames.append(ValueError(f"Invalid frame length {length}"))
+                del self._buffer[:FRAME_HEADER.size]
+                self._skip = length
+                continue
+            
+            end = FRAME_HEADER.size + length
+            if len(self._buffer) < end:
+                return frames
+            frames.append(bytes(self._buffer[FRAME_HEADER.size:end]))
+            del self._buffer[:end]
+    
+    def close(self) -> List[Any]:
+        remaining = len(self._buffer)
+        self._buffer.clear()
+        if self._skip or not remaining:
+            return []
+        return [ValueError("Truncated frame header" if remaining < FRAME_HEADER.size else "Truncated frame")]
+    
+    @staticmethod
+    def decode(record: Any) -> Any:
+        return record if isinstance(record, Exception) else np.frombuffer(record, dtype=RAW_DTYPE)
+
+def encode_ndjson_chunk(chunk: Dict[str, Any]) -> bytes:
+    """Encode one scored chunk as NDJSON, one line per input record"""
+    offset = chunk['offset']
+    errors = chunk['errors']
+    rows = chunk['predictions'].tolist() if chunk['predictions'] is not None else []
+    predictions = dict(zip(chunk['row_indices'], rows))
+    scores = chunk.get('scores')
+    if scores is not None:
+        scores = dict(zip(chunk['row_indices'], scores.tolist()))
+    
+    lines = []
+    for position in range(chunk['size']):
+        if position in errors:
+            lines.append(json.dumps({"index": offset + position, "error": errors[position]}))
+        elif scores is not None:
+            lines.append(json.dumps({"index": offset + position, "prediction": predictions[position],
+                                     "score": scores[position]}))
+        else:
+            lines.append(json.dumps({"index": offset + position, "prediction": predictions[position]}))
+    
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+def encode_frames_chunk(chunk: Dict[str, Any]) -> bytes:
+    """Encode one scored chunk as float32 frames; rejected records get an empty frame"""
+    predictions = chunk['predictions']
+    if predictions is not None:
+        predictions = np.ascontiguousarray(predictions, dtype=RAW_DTYPE)
+    rows = dict(zip(chunk['row_indices'], predictions if predictions is not None else []))
+    
+    parts = []
+    for position in range(chunk['size']):
+        row = rows.get(position)
+        payload = row.tobytes() if row is not None else b''
+        parts.append(FRAME_HEADER.pack(len(payload)))
+        parts.append(payload)
+    
+    return b''.join(parts)
\ No newline at end of file
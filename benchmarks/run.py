@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Latency/throughput benchmarks for the Cyber Sentinel serving path
+
+Runs against a synthetic MLP instead of the real model file:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run compare baseline.json results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+import torch
+from typing import Any, Callable, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_model import save_synthetic_model
+
+def measure(fn: Callable[[], Any], iterations: int, warmup: int = 5) -> Dict[str, float]:
+    """Time repeated calls and summarize their latency distribution"""
+    for _ in range(warmup):
+        fn()
+    
+    latencies = np.empty(iterations)
+    for i in range(iterations):
+        start_time = time.perf_counter()
+        fn()
+        latencies[i] = time.perf_counter() - start_time
+    
+    return {
+        "iterations": iterations,
+        "mean_ms": float(latencies.mean() * 1000),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000)
+    }
+
+def run_benchmarks(args) -> Dict[str, Any]:
+    """Run every benchmark across the requested batch sizes and thread counts"""
+    from app import create_app
+    from app.api import routes
+    from app.models.cyber_sentinel import CyberSentinelModel
+    from app.services.admission import AdmissionController
+    from app.services.model_registry import ModelRegistry
+    from app.services.prediction_service import PredictionService
+    from app.utils.data_preprocessor import DataPreprocessor
+    
+    tmpdir = tempfile.mkdtemp(prefix='cyber-sentinel-bench-')
+    model_path = save_synthetic_model(
+        os.path.join(tmpdir, 'synthetic_model.pkl'),
+        input_size=args.width, hidden_size=args.hidden, depth=args.depth, output_size=args.outputs
+    )
+    
+    preprocessor = DataPreprocessor()
+    service = PredictionService(model_path, backend={"name": args.backend, "artifact_dir": tmpdir})
+    models = {
+        precision: CyberSentinelModel(
+            model_path, backend=args.backend, backend_options={"artifact_dir": tmpdir}, precision=precision
+        )
+        for precision in args.precisions
+    }
+    
+    # Serve the synthetic model through the real Flask routes
+    registry = ModelRegistry(routes.build_prediction_service)
+    registry.add('synthetic', service)
+    routes._model_registry = registry
+    # No rate limits or load shedding: the harness measures the routes themselves
+    routes._admission_controller = AdmissionController()
+    app = create_app()
+    client = app.test_client()
+    with app.test_request_context():
+        from flask import url_for
+        predict_url = url_for('api.predict')
+        batch_url = url_for('api.batch_predict')
+    
+    rng = np.random.default_rng(0)
+    results = []
+    
+    def record(name: str, batch_size: int, threads: int, stats: Dict[str, float], **extra) -> None:
+        stats.update({
+            "name": name,
+            "batch_size": batch_size,
+            "threads": threads,
+            "rows_per_sec": batch_size / (stats["mean_ms"] / 1000) if stats["mean_ms"] > 0 else 0.0
+        }, **extra)
+        results.append(stats)
+        print(f"{name:<28} batch={batch_size:<6} threads={threads:<3} "
+              f"p50={stats['p50_ms']:8.3f}ms p99={stats['p99_ms']:8.3f}ms rows/s={stats['rows_per_sec']:12.1f}")
+    
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        
+        for batch_size in args.batch_sizes:
+            rows = rng.standard_normal((batch_size, args.width)).astype(np.float32)
+            row_lists = rows.tolist()
+            tensor = torch.from_numpy(rows)
+            iterations = max(args.min_iterations, args.iterations // max(1, batch_size // 64))
+            
+            if batch_size == 1:
+                record("preprocess.process", 1, threads,
+                       measure(lambda: preprocessor.process(row_lists[0], args.width), iterations))
+                record("service.predict", 1, threads,
+                       measure(lambda: service.predict(row_lists[0]), iterations))
+                record("http.predict", 1, threads,
+                       measure(lambda: client.post(predict_url, json={"input": row_lists[0]}), iterations))
+            
+            record("preprocess.process_batch", batch_size, threads,
+                   measure(lambda: preprocessor.process_batch(row_lists, args.width), iterations))
+            
+            for precision, model in models.items():
+                record(f"model.predict[{precision}]", batch_size, threads,
+                       measure(lambda: model.predict(tensor), iterations), precision=precision)
+            
+            record("service.batch_predict", batch_size, threads,
+                   measure(lambda: service.batch_predict(row_lists), iterations))
+            record("http.predict_batch", batch_size, threads,
+                   measure(lambda: client.post(batch_url, json={"inputs": row_lists}), iterations))
+    
+    return {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "model": {
+                "width": args.width,
+                "hidden": args.hidden,
+                "depth": args.depth,
+                "outputs": args.outputs,
+                "backend": args.backend
+            }
+        },
+        "results": results
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Find benchmarks whose p50/p99 latency rose or throughput fell by more than threshold"""
+    def key(result):
+        return (result["name"], result["batch_size"], result["threads"])
+    
+    baseline_results = {key(result): result for result in baseline["results"]}
+    regressions = []
+    
+    for result in current["results"]:
+        before = baseline_results.get(key(result))
+        if before is None:
+            continue
+        
+        for metric, higher_is_worse in (("p50_ms", True), ("p99_ms", True), ("rows_per_sec", False)):
+            old, new = before[metric], result[metric]
+            if old <= 0:
+                continue
+            change = (new - old) / old
+            if (change > threshold) if higher_is_worse else (change < -threshold):
+                regressions.append({
+                    "name": result["name"],
+                    "batch_size": result["batch_size"],
+                    "threads": result["threads"],
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": change
+                })
+    
+    return regressions
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(',') if item.strip()]
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if argv and argv[0] == 'compare':
+        parser = argparse.ArgumentParser(description='Compare benchmark results against a baseline')
+        parser.add_argument('baseline', help='Baseline results JSON')
+        parser.add_argument('current', help='Current results JSON')
+        parser.add_argument('--threshold', type=float, default=0.10,
+                            help='Relative change that counts as a regression (default: 0.10)')
+        args = parser.parse_args(argv[1:])
+        args.command = 'compare'
+        return args
+    
+    parser = argparse.ArgumentParser(description='Run serving benchmarks on a synthetic model')
+    parser.add_argument('--output', default='bench_results.json', help='Where to write results JSON')
+    parser.add_argument('--width', type=int, default=100, help='Input features')
+    parser.add_argument('--hidden', type=int, default=256, help='Hidden layer width')
+    parser.add_argument('--depth', type=int, default=3, help='Hidden layers')
+    parser.add_argument('--outputs', type=int, default=2, help='Output size')
+    parser.add_argument('--batch-sizes', type=parse_int_list, default=[1, 8, 64, 512], help='e.g. 1,8,64,512')
+    parser.add_argument('--threads', type=parse_int_list, default=[1, os.cpu_count() or 1], help='e.g. 1,4')
+    parser.add_argument('--precisions', type=lambda v: v.split(','), default=['fp32'],
+                        help='Model precisions to compare, e.g. fp32,int8-dynamic')
+    parser.add_argument('--backend', default='eager', help='Inference backend for the model')
+    parser.add_argument('--iterations', type=int, default=200, help='Timed calls per benchmark')
+    parser.add_argument('--min-iterations', type=int, default=20, help='Floor for large batches')
+    args = parser.parse_args(argv)
+    args.command = 'run'
+    return args
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    
+    if args.command == 'compare':
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        
+        regressions = compare(baseline, current, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['name']} batch={regression['batch_size']} "
+                  f"threads={regression['threads']} {regression['metric']}: "
+                  f"{regression['baseline']:.3f} -> {regression['current']:.3f} ({regression['change']:+.1%})")
+        if not regressions:
+            print(f"No regressions beyond {args.threshold:.0%}")
+        return 1 if regressions else 0
+    
+    report = run_benchmarks(args)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
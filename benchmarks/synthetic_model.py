@@ -0,0 +1,25 @@
+import os
+import torch
+import torch.nn as nn
+from typing import Optional
+
+def make_synthetic_model(input_size: int = 100, hidden_size: int = 256, depth: int = 3,
+                         output_size: int = 2, seed: Optional[int] = 0) -> nn.Module:
+    """Build an MLP standing in for the Cyber Sentinel model"""
+    if seed is not None:
+        torch.manual_seed(seed)
+    
+    layers = []
+    width = input_size
+    for _ in range(depth):
+        layers += [nn.Linear(width, hidden_size), nn.ReLU()]
+        width = hidden_size
+    layers.append(nn.Linear(width, output_size))
+    
+    return nn.Sequential(*layers).eval()
+
+def save_synthetic_model(path: str, **kwargs) -> str:
+    """Save a synthetic MLP the same way the real model is stored (a pickled module)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    torch.save(make_synthetic_model(**kwargs), path)
+    return path
\ No newline at end of file
@@ -1,6 +1,25 @@
 import os
+import yaml
 from typing import Dict, Any
 
+CONFIG_FILE = os.environ.get(
+    'CONFIG_FILE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.yaml')
+)
+
+def load_yaml_config(path: str = CONFIG_FILE) -> Dict[str, Any]:
+    """Load settings from the YAML config file (empty if the file is missing)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+_yaml_config = load_yaml_config()
+
+def get_setting(section: str, key: str, default: Any = None) -> Any:
+    """Look up a value from a section of config.yaml"""
+    return (_yaml_config.get(section) or {}).get(key, default)
+
 class Config:
     """Application configuration"""
     # Flask settings
@@ -8,11 +27,203 @@ class Config:
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
     
     # Model settings
-    MODEL_PATH = os.environ.get('MODEL_PATH', 'models/cyber_sentinel_model.pkl')
+    MODEL_PATH = os.environ.get('MODEL_PATH', get_setting('model', 'path', 'models/cyber_sentinel_model.pkl'))
+    MODEL_LOAD_MODE = os.environ.get('MODEL_LOAD_MODE', get_setting('model', 'load_mode', 'standard'))
+    MODEL_BACKEND = os.environ.get('MODEL_BACKEND', get_setting('model', 'backend', 'eager'))
+    MODEL_BACKEND_TOLERANCE = float(os.environ.get(
+        'MODEL_BACKEND_TOLERANCE', get_setting('model', 'backend_tolerance', 1e-4)
+    ))
+    MODEL_ARTIFACT_DIR = os.environ.get('MODEL_ARTIFACT_DIR', get_setting('model', 'artifact_dir', 'models/.cache'))
+    MODEL_PRECISION = os.environ.get('MODEL_PRECISION', get_setting('model', 'precision', 'fp32'))
+    MODEL_PRECISION_REFERENCE = os.environ.get(
+        'MODEL_PRECISION_REFERENCE', get_setting('model', 'precision_reference', None)
+    )
+    
+    # Model registry settings (named, versioned models; see registry in config.yaml)
+    REGISTRY_DEFAULT_MODEL = os.environ.get('REGISTRY_DEFAULT_MODEL', get_setting('registry', 'default', 'default'))
+    REGISTRY_MEMORY_BUDGET_MB = float(os.environ.get(
+        'REGISTRY_MEMORY_BUDGET_MB', get_setting('registry', 'memory_budget_mb', 0) or 0
+    ))
+    REGISTRY_ALLOW_DEPLOY = os.environ.get(
+        'REGISTRY_ALLOW_DEPLOY', str(get_setting('registry', 'allow_deploy', False))
+    ).lower() == 'true'
+    REGISTRY_MODEL_DIR = os.environ.get('REGISTRY_MODEL_DIR', get_setting('registry', 'model_dir', 'models'))
     
     # API settings
     API_HOST = os.environ.get('API_HOST', '0.0.0.0')
     API_PORT = int(os.environ.get('API_PORT', 5000))
+    WORKERS = int(os.environ.get('WORKERS', get_setting('server', 'workers', 1)))
+    THREADS = int(os.environ.get('THREADS', get_setting('server', 'threads', 1)))
+    
+    # Admission control settings (load shedding in front of the prediction routes)
+    ADMISSION_ENABLED = os.environ.get(
+        'ADMISSION_ENABLED', str(get_setting('admission', 'enabled', True))
+    ).lower() == 'true'
+    API_RATE_LIMIT = os.environ.get('API_RATE_LIMIT', get_setting('api', 'rate_limit', None))
+    API_RATE_LIMIT_BURST = float(os.environ.get(
+        'API_RATE_LIMIT_BURST', get_setting('api', 'rate_limit_burst', 0) or 0
+    ))
+    ADMISSION_MAX_INFLIGHT_ROWS = int(os.environ.get(
+        'ADMISSION_MAX_INFLIGHT_ROWS', get_setting('admission', 'max_inflight_rows', 4096) or 0
+    ))
+    ADMISSION_LATENCY_SLO_MS = float(os.environ.get(
+        'ADMISSION_LATENCY_SLO_MS', get_setting('admission', 'latency_slo_ms', 500) or 0
+    ))
+    ADMISSION_RESERVED_THREADS = int(os.environ.get(
+        'ADMISSION_RESERVED_THREADS', get_setting('admission', 'reserved_threads', 1)
+    ))
+    ADMISSION_MAX_CLIENTS = int(os.environ.get(
+        'ADMISSION_MAX_CLIENTS', get_setting('admission', 'max_clients', 10000)
+    ))
+    ADMISSION_CLIENT_HEADER = os.environ.get(
+        'ADMISSION_CLIENT_HEADER', get_setting('admission', 'client_header', None)
+    )
+    
+    # CPU topology settings (per-worker core split and torch thread counts)
+    TOPOLOGY_ENABLED = os.environ.get(
+        'TOPOLOGY_ENABLED', str(get_setting('topology', 'enabled', False))
+    ).lower() == 'true'
+    TOPOLOGY_PIN_CPUS = os.environ.get(
+        'TOPOLOGY_PIN_CPUS', str(get_setting('topology', 'pin_cpus', False))
+    ).lower() == 'true'
+    TOPOLOGY_INTRA_OP_THREADS = int(os.environ.get(
+        'TOPOLOGY_INTRA_OP_THREADS', get_setting('topology', 'intra_op_threads', 0) or 0
+    )) or None
+    TOPOLOGY_INTEROP_THREADS = int(os.environ.get(
+        'TOPOLOGY_INTEROP_THREADS', get_setting('topology', 'interop_threads', 1)
+    ))
+    
+    # Micro-batching settings
+    BATCHING_ENABLED = os.environ.get(
+        'BATCHING_ENABLED', str(get_setting('batching', 'enabled', False))
+    ).lower() == 'true'
+    BATCHING_MAX_BATCH_SIZE = int(os.environ.get(
+        'BATCHING_MAX_BATCH_SIZE', get_setting('batching', 'max_batch_size', 64)
+    ))
+    BATCHING_MAX_WAIT_MS = float(os.environ.get(
+        'BATCHING_MAX_WAIT_MS', get_setting('batching', 'max_wait_ms', 5)
+    ))
+    BATCHING_TIMEOUT_MS = float(os.environ.get(
+        'BATCHING_TIMEOUT_MS', get_setting('batching', 'timeout_ms', 1000)
+    ))
+    
+    # Prediction cache settings
+    CACHE_ENABLED = os.environ.get(
+        'CACHE_ENABLED', str(get_setting('cache', 'enabled', False))
+    ).lower() == 'true'
+    CACHE_MAX_ENTRIES = int(os.environ.get(
+        'CACHE_MAX_ENTRIES', get_setting('cache', 'max_entries', 100000)
+    ))
+    CACHE_MAX_MB = float(os.environ.get(
+        'CACHE_MAX_MB', get_setting('cache', 'max_mb', 64)
+    ))
+    CACHE_TTL_SECONDS = float(os.environ.get(
+        'CACHE_TTL_SECONDS', get_setting('cache', 'ttl_seconds', 300)
+    ))
+    
+    # Input buffer pool settings
+    BUFFER_POOL_ENABLED = os.environ.get(
+        'BUFFER_POOL_ENABLED', str(get_setting('buffer_pool', 'enabled', False))
+    ).lower() == 'true'
+    BUFFER_POOL_MAX_MB = float(os.environ.get(
+        'BUFFER_POOL_MAX_MB', get_setting('buffer_pool', 'max_mb', 64)
+    ))
+    
+    # Startup warm-up settings (the readiness endpoint answers 503 until it's done)
+    WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', str(get_setting('warmup', 'enabled', False))).lower() == 'true'
+    WARMUP_BATCH_SIZES = [
+        int(size) for size in os.environ.get('WARMUP_BATCH_SIZES', '').split(',') if size.strip()
+    ] or list(get_setting('warmup', 'batch_sizes', None) or [1, 8, 64])
+    WARMUP_ITERATIONS = int(os.environ.get('WARMUP_ITERATIONS', get_setting('warmup', 'iterations', 50)))
+    WARMUP_TOLERANCE = float(os.environ.get('WARMUP_TOLERANCE', get_setting('warmup', 'tolerance', 0.1)))
+    WARMUP_MAX_SECONDS = float(os.environ.get('WARMUP_MAX_SECONDS', get_setting('warmup', 'max_seconds', 30)))
+    
+    # Input-distribution monitoring (GET /api/api/monitoring/features)
+    MONITORING_ENABLED = os.environ.get(
+        'MONITORING_ENABLED', str(get_setting('monitoring', 'enabled', False))
+    ).lower() == 'true'
+    MONITORING_SAMPLE_RATE = float(os.environ.get(
+        'MONITORING_SAMPLE_RATE', get_setting('monitoring', 'sample_rate', 0.1)
+    ))
+    MONITORING_RESERVOIR_SIZE = int(os.environ.get(
+        'MONITORING_RESERVOIR_SIZE', get_setting('monitoring', 'reservoir_size', 2048)
+    ))
+    MONITORING_REFERENCE_PATH = os.environ.get(
+        'MONITORING_REFERENCE_PATH', get_setting('monitoring', 'reference_path', None)
+    )
+    MONITORING_PSI_THRESHOLD = float(os.environ.get(
+        'MONITORING_PSI_THRESHOLD', get_setting('monitoring', 'psi_threshold', 0.2)
+    ))
+    
+    # Shadow evaluation of a candidate model on sampled live requests (reported in /api/api/stats)
+    SHADOW_ENABLED = os.environ.get('SHADOW_ENABLED', str(get_setting('shadow', 'enabled', False))).lower() == 'true'
+    SHADOW_MODEL_PATH = os.environ.get('SHADOW_MODEL_PATH', get_setting('shadow', 'model_path', None))
+    SHADOW_PRIMARY_MODEL = os.environ.get('SHADOW_PRIMARY_MODEL', get_setting('shadow', 'primary', None))
+    SHADOW_SAMPLE_RATE = float(os.environ.get('SHADOW_SAMPLE_RATE', get_setting('shadow', 'sample_rate', 0.05)))
+    SHADOW_MAX_QUEUE = int(os.environ.get('SHADOW_MAX_QUEUE', get_setting('shadow', 'max_queue', 64)))
+    SHADOW_MAX_INFLIGHT_REQUESTS = int(os.environ.get(
+        'SHADOW_MAX_INFLIGHT_REQUESTS', get_setting('shadow', 'max_inflight_requests', 1)
+    ))
+    SHADOW_DECISION_THRESHOLD = float(os.environ.get(
+        'SHADOW_DECISION_THRESHOLD', get_setting('shadow', 'decision_threshold', 0.5)
+    ))
+    
+    # Per-machine tuning from 'python main.py autotune', applied at startup
+    AUTOTUNE_ENABLED = os.environ.get(
+        'AUTOTUNE_ENABLED', str(get_setting('autotune', 'enabled', False))
+    ).lower() == 'true'
+    AUTOTUNE_PROFILE_DIR = os.environ.get('AUTOTUNE_PROFILE_DIR', get_setting('autotune', 'profile_dir', 'models/.autotune'))
+    AUTOTUNE_BUDGET_SECONDS = float(os.environ.get(
+        'AUTOTUNE_BUDGET_SECONDS', get_setting('autotune', 'budget_seconds', 120)
+    ))
+    AUTOTUNE_BACKENDS = [
+        name.strip() for name in os.environ.get('AUTOTUNE_BACKENDS', '').split(',') if name.strip()
+    ] or list(get_setting('autotune', 'backends', None) or ['eager', 'torchscript'])
+    AUTOTUNE_BATCH_SIZES = [
+        int(size) for size in os.environ.get('AUTOTUNE_BATCH_SIZES', '').split(',') if size.strip()
+    ] or list(get_setting('autotune', 'batch_sizes', None) or [1, 4, 16, 32, 64, 128])
+    AUTOTUNE_LATENCY_SLO_MS = float(os.environ.get(
+        'AUTOTUNE_LATENCY_SLO_MS', get_setting('autotune', 'latency_slo_ms', 50)
+    ))
+    
+    # Feature normalization settings (statistics fitted with 'main.py fit-scaler')
+    PREPROCESSING_NORMALIZE = os.environ.get(
+        'PREPROCESSING_NORMALIZE', str(get_setting('preprocessing', 'normalize', False))
+    ).lower() == 'true'
+    PREPROCESSING_SCALER_PATH = os.environ.get(
+        'PREPROCESSING_SCALER_PATH', get_setting('preprocessing', 'scaler_path', None)
+    )
+    PREPROCESSING_FOLD_SCALER = os.environ.get(
+        'PREPROCESSING_FOLD_SCALER', str(get_setting('preprocessing', 'fold_scaler', True))
+    ).lower() == 'true'
+    PREPROCESSING_FEATURE_SCHEMA = os.environ.get(
+        'PREPROCESSING_FEATURE_SCHEMA', get_setting('preprocessing', 'feature_schema', None)
+    )
+    
+    # ASGI serving settings (python main.py serve-asgi)
+    ASGI_INFERENCE_THREADS = int(os.environ.get(
+        'ASGI_INFERENCE_THREADS', get_setting('asgi', 'inference_threads', 4)
+    ))
+    ASGI_MAX_PENDING = int(os.environ.get(
+        'ASGI_MAX_PENDING', get_setting('asgi', 'max_pending', 64)
+    ))
+    
+    # Profiler capture settings (POST /api/api/admin/profile)
+    PROFILER_OUTPUT_DIR = os.environ.get('PROFILER_OUTPUT_DIR', get_setting('profiler', 'output_dir', 'profiles'))
+    PROFILER_MAX_SECONDS = float(os.environ.get(
+        'PROFILER_MAX_SECONDS', get_setting('profiler', 'max_seconds', 300)
+    ))
+    
+    # Admin endpoints are disabled unless a token is set; environment only, so it stays out of config.yaml
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+    
+    # Streaming settings
+    STREAM_CHUNK_SIZE = int(os.environ.get(
+        'STREAM_CHUNK_SIZE', get_setting('streaming', 'chunk_size', 1024)
+    ))
+    STREAM_MAX_RECORD_BYTES = int(os.environ.get(
+        'STREAM_MAX_RECORD_BYTES', get_setting('streaming', 'max_record_bytes', 1048576)
+    ))
     
     # Logging settings
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -27,4 +238,133 @@ class Config:
             key: getattr(cls, key)
             for key in dir(cls)
             if not key.startswith('_') and not callable(getattr(cls, key))
+        }
+    
+    @classmethod
+    def registry_models(cls) -> Dict[str, Dict[str, Any]]:
+        """Models to register by name; without a registry section, MODEL_PATH as the default model"""
+        models = get_setting('registry', 'models', None)
+        if not models:
+            return {cls.REGISTRY_DEFAULT_MODEL: {"path": cls.MODEL_PATH}}
+        return {name: dict(spec) for name, spec in models.items()}
+    
+    @classmethod
+    def admission_options(cls) -> Dict[str, Any]:
+        """Admission control options for AdmissionController
+        
+        With several threads per worker, prediction requests may not use the
+        reserved ones, so /api/health always has a thread to answer on.
+        """
+        if not cls.ADMISSION_ENABLED:
+            return {}
+        return {
+            "rate_limit": cls.API_RATE_LIMIT,
+            "burst": cls.API_RATE_LIMIT_BURST,
+            "max_inflight_rows": cls.ADMISSION_MAX_INFLIGHT_ROWS,
+            "max_concurrent": max(1, cls.THREADS - cls.ADMISSION_RESERVED_THREADS) if cls.THREADS > 1 else 0,
+            "latency_slo_ms": cls.ADMISSION_LATENCY_SLO_MS,
+            "max_clients": cls.ADMISSION_MAX_CLIENTS
+        }
+    
+    @classmethod
+    def cache_options(cls) -> Dict[str, Any]:
+        """Prediction cache options for PredictionService"""
+        return {
+            "enabled": cls.CACHE_ENABLED,
+            "max_entries": cls.CACHE_MAX_ENTRIES,
+            "max_mb": cls.CACHE_MAX_MB,
+            "ttl_seconds": cls.CACHE_TTL_SECONDS
+        }
+    
+    @classmethod
+    def buffer_pool_options(cls) -> Dict[str, Any]:
+        """Input buffer pool options for PredictionService"""
+        return {
+            "enabled": cls.BUFFER_POOL_ENABLED,
+            "max_mb": cls.BUFFER_POOL_MAX_MB
+        }
+    
+    @classmethod
+    def warmup_options(cls) -> Dict[str, Any]:
+        """Warm-up options for PredictionService.warm_up"""
+        return {
+            "enabled": cls.WARMUP_ENABLED,
+            "batch_sizes": cls.WARMUP_BATCH_SIZES,
+            "iterations": cls.WARMUP_ITERATIONS,
+            "tolerance": cls.WARMUP_TOLERANCE,
+            "max_seconds": cls.WARMUP_MAX_SECONDS
+        }
+    
+    @classmethod
+    def monitoring_options(cls) -> Dict[str, Any]:
+        """Input-distribution monitoring options for PredictionService"""
+        return {
+            "enabled": cls.MONITORING_ENABLED,
+            "sample_rate": cls.MONITORING_SAMPLE_RATE,
+            "reservoir_size": cls.MONITORING_RESERVOIR_SIZE,
+            "reference_path": cls.MONITORING_REFERENCE_PATH,
+            "psi_threshold": cls.MONITORING_PSI_THRESHOLD
+        }
+    
+    @classmethod
+    def shadow_options(cls) -> Dict[str, Any]:
+        """Shadow evaluation options for the primary model's PredictionService"""
+        return {
+            "enabled": cls.SHADOW_ENABLED,
+            "model_path": cls.SHADOW_MODEL_PATH,
+            "primary": cls.SHADOW_PRIMARY_MODEL or cls.REGISTRY_DEFAULT_MODEL,
+            "sample_rate": cls.SHADOW_SAMPLE_RATE,
+            "max_queue": cls.SHADOW_MAX_QUEUE,
+            "max_inflight_requests": cls.SHADOW_MAX_INFLIGHT_REQUESTS,
+            "decision_threshold": cls.SHADOW_DECISION_THRESHOLD
+        }
+    
+    @classmethod
+    def autotune_options(cls) -> Dict[str, Any]:
+        """Sweep options for app.services.autotune.autotune"""
+        return {
+            "budget_seconds": cls.AUTOTUNE_BUDGET_SECONDS,
+            "backends": cls.AUTOTUNE_BACKENDS,
+            "batch_sizes": cls.AUTOTUNE_BATCH_SIZES,
+            "latency_slo_ms": cls.AUTOTUNE_LATENCY_SLO_MS
+        }
+    
+    @classmethod
+    def topology_options(cls) -> Dict[str, Any]:
+        """Per-worker thread options for apply_worker_topology"""
+        return {
+            "pin_cpus": cls.TOPOLOGY_PIN_CPUS,
+            "intra_op_threads": cls.TOPOLOGY_INTRA_OP_THREADS,
+            "interop_threads": cls.TOPOLOGY_INTEROP_THREADS
+        }
+    
+    @classmethod
+    def backend_options(cls) -> Dict[str, Any]:
+        """Inference backend options for PredictionService"""
+        return {
+            "name": cls.MODEL_BACKEND,
+            "tolerance": cls.MODEL_BACKEND_TOLERANCE,
+            "artifact_dir": cls.MODEL_ARTIFACT_DIR,
+            "precision": cls.MODEL_PRECISION,
+            "precision_reference": cls.MODEL_PRECISION_REFERENCE
+        }
+    
+    @classmethod
+    def preprocessing_options(cls) -> Dict[str, Any]:
+        """Feature normalization options for PredictionService"""
+        return {
+            "normalize": cls.PREPROCESSING_NORMALIZE,
+            "scaler_path": cls.PREPROCESSING_SCALER_PATH,
+            "fold": cls.PREPROCESSING_FOLD_SCALER,
+            "feature_schema": cls.PREPROCESSING_FEATURE_SCHEMA
+        }
+    
+    @classmethod
+    def batching_options(cls) -> Dict[str, Any]:
+        """Micro-batching options for PredictionService"""
+        return {
+            "enabled": cls.BATCHING_ENABLED,
+            "max_batch_size": cls.BATCHING_MAX_BATCH_SIZE,
+            "max_wait_ms": cls.BATCHING_MAX_WAIT_MS,
+            "timeout_ms": cls.BATCHING_TIMEOUT_MS
         }
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""
+Gunicorn configuration for production
+
+    gunicorn -c gunicorn.conf.py 'app:create_app()'
+"""
+
+from config.settings import Config
+from app.services.autotune import apply_startup_profile
+from app.utils.topology import apply_worker_topology
+
+# This machine's saved profile for the model (python main.py autotune) sets the
+# backend, worker count, threads per worker and batch size, unless set in the environment
+apply_startup_profile(Config)
+
+bind = f"{Config.API_HOST}:{Config.API_PORT}"
+workers = Config.WORKERS
+# With more than one thread gunicorn runs threaded workers; admission control
+# keeps admission.reserved_threads of them free so health checks are answered under load
+threads = Config.THREADS
+
+# The model is loaded in each worker after it forks (see post_worker_init). With
+# model.load_mode "mmap" its weights are mapped from the model file, so all workers
+# share one copy in the page cache instead of each unpickling its own.
+preload_app = False
+
+def pre_fork(server, worker):
+    """Give each new worker the lowest CPU-topology slot not held by a live worker"""
+    used = {getattr(w, 'topology_slot', None) for w in server.WORKERS.values()}
+    worker.topology_slot = min(slot for slot in range(workers + 1) if slot not in used)
+
+def post_fork(server, worker):
+    """Size the worker's torch thread pools (and optionally pin it) before any inference"""
+    if Config.TOPOLOGY_ENABLED:
+        apply_worker_topology(worker.topology_slot, workers, **Config.topology_options())
+
+def post_worker_init(worker):
+    """Load and warm the model in the background; /api/api/health/ready reports 503 until it's done"""
+    from app.api.routes import start_warm_up
+    start_warm_up()
\ No newline at end of file
@@ -4,6 +4,8 @@ Cyber Sentinel Model Application
 Main entry point for the application
 """
 
+import argparse
+import json
 import logging
 import sys
 import os
@@ -25,13 +27,197 @@ def setup_logging():
         ]
     )
 
-def main():
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Cyber Sentinel Model Application')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    subparsers.add_parser('serve', help='Start the web server (default)')
+    subparsers.add_parser('serve-asgi', help='Start the asyncio (ASGI) server; requires uvicorn')
+    
+    score = subparsers.add_parser('score', help='Bulk-score a file offline')
+    score.add_argument('input', help='Input file (.npy, raw float32, or .csv)')
+    score.add_argument('output', help='Output .npy file (memory-mapped)')
+    score.add_argument('--format', choices=['npy', 'raw', 'csv'], help='Input format (default: from extension)')
+    score.add_argument('--features', type=int, help='Features per row, required for raw float32 input')
+    score.add_argument('--model-path', default=Config.MODEL_PATH, help='Model file to score with')
+    score.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    score.add_argument('--threads-per-worker', type=int, help='Torch threads per worker (default: CPUs / workers)')
+    score.add_argument('--shard-size', type=int, default=100000, help='Rows per shard (unit of resume)')
+    score.add_argument('--batch-size', type=int, default=4096, help='Rows per forward pass')
+    score.add_argument('--scaler', help='Feature scaler JSON (default: next to the model when '
+                                        'preprocessing.normalize is on)')
+    
+    fit = subparsers.add_parser('fit-scaler', help='Fit feature normalization statistics on a training file')
+    fit.add_argument('input', help='Training file (.npy, raw float32, or .csv)')
+    fit.add_argument('--format', choices=['npy', 'raw', 'csv'], help='Input format (default: from extension)')
+    fit.add_argument('--features', type=int, help='Features per row, required for raw float32 input')
+    fit.add_argument('--model-path', default=Config.MODEL_PATH, help='Model the statistics are for')
+    fit.add_argument('--output', help='Where to write the statistics (default: next to the model)')
+    fit.add_argument('--chunk-rows', type=int, default=65536, help='Rows read per chunk')
+    
+    reference = subparsers.add_parser('fit-reference', help='Compute input-drift reference statistics on a training file')
+    reference.add_argument('input', help='Training file (.npy, raw float32, or .csv)')
+    reference.add_argument('--format', choices=['npy', 'raw', 'csv'], help='Input format (default: from extension)')
+    reference.add_argument('--features', type=int, help='Features per row, required for raw float32 input')
+    reference.add_argument('--model-path', default=Config.MODEL_PATH, help='Model the statistics are for')
+    reference.add_argument('--output', help='Where to write the statistics (default: next to the model)')
+    reference.add_argument('--bins', type=int, default=10, help='Quantile bins per feature for drift scores')
+    reference.add_argument('--chunk-rows', type=int, default=65536, help='Rows read per chunk')
+    
+    tune_defaults = Config.autotune_options()
+    tune = subparsers.add_parser('autotune', help='Sweep backend, threads and batch size on this machine and '
+                                                  'save the best as a startup profile')
+    tune.add_argument('--model-path', default=Config.MODEL_PATH, help='Model to tune for')
+    tune.add_argument('--budget-seconds', type=float, default=tune_defaults['budget_seconds'],
+                      help='Wall-clock time the sweep may take')
+    tune.add_argument('--backends', default=','.join(tune_defaults['backends']),
+                      help='Comma-separated backends to try')
+    tune.add_argument('--threads', help='Comma-separated torch thread counts (default: powers of two up to the CPUs)')
+    tune.add_argument('--batch-sizes', default=','.join(str(size) for size in tune_defaults['batch_sizes']),
+                      help='Comma-separated batch sizes to try')
+    tune.add_argument('--latency-slo-ms', type=float, default=tune_defaults['latency_slo_ms'],
+                      help='p99 per batch the chosen setting must stay under')
+    tune.add_argument('--output', help='Where to write the profile (default: autotune.profile_dir, keyed by '
+                                       'CPU model and model hash)')
+    
+    return parser.parse_args(argv)
+
+def run_score(args) -> None:
+    """Run an offline bulk-scoring job"""
+    from app.services.bulk_scoring import score_file
+    from app.utils.feature_scaling import default_scaler_path
+    
+    scaler_path = args.scaler
+    if scaler_path is None and Config.PREPROCESSING_NORMALIZE:
+        scaler_path = Config.PREPROCESSING_SCALER_PATH or default_scaler_path(args.model_path)
+    
+    summary = score_file(
+        args.model_path,
+        args.input,
+        args.output,
+        input_format=args.format,
+        num_features=args.features,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        shard_size=args.shard_size,
+        batch_size=args.batch_size,
+        scaler_path=scaler_path
+    )
+    print(json.dumps(summary, indent=2))
+
+def run_fit_scaler(args) -> None:
+    """Fit feature scaling statistics in one streaming pass and save them next to the model"""
+    from app.services.bulk_scoring import detect_format, iter_input_chunks
+    from app.utils.feature_scaling import default_scaler_path, fit_scaler
+    
+    input_format = args.format or detect_format(args.input)
+    scaler = fit_scaler(iter_input_chunks(args.input, input_format, args.features, args.chunk_rows))
+    output = args.output or Config.PREPROCESSING_SCALER_PATH or default_scaler_path(args.model_path)
+    scaler.save(output)
+    print(json.dumps({"output": output, "rows": scaler.count, "features": scaler.num_features}, indent=2))
+
+def run_fit_reference(args) -> None:
+    """Compute reference input statistics in one streaming pass and save them next to the model"""
+    from app.services.bulk_scoring import detect_format, iter_input_chunks
+    from app.utils.feature_monitor import default_reference_path, fit_reference
+    
+    input_format = args.format or detect_format(args.input)
+    chunks = iter_input_chunks(args.input, input_format, args.features, args.chunk_rows)
+    reference = fit_reference(chunks, bins=args.bins)
+    output = args.output or Config.MONITORING_REFERENCE_PATH or default_reference_path(args.model_path)
+    reference.save(output)
+    print(json.dumps({"output": output, "rows": reference.count, "features": reference.num_features}, indent=2))
+
+def run_autotune(args) -> None:
+    """Measure settings against the model on this machine and save the best as its startup profile"""
+    from app.services.autotune import autotune, profile_path, save_profile
+    
+    profile = autotune(
+        args.model_path,
+        budget_seconds=args.budget_seconds,
+        backends=[name.strip() for name in args.backends.split(',') if name.strip()],
+        thread_counts=[int(count) for count in args.threads.split(',')] if args.threads else None,
+        batch_sizes=[int(size) for size in args.batch_sizes.split(',')],
+        latency_slo_ms=args.latency_slo_ms,
+        # Tune the model as it will be served: same load mode, precision and backend artifacts
+        model_options={
+            "load_mode": Config.MODEL_LOAD_MODE,
+            "backend_options": Config.backend_options(),
+            "precision": Config.MODEL_PRECISION,
+            "precision_reference": Config.MODEL_PRECISION_REFERENCE
+        }
+    )
+    output = args.output or profile_path(Config.AUTOTUNE_PROFILE_DIR, args.model_path)
+    save_profile(profile, output)
+    print(json.dumps({"output": output, "complete": profile["complete"], "best": profile["best"]}, indent=2))
+
+def run_asgi() -> None:
+    """Serve the API from the ASGI app on uvicorn"""
+    try:
+        import uvicorn
+    except ImportError:
+        raise RuntimeError("ASGI serving requires the 'uvicorn' package")
+    
+    from app.asgi import create_asgi_app
+    
+    uvicorn.run(create_asgi_app(), host=Config.API_HOST, port=Config.API_PORT, log_level=Config.LOG_LEVEL.lower())
+
+def main(argv=None):
     """Main application entry point"""
+    args = parse_args(argv)
     setup_logging()
     logger = logging.getLogger(__name__)
     
+    if args.command == 'score':
+        try:
+            run_score(args)
+        except Exception as e:
+            logger.error(f"Bulk scoring failed: {e}")
+            sys.exit(1)
+        return
+    
+    if args.command == 'fit-scaler':
+        try:
+            run_fit_scaler(args)
+        except Exception as e:
+            logger.error(f"Fitting the feature scaler failed: {e}")
+            sys.exit(1)
+        return
+    
+    if args.command == 'fit-reference':
+        try:
+            run_fit_reference(args)
+        except Exception as e:
+            logger.error(f"Fitting the reference statistics failed: {e}")
+            sys.exit(1)
+        return
+    
+    if args.command == 'autotune':
+        try:
+            run_autotune(args)
+        except Exception as e:
+            logger.error(f"Autotuning failed: {e}")
+            sys.exit(1)
+        return
+    
     try:
+        from app.services.autotune import apply_startup_profile
+        apply_startup_profile(Config)
+        
+        if Config.TOPOLOGY_ENABLED:
+            # The development server is a single worker: give it the whole machine
+            from app.utils.topology import apply_worker_topology
+            apply_worker_topology(0, 1, **Config.topology_options())
+        
+        if args.command == 'serve-asgi':
+            logger.info(f"Starting Cyber Sentinel ASGI server on {Config.API_HOST}:{Config.API_PORT}")
+            run_asgi()
+            return
+        
         app = create_app()
+        from app.api.routes import start_warm_up
+        start_warm_up()
         
         logger.info("Starting Cyber Sentinel Model Application")
         logger.info(f"Debug mode: {Config.DEBUG}")
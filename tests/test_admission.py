@@ -0,0 +1,115 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.admission import AdmissionController, AdmissionRejected, TokenBucket, parse_rate_limit
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+class TestAdmission(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a controlled clock"""
+        self.clock = FakeClock()
+    
+    def test_parse_rate_limit(self):
+        """Test the config.yaml rate limit syntax"""
+        self.assertEqual(parse_rate_limit("100 per hour"), (100 / 3600, 100))
+        self.assertEqual(parse_rate_limit("5/second"), (5, 5))
+        self.assertEqual(parse_rate_limit("30 per minutes"), (0.5, 30))
+        self.assertIsNone(parse_rate_limit(None))
+        with self.assertRaises(ValueError):
+            parse_rate_limit("lots")
+    
+    def test_token_bucket_refills(self):
+        """Test that an empty bucket reports the wait until the next token"""
+        bucket = TokenBucket(rate=2.0, capacity=2, now=0.0)
+        self.assertEqual(bucket.take(0.0), 0.0)
+        self.assertEqual(bucket.take(0.0), 0.0)
+        self.assertAlmostEqual(bucket.take(0.0), 0.5)
+        self.assertEqual(bucket.take(0.5), 0.0)
+    
+    def test_rate_limit_is_per_client(self):
+        """Test 429 with Retry-After for one client while another is still admitted"""
+        controller = AdmissionController(rate_limit="2 per minute", clock=self.clock)
+        for _ in range(2):
+            with controller.admit("a"):
+                pass
+        
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.acquire("a")
+        self.assertEqual(ctx.exception.status, 429)
+        self.assertEqual(ctx.exception.retry_after, 30)
+        
+        with controller.admit("b"):
+            pass
+        self.clock.now += 30
+        with controller.admit("a"):
+            pass
+    
+    def test_inflight_row_cap(self):
+        """Test 503 once the worker's in-flight rows would exceed the cap"""
+        controller = AdmissionController(max_inflight_rows=100, clock=self.clock)
+        controller.acquire("a", rows=80)
+        
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.acquire("b", rows=30)
+        self.assertEqual(ctx.exception.status, 503)
+        self.assertEqual(ctx.exception.reason, "queue_full")
+        
+        controller.release(rows=80)
+        # An oversized batch is still served when nothing else is in flight
+        controller.acquire("b", rows=500)
+        self.assertEqual(controller.get_stats()["inflight_rows"], 500)
+    
+    def test_latency_slo_sheds_load(self):
+        """Test 503 when the estimated wait for rows in flight exceeds the SLO"""
+        controller = AdmissionController(latency_slo_ms=100, clock=self.clock)
+        with controller.admit("a", rows=10):
+            self.clock.now += 0.05
+        self.assertAlmostEqual(controller.row_seconds, 0.005)
+        
+        controller.acquire("a", rows=30)
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.acquire("b", rows=1)
+        self.assertEqual(ctx.exception.status, 503)
+        self.assertEqual(ctx.exception.reason, "latency_slo")
+        self.assertGreaterEqual(ctx.exception.retry_after, 1)
+        
+        controller.release(rows=30)
+        with controller.admit("b"):
+            pass
+    
+    def test_overload_does_not_spend_tokens(self):
+        """Test that requests shed for overload keep the client's rate-limit tokens"""
+        controller = AdmissionController(rate_limit="1 per hour", max_concurrent=1, clock=self.clock)
+        controller.acquire("a")
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.acquire("b")
+        self.assertEqual(ctx.exception.reason, "concurrency")
+        
+        controller.release()
+        with controller.admit("b"):
+            pass
+        self.assertEqual(controller.get_stats()["rejected"], {"concurrency": 1})
+    
+    def test_client_buckets_are_bounded(self):
+        """Test that the least recently seen clients are forgotten"""
+        controller = AdmissionController(rate_limit="10 per second", max_clients=2, clock=self.clock)
+        for client in ("a", "b", "c"):
+            with controller.admit(client):
+                pass
+        
+        self.assertEqual(list(controller._buckets), ["b", "c"])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
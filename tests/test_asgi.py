@@ -0,0 +1,154 @@
+import unittest
+import asyncio
+import json
+import threading
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api import routes
+from app.asgi import AsgiApp
+from app.services.admission import AdmissionController
+from app.services.model_registry import ModelRegistry
+
+class StubPredictionService:
+    """Echoes the input back as the prediction"""
+    
+    def __init__(self):
+        self.stream_threads = set()
+    
+    def predict(self, input_data, as_numpy=False, postprocess=None):
+        return {"success": True, "prediction": [input_data], "shape": [1, len(input_data)]}
+    
+    def batch_predict(self, batch_data, as_numpy=False, postprocess=None):
+        return {"success": True, "predictions": batch_data, "batch_size": len(batch_data)}
+    
+    def stream_predict(self, records, chunk_size=1024, postprocess=None, offset=0):
+        records = list(records)
+        errors = {i: str(record) for i, record in enumerate(records) if isinstance(record, Exception)}
+        accepted = [i for i in range(len(records)) if i not in errors]
+        self.stream_threads.add(threading.current_thread().name)
+        yield {
+            "offset": offset,
+            "size": len(records),
+            "predictions": np.array([records[i] for i in accepted], dtype=np.float32),
+            "row_indices": accepted,
+            "errors": errors
+        }
+
+def call(app, method, path, body=b'', content_type='application/json'):
+    """Run one request through the ASGI app and collect the response
+    
+    A list body is sent as one request message per item.
+    """
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [(b'content-type', content_type.encode())]
+    }
+    parts = body if isinstance(body, list) else [body]
+    messages = [{'type': 'http.request', 'body': part, 'more_body': i < len(parts) - 1}
+                for i, part in enumerate(parts)]
+    sent = []
+    
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+    
+    async def send(message):
+        sent.append(message)
+    
+    asyncio.run(app(scope, receive, send))
+    headers = dict(sent[0]['headers'])
+    return sent[0]['status'], headers, b''.join(message.get('body', b'') for message in sent[1:])
+
+class TestAsgiApp(unittest.TestCase):
+    
+    def setUp(self):
+        """Serve a stub prediction service"""
+        self.previous_registry = routes._model_registry
+        registry = ModelRegistry(lambda path: StubPredictionService())
+        self.service = StubPredictionService()
+        registry.add('stub', self.service, version='1')
+        routes._model_registry = registry
+        self.app = AsgiApp(inference_threads=2, max_pending=4, admission=AdmissionController())
+    
+    def tearDown(self):
+        routes._model_registry = self.previous_registry
+        self.app.executor.shutdown()
+    
+    def test_health(self):
+        """Test the health endpoint on the same path as the Flask app"""
+        status, headers, body = call(self.app, 'GET', '/api/api/health')
+        
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["status"], "healthy")
+        self.assertIn(b'server-timing', headers)
+    
+    def test_liveness_and_readiness(self):
+        """Test that readiness is 503 while warming up and 200 once warm; liveness is always 200"""
+        readiness = routes.readiness
+        self.addCleanup(setattr, readiness, 'state', readiness.state)
+        readiness.state = 'warming'
+        
+        status, _, body = call(self.app, 'GET', '/api/api/health/ready')
+        self.assertEqual((status, json.loads(body)["status"]), (503, "warming"))
+        self.assertEqual(call(self.app, 'GET', '/api/api/health/live')[0], 200)
+        self.assertFalse(json.loads(call(self.app, 'GET', '/api/api/health')[2])["ready"])
+        
+        readiness.finish({"settled": True})
+        status, _, body = call(self.app, 'GET', '/api/api/health/ready')
+        self.assertEqual((status, json.loads(body)["warm_up"]), (200, {"settled": True}))
+    
+    def test_predict_runs_off_loop(self):
+        """Test a JSON prediction and a batch prediction"""
+        status, _, body = call(self.app, 'POST', '/api/api/predict', json.dumps({"input": [1.0, 2.0]}).encode())
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["prediction"], [[1.0, 2.0]])
+        
+        status, _, body = call(self.app, 'POST', '/api/api/predict/batch', json.dumps({"inputs": [[1.0], [2.0]]}).encode())
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["batch_size"], 2)
+    
+    def test_errors(self):
+        """Test missing input, malformed JSON, unknown paths and wrong methods"""
+        self.assertEqual(call(self.app, 'POST', '/api/api/predict', b'{}')[0], 400)
+        self.assertEqual(call(self.app, 'POST', '/api/api/predict', b'{not json')[0], 400)
+        self.assertEqual(call(self.app, 'GET', '/api/api/nothing')[0], 404)
+        self.assertEqual(call(self.app, 'GET', '/api/api/predict')[0], 405)
+        self.assertEqual(call(self.app, 'POST', '/api/api/predict?model=missing', b'{"input": [1.0]}')[0], 404)
+        self.assertEqual(call(self.app, 'POST', '/api/api/predict?activation=relu', b'{"input": [1.0]}')[0], 400)
+        self.assertEqual(call(self.app, 'POST', '/api/api/predict?top_k=two', b'{"input": [1.0]}')[0], 400)
+        self.assertEqual(call(self.app, 'POST', '/api/api/admin/profile', b'{"requests": 1}')[0], 403)
+    
+    def test_rate_limited_requests_get_retry_after(self):
+        """Test that a client over its rate limit gets 429 with Retry-After, and health is unaffected"""
+        self.app.admission = AdmissionController(rate_limit='1 per minute')
+        body = json.dumps({"input": [1.0]}).encode()
+        
+        self.assertEqual(call(self.app, 'POST', '/api/api/predict', body)[0], 200)
+        status, headers, _ = call(self.app, 'POST', '/api/api/predict', body)
+        self.assertEqual(status, 429)
+        self.assertEqual(int(headers[b'retry-after']), 60)
+        self.assertEqual(call(self.app, 'GET', '/api/api/health')[0], 200)
+    
+    def test_stream_predict(self):
+        """Test that records split across body messages are scored in chunks on the inference pool"""
+        body = [b'[1.0, 2.0]\n[3.0', b', 4.0]\nnot json\n', b'[5.0, 6.0]']
+        status, headers, response = call(self.app, 'POST', '/api/api/predict/stream?chunk_size=2', body,
+                                         content_type='application/x-ndjson')
+        lines = [json.loads(line) for line in response.decode().splitlines()]
+        
+        self.assertEqual(status, 200)
+        self.assertEqual([line["index"] for line in lines], [0, 1, 2, 3])
+        self.assertEqual(lines[1]["prediction"], [3.0, 4.0])
+        self.assertIn("error", lines[2])
+        self.assertEqual(lines[3]["prediction"], [5.0, 6.0])
+        self.assertTrue(all(name.startswith('inference') for name in self.service.stream_threads))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
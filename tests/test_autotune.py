@@ -0,0 +1,128 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import autotune
+from app.services.autotune import apply_profile, choose_best, default_thread_counts, profile_name, save_profile, time_calls
+
+def result(backend, threads, batch_size, rows_per_second, p99_ms):
+    return {"backend": backend, "threads": threads, "batch_size": batch_size,
+            "rows_per_second": rows_per_second, "p99_ms": p99_ms}
+
+class DummyConfig:
+    MODEL_BACKEND = 'eager'
+    WORKERS = 1
+    TOPOLOGY_ENABLED = False
+    TOPOLOGY_INTRA_OP_THREADS = None
+    BATCHING_ENABLED = True
+    BATCHING_MAX_BATCH_SIZE = 64
+    AUTOTUNE_ENABLED = True
+
+class TestAutotune(unittest.TestCase):
+    
+    def test_default_thread_counts(self):
+        """Test powers of two up to the core count, ending at the core count"""
+        self.assertEqual(default_thread_counts(1), [1])
+        self.assertEqual(default_thread_counts(8), [1, 2, 4, 8])
+        self.assertEqual(default_thread_counts(6), [1, 2, 4, 6])
+    
+    def test_profile_name(self):
+        """Test that profiles are keyed by CPU model, core count and model hash"""
+        name = profile_name("Intel(R) Xeon(R) Platinum 8375C CPU @ 2.90GHz", 16, "ab" * 32)
+        self.assertEqual(name, "intel-r-xeon-r-platinum-8375c-cpu-2-90ghz-16cpu-abababababababab.json")
+        self.assertNotEqual(name, profile_name("Intel(R) Xeon(R) Platinum 8375C CPU @ 2.90GHz", 8, "ab" * 32))
+    
+    def test_time_calls(self):
+        """Test that calls run until the time slice is spent, and at least min_iterations times"""
+        now = [0.0]
+        
+        def call():
+            now[0] += 0.25
+        
+        self.assertEqual(len(time_calls(call, 2.0, min_iterations=3, clock=lambda: now[0])), 8)
+        self.assertEqual(len(time_calls(call, 0.0, min_iterations=3, clock=lambda: now[0])), 3)
+    
+    def test_choose_best_maximizes_machine_throughput_within_slo(self):
+        """Test that throughput is scaled by how many workers fit and settings over the SLO lose"""
+        results = [
+            result('eager', 1, 32, 4000.0, 10.0),        # 8 workers: 32000 rows/s
+            result('eager', 8, 32, 20000.0, 3.0),        # 1 worker: 20000 rows/s
+            result('torchscript', 2, 128, 9000.0, 20.0), # 4 workers: 36000 rows/s
+            result('torchscript', 1, 128, 8000.0, 80.0)  # over the SLO
+        ]
+        best = choose_best(results, cpus=8, latency_slo_ms=50.0)
+        
+        self.assertEqual((best["backend"], best["intra_op_threads"], best["workers"], best["max_batch_size"]),
+                         ('torchscript', 2, 4, 128))
+        self.assertEqual(best["estimated_rows_per_second"], 36000.0)
+        self.assertTrue(best["meets_slo"])
+    
+    def test_choose_best_falls_back_to_lowest_latency(self):
+        """Test that the lowest p99 wins when nothing meets the SLO"""
+        best = choose_best([result('eager', 1, 64, 5000.0, 90.0), result('eager', 4, 1, 300.0, 60.0)],
+                           cpus=4, latency_slo_ms=50.0)
+        self.assertEqual((best["intra_op_threads"], best["max_batch_size"]), (4, 1))
+        self.assertFalse(best["meets_slo"])
+        
+        with self.assertRaises(ValueError):
+            choose_best([], cpus=4, latency_slo_ms=50.0)
+    
+    def test_save_and_apply_profile(self):
+        """Test that a saved profile overrides Config, except for settings given in the environment"""
+        profile = {"best": {"backend": "torchscript", "workers": 4, "intra_op_threads": 2, "max_batch_size": 128}}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = save_profile(profile, os.path.join(tmp_dir, 'profiles', 'host.json'))
+            with open(path, 'r') as f:
+                self.assertEqual(json.load(f), profile)
+        
+        with mock.patch.dict(os.environ, {'WORKERS': '2'}):
+            os.environ.pop('MODEL_BACKEND', None)
+            os.environ.pop('TOPOLOGY_ENABLED', None)
+            os.environ.pop('TOPOLOGY_INTRA_OP_THREADS', None)
+            os.environ.pop('BATCHING_MAX_BATCH_SIZE', None)
+            config = type('Config', (DummyConfig,), {})
+            applied = apply_profile(config, profile)
+        
+        self.assertNotIn('WORKERS', applied)
+        self.assertEqual(config.WORKERS, 1)
+        self.assertEqual((config.MODEL_BACKEND, config.TOPOLOGY_INTRA_OP_THREADS, config.BATCHING_MAX_BATCH_SIZE),
+                         ('torchscript', 2, 128))
+        self.assertTrue(config.TOPOLOGY_ENABLED)
+    
+    def test_batch_size_left_alone_without_batching(self):
+        """Test that the tuned batch size isn't reported as applied while micro-batching is off"""
+        profile = {"best": {"backend": "eager", "max_batch_size": 128}}
+        config = type('Config', (DummyConfig,), {'BATCHING_ENABLED': False})
+        with mock.patch.dict(os.environ, {}, clear=True):
+            applied = apply_profile(config, profile)
+        
+        self.assertEqual(applied, {"MODEL_BACKEND": "eager"})
+        self.assertEqual(config.BATCHING_MAX_BATCH_SIZE, 64)
+    
+    def test_startup_without_profiles_skips_hashing(self):
+        """Test that startup doesn't read the model file when no profile exists for this machine"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'model.pkl')
+            with open(model_path, 'wb') as f:
+                f.write(b'weights')
+            config = type('Config', (DummyConfig,), {
+                'MODEL_PATH': model_path, 'AUTOTUNE_PROFILE_DIR': os.path.join(tmp_dir, 'profiles')
+            })
+            
+            with mock.patch.object(autotune, 'file_hash', side_effect=AssertionError("hashed the model")):
+                self.assertIsNone(autotune.apply_startup_profile(config))
+            
+            path = save_profile({"best": {"backend": "torchscript"}},
+                                autotune.profile_path(config.AUTOTUNE_PROFILE_DIR, model_path))
+            self.assertTrue(autotune.has_machine_profiles(config.AUTOTUNE_PROFILE_DIR))
+            with mock.patch.dict(os.environ, {}, clear=True):
+                self.assertEqual(autotune.apply_startup_profile(config), {"MODEL_BACKEND": "torchscript"})
+            self.assertTrue(os.path.exists(path))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
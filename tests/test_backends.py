@@ -0,0 +1,55 @@
+import unittest
+import tempfile
+import os
+import sys
+import torch
+import torch.nn as nn
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import backends
+
+class TestBackends(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a small MLP and an artifact directory"""
+        self.model = nn.Sequential(nn.Linear(6, 8), nn.ReLU(), nn.Linear(8, 2)).eval()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.device = torch.device('cpu')
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def build(self, name):
+        return backends.create_backend(name, self.model, 6, self.device, 'abc123', artifact_dir=self.tmpdir.name)
+    
+    def test_eager(self):
+        """Test that eager is returned as-is"""
+        self.assertEqual(self.build('eager').name, 'eager')
+    
+    def test_torchscript_matches_eager_and_is_cached(self):
+        """Test TorchScript export, validation and on-disk caching"""
+        backend = self.build('torchscript')
+        self.assertEqual(backend.name, 'torchscript')
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir.name, 'abc123.torchscript.pt')))
+        
+        x = torch.randn(3, 6)
+        with torch.no_grad():
+            self.assertTrue(torch.allclose(backend(x), self.model(x), atol=1e-5))
+        
+        # A second build loads the cached artifact
+        self.assertEqual(self.build('torchscript').name, 'torchscript')
+    
+    def test_onnxruntime(self):
+        """Test the ONNX Runtime backend when it is installed"""
+        if backends.onnxruntime is None:
+            self.skipTest("onnxruntime is not installed")
+        
+        self.assertEqual(self.build('onnxruntime').name, 'onnxruntime')
+    
+    def test_unknown_backend_falls_back(self):
+        """Test that an unknown backend name falls back to eager"""
+        self.assertEqual(self.build('tensorrt').name, 'eager')
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
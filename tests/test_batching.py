@@ -0,0 +1,56 @@
+import unittest
+import threading
+import torch
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.prediction_service import MicroBatcher
+
+class TestMicroBatcher(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a batcher around a simple linear function"""
+        self.weights = torch.arange(12, dtype=torch.float32).reshape(4, 3)
+        self.batcher = MicroBatcher(lambda x: x @ self.weights, max_batch_size=8, max_wait_ms=20)
+    
+    def tearDown(self):
+        self.batcher.shutdown()
+    
+    def test_single_submit(self):
+        """Test that a lone request gets its own row back"""
+        row = torch.ones(1, 4)
+        result = self.batcher.submit(row)
+        
+        self.assertEqual(tuple(result.shape), (1, 3))
+        self.assertTrue(torch.allclose(result, row @ self.weights))
+    
+    def test_concurrent_submits_are_coalesced(self):
+        """Test that concurrent requests share a forward pass and get their own rows"""
+        results = {}
+        
+        def worker(i):
+            results[i] = self.batcher.submit(torch.full((1, 4), float(i)))
+        
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        for i in range(8):
+            expected = torch.full((1, 4), float(i)) @ self.weights
+            self.assertTrue(torch.allclose(results[i], expected))
+        
+        stats = self.batcher.get_stats()
+        self.assertEqual(stats['rows_processed'], 8)
+        self.assertLess(stats['batches_run'], 8)
+    
+    def test_errors_reach_callers(self):
+        """Test that a failing forward pass raises in the caller"""
+        with self.assertRaises(RuntimeError):
+            self.batcher.submit(torch.ones(1, 5))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,47 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run import compare, measure
+from benchmarks.synthetic_model import make_synthetic_model
+
+class TestBenchmarks(unittest.TestCase):
+    
+    def result(self, p50, p99, rows_per_sec):
+        return {"name": "model.predict", "batch_size": 64, "threads": 1,
+                "p50_ms": p50, "p99_ms": p99, "rows_per_sec": rows_per_sec}
+    
+    def test_synthetic_model_shape(self):
+        """Test that the synthetic MLP has the requested width and depth"""
+        model = make_synthetic_model(input_size=20, hidden_size=32, depth=2, output_size=3)
+        
+        self.assertEqual(model[0].in_features, 20)
+        self.assertEqual(model[-1].out_features, 3)
+        self.assertEqual(len(model), 5)
+    
+    def test_measure_reports_percentiles(self):
+        """Test the latency summary"""
+        stats = measure(lambda: None, iterations=10, warmup=1)
+        
+        self.assertEqual(stats['iterations'], 10)
+        self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+    
+    def test_compare_flags_regressions(self):
+        """Test that slower latency and lower throughput are flagged"""
+        baseline = {"results": [self.result(1.0, 2.0, 1000.0)]}
+        current = {"results": [self.result(1.5, 2.0, 700.0)]}
+        
+        metrics = {regression['metric'] for regression in compare(baseline, current, 0.1)}
+        self.assertEqual(metrics, {'p50_ms', 'rows_per_sec'})
+    
+    def test_compare_within_threshold(self):
+        """Test that small changes are not regressions"""
+        baseline = {"results": [self.result(1.0, 2.0, 1000.0)]}
+        current = {"results": [self.result(1.05, 2.1, 960.0)]}
+        
+        self.assertEqual(compare(baseline, current, 0.1), [])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
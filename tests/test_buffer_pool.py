@@ -0,0 +1,60 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.buffer_pool import BufferPool, bucket_rows
+
+class TestBufferPool(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a pool with room for a few small buffers"""
+        self.pool = BufferPool(max_bytes=64 * 10 * 4)
+    
+    def test_bucket_rows(self):
+        """Test power-of-two row buckets"""
+        self.assertEqual([bucket_rows(rows) for rows in (0, 1, 2, 3, 5, 64, 65)], [1, 1, 2, 4, 8, 64, 128])
+    
+    def test_leases_are_reused(self):
+        """Test that sizes in one bucket share a contiguous buffer"""
+        with self.pool.lease(5, 10) as first:
+            self.assertEqual(first.shape, (5, 10))
+            self.assertEqual(first.dtype, np.float32)
+            self.assertTrue(first.flags.c_contiguous)
+            address = first.ctypes.data
+        
+        with self.pool.lease(7, 10) as second:
+            self.assertEqual(second.shape, (7, 10))
+            self.assertEqual(second.ctypes.data, address)
+        
+        stats = self.pool.get_stats()
+        self.assertEqual((stats["leases"], stats["reuses"], stats["allocations"]), (2, 1, 1))
+        self.assertEqual(stats["in_use_mb"], 0)
+    
+    def test_concurrent_leases_get_distinct_buffers(self):
+        """Test that a buffer is never lent twice at once"""
+        with self.pool.lease(4, 10) as first, self.pool.lease(4, 10) as second:
+            self.assertNotEqual(first.ctypes.data, second.ctypes.data)
+        
+        self.assertEqual(self.pool.get_stats()["idle_buffers"], {"4x10": 2})
+        self.assertEqual(self.pool.high_water_in_use_bytes, 2 * 4 * 10 * 4)
+    
+    def test_memory_cap(self):
+        """Test that idle buffers are evicted for new shapes and leases past the cap aren't pooled"""
+        with self.pool.lease(32, 10):
+            pass
+        with self.pool.lease(64, 10) as large:
+            self.assertEqual(large.shape, (64, 10))
+            self.assertEqual(self.pool.evictions, 1)
+            with self.pool.lease(1, 10) as overflow:
+                self.assertEqual(overflow.shape, (1, 10))
+        
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["overflows"], 1)
+        self.assertLessEqual(stats["high_water_mb"], stats["max_mb"])
+        self.assertEqual(stats["idle_buffers"], {"64x10": 1})
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
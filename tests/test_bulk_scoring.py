@@ -0,0 +1,70 @@
+import unittest
+import tempfile
+import numpy as np
+import torch
+import torch.nn as nn
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import bulk_scoring
+
+class TestBulkScoring(unittest.TestCase):
+    
+    def setUp(self):
+        """Save a small linear model and input file to a temp directory"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.tmpdir.name, 'model.pkl')
+        self.model = nn.Sequential(nn.Linear(4, 2))
+        torch.save(self.model, self.model_path)
+        
+        self.inputs = np.random.rand(50, 4).astype(np.float32)
+        self.input_path = os.path.join(self.tmpdir.name, 'inputs.npy')
+        np.save(self.input_path, self.inputs)
+        self.output_path = os.path.join(self.tmpdir.name, 'scores.npy')
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def expected(self):
+        with torch.no_grad():
+            return self.model(torch.from_numpy(self.inputs)).numpy()
+    
+    def test_score_npy(self):
+        """Test that every row is scored into the output file"""
+        summary = bulk_scoring.score_file(self.model_path, self.input_path, self.output_path,
+                                          workers=2, threads_per_worker=1, shard_size=16, batch_size=8)
+        
+        self.assertEqual(summary['rows'], 50)
+        self.assertEqual(summary['shards_scored'], 4)
+        np.testing.assert_allclose(np.load(self.output_path), self.expected(), rtol=1e-5)
+    
+    def test_resume_skips_completed_shards(self):
+        """Test that a rerun only scores shards missing from the progress file"""
+        bulk_scoring.score_file(self.model_path, self.input_path, self.output_path,
+                                workers=1, threads_per_worker=1, shard_size=16)
+        
+        # Pretend the last shard never finished
+        progress_path = self.output_path + '.progress'
+        with open(progress_path) as f:
+            lines = f.read().splitlines()
+        with open(progress_path, 'w') as f:
+            f.write('\n'.join(line for line in lines if line != '3') + '\n')
+        
+        summary = bulk_scoring.score_file(self.model_path, self.input_path, self.output_path,
+                                          workers=1, threads_per_worker=1, shard_size=16)
+        
+        self.assertEqual(summary['shards_scored'], 1)
+        np.testing.assert_allclose(np.load(self.output_path), self.expected(), rtol=1e-5)
+    
+    def test_csv_conversion(self):
+        """Test that CSV input is converted to a memory-mappable .npy"""
+        csv_path = os.path.join(self.tmpdir.name, 'inputs.csv')
+        np.savetxt(csv_path, self.inputs, delimiter=',')
+        npy_path = bulk_scoring.csv_to_npy(csv_path, os.path.join(self.tmpdir.name, 'converted.npy'), chunk_rows=7)
+        
+        np.testing.assert_allclose(np.load(npy_path), self.inputs, rtol=1e-6)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
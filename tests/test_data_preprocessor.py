@@ -0,0 +1,99 @@
+import unittest
+import numpy as np
+import torch
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.data_preprocessor import DataPreprocessor
+from app.utils.feature_monitor import FeatureMonitor
+
+class TestDataPreprocessor(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.preprocessor = DataPreprocessor()
+    
+    def test_single_list(self):
+        """Test that a flat list becomes a (1, F) tensor"""
+        tensor = self.preprocessor.process([0.1, 0.2, 0.3], 3)
+        
+        self.assertEqual(tuple(tensor.shape), (1, 3))
+        self.assertEqual(tensor.dtype, torch.float32)
+    
+    def test_homogeneous_batch(self):
+        """Test that equal-length rows become one (N, F) tensor"""
+        tensor, indices, errors = self.preprocessor.process_batch([[0.1] * 4, [0.2] * 4, [0.3] * 4], 4)
+        
+        self.assertEqual(tuple(tensor.shape), (3, 4))
+        self.assertTrue(tensor.is_contiguous())
+        self.assertEqual(indices, [0, 1, 2])
+        self.assertEqual(errors, {})
+    
+    def test_feature_dict_batch(self):
+        """Test that a batch of {'features': [...]} dicts takes the same path"""
+        batch = [{"features": [1.0, 2.0]}, {"features": [3.0, 4.0]}]
+        tensor, indices, errors = self.preprocessor.process_batch(batch, 2)
+        
+        np.testing.assert_array_equal(tensor.numpy(), [[1.0, 2.0], [3.0, 4.0]])
+        self.assertEqual(errors, {})
+    
+    def test_ragged_batch_reports_bad_rows(self):
+        """Test that ragged rows are rejected individually"""
+        batch = [[1.0, 2.0, 3.0], [1.0, 2.0], "bad", [4.0, 5.0, 6.0]]
+        tensor, indices, errors = self.preprocessor.process_batch(batch, 3)
+        
+        self.assertEqual(tuple(tensor.shape), (2, 3))
+        self.assertEqual(indices, [0, 3])
+        self.assertEqual(sorted(errors), [1, 2])
+    
+    def test_batch_written_into_buffer(self):
+        """Test that a matching batch is parsed into the given buffer without a copy"""
+        out = np.full((2, 3), np.nan, dtype=np.float32)
+        tensor, indices, errors = self.preprocessor.process_batch([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], 3, out=out)
+        
+        self.assertEqual(tensor.data_ptr(), out.ctypes.data)
+        np.testing.assert_array_equal(out, [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+        
+        tensor = self.preprocessor.process([7.0, 8.0, 9.0], 3, out=out[:1])
+        self.assertEqual(tensor.data_ptr(), out.ctypes.data)
+    
+    def test_buffer_never_broadcasts(self):
+        """Test that rows that don't match the buffer's shape take the normal path"""
+        out = np.zeros((3, 3), dtype=np.float32)
+        
+        tensor, indices, errors = self.preprocessor.process_batch([1.0, 2.0, 3.0], 3, out=out)
+        self.assertEqual(indices, [])
+        self.assertEqual(sorted(errors), [0, 1, 2])
+        
+        tensor, indices, errors = self.preprocessor.process_batch([[1.0], [2.0], [3.0]], 3, out=out)
+        self.assertEqual(indices, [])
+        np.testing.assert_array_equal(out, np.zeros((3, 3)))
+    
+    def test_monitor_sees_accepted_rows(self):
+        """Test that an attached monitor observes single inputs and the accepted rows of batches"""
+        preprocessor = DataPreprocessor(monitor=FeatureMonitor(sample_rate=1.0))
+        preprocessor.process([1.0, 2.0, 3.0], 3)
+        preprocessor.process_batch([[3.0, 4.0, 5.0], "bad"], 3)
+        
+        stats = preprocessor.monitor.get_stats()
+        self.assertEqual(stats["rows_sampled"], 2)
+        np.testing.assert_allclose(stats["mean"], [2.0, 3.0, 4.0])
+    
+    def test_monitor_ignores_wrong_width_inputs(self):
+        """Test that a malformed first request doesn't fix the monitor's width"""
+        preprocessor = DataPreprocessor(monitor=FeatureMonitor(sample_rate=1.0))
+        preprocessor.process([1.0, 2.0], 3)
+        preprocessor.process([1.0, 2.0, 3.0], 3)
+        
+        stats = preprocessor.monitor.get_stats()
+        self.assertEqual((stats["num_features"], stats["rows_sampled"], stats["skipped_rows"]), (3, 1, 0))
+        
+        # Sized from the model up front, wrong-width rows are skipped rather than adopted
+        monitor = FeatureMonitor(sample_rate=1.0, num_features=3)
+        monitor.observe(np.zeros((2, 5), dtype=np.float32))
+        self.assertEqual((monitor.get_stats()["num_features"], monitor.get_stats()["skipped_rows"]), (3, 2))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
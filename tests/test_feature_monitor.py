@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.feature_monitor import FeatureMonitor, ReferenceStats, fit_reference
+
+class TestFeatureMonitor(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up training-like data: three features on different scales"""
+        rng = np.random.default_rng(0)
+        self.data = (rng.standard_normal((20000, 3)) * [1.0, 5.0, 0.1] + [0.0, 10.0, -2.0]).astype(np.float32)
+    
+    def test_moments_match_numpy_across_batches(self):
+        """Test that batch-merged Welford moments and min/max equal a single pass over all rows"""
+        monitor = FeatureMonitor(sample_rate=1.0, seed=0)
+        for chunk in np.array_split(self.data, 7):
+            monitor.observe(chunk)
+        for row in self.data[:5]:
+            monitor.observe(row)
+        
+        seen = np.concatenate([self.data, self.data[:5]]).astype(np.float64)
+        stats = monitor.get_stats()
+        self.assertEqual(stats["rows_sampled"], len(seen))
+        np.testing.assert_allclose(stats["mean"], seen.mean(axis=0), rtol=1e-9)
+        np.testing.assert_allclose(stats["std"], seen.std(axis=0), rtol=1e-9)
+        np.testing.assert_array_equal(stats["min"], seen.min(axis=0))
+        np.testing.assert_array_equal(stats["max"], seen.max(axis=0))
+    
+    def test_quantiles_from_reservoir(self):
+        """Test that reservoir quantiles approximate the true ones"""
+        monitor = FeatureMonitor(sample_rate=1.0, reservoir_size=4096, seed=0)
+        for chunk in np.array_split(self.data, 20):
+            monitor.observe(chunk)
+        
+        quantiles = monitor.get_stats()["quantiles"]
+        self.assertEqual(sorted(quantiles), ["p01", "p05", "p25", "p50", "p75", "p95", "p99"])
+        np.testing.assert_allclose(quantiles["p50"], np.median(self.data, axis=0), atol=0.15)
+        np.testing.assert_allclose(quantiles["p95"], np.quantile(self.data, 0.95, axis=0), atol=0.5)
+    
+    def test_sampling_and_bad_rows(self):
+        """Test row sampling, and that non-finite and wrong-width rows are left out"""
+        monitor = FeatureMonitor(sample_rate=0.25, seed=0)
+        monitor.observe(self.data)
+        self.assertAlmostEqual(monitor.get_stats()["rows_sampled"] / len(self.data), 0.25, delta=0.02)
+        
+        monitor = FeatureMonitor(sample_rate=1.0)
+        monitor.observe(np.array([[1.0, np.nan, 2.0], [1.0, 2.0, 3.0]], dtype=np.float32))
+        monitor.observe(np.zeros((4, 5), dtype=np.float32))
+        stats = monitor.get_stats()
+        self.assertEqual((stats["rows_sampled"], stats["non_finite_rows"], stats["skipped_rows"]), (1, 1, 4))
+        self.assertEqual(stats["rows_offered"], 6)
+    
+    def test_drift_against_reference(self):
+        """Test that only the shifted feature is flagged as drifted"""
+        reference = fit_reference(np.array_split(self.data, 4), bins=10)
+        np.testing.assert_allclose(reference.fractions.sum(axis=1), 1.0)
+        
+        monitor = FeatureMonitor(sample_rate=1.0, reference=reference, feature_names=['a', 'b', 'c'], seed=0)
+        live = self.data[:5000].copy()
+        live[:, 1] += 5.0
+        monitor.observe(live)
+        
+        drift = monitor.get_stats()["drift"]
+        self.assertEqual(drift["drifted_features"], ['b'])
+        self.assertLess(drift["psi"][0], 0.05)
+        self.assertGreater(drift["psi"][1], 0.2)
+        self.assertAlmostEqual(drift["mean_shift_std"][1], 1.0, delta=0.1)
+    
+    def test_reference_round_trip(self):
+        """Test that reference statistics survive a save and load"""
+        reference = fit_reference([self.data], bins=4)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = reference.save(os.path.join(tmpdir, 'model.reference.json'))
+            loaded = ReferenceStats.load(path)
+        
+        self.assertEqual((loaded.num_features, loaded.bins, loaded.count), (3, 4, len(self.data)))
+        np.testing.assert_array_equal(loaded.edges, reference.edges)
+        np.testing.assert_allclose(loaded.fractions, reference.fractions)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import torch
+import torch.nn as nn
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.feature_scaling import FeatureScaler, default_scaler_path, fit_scaler, fold_into_linear
+
+class TestFeatureScaling(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up training data with distinct per-feature mean and spread"""
+        rng = np.random.default_rng(0)
+        self.data = (rng.standard_normal((1000, 4)) * [1.0, 5.0, 0.1, 20.0] + [0.0, 3.0, -2.0, 100.0]).astype(np.float32)
+    
+    def test_streaming_fit_matches_full_pass(self):
+        """Test that fitting chunk by chunk gives the same statistics as numpy over the whole array"""
+        chunks = (self.data[start:start + 64] for start in range(0, len(self.data), 64))
+        scaler = fit_scaler(chunks)
+        
+        self.assertEqual(scaler.count, 1000)
+        np.testing.assert_allclose(scaler.mean, self.data.astype(np.float64).mean(axis=0), rtol=1e-6)
+        np.testing.assert_allclose(scaler.std, self.data.astype(np.float64).std(axis=0), rtol=1e-6)
+    
+    def test_transform_standardizes(self):
+        """Test that transformed training data has zero mean and unit variance"""
+        scaler = fit_scaler([self.data])
+        transformed = scaler.transform(self.data.copy())
+        
+        np.testing.assert_allclose(transformed.mean(axis=0), 0.0, atol=1e-4)
+        np.testing.assert_allclose(transformed.std(axis=0), 1.0, atol=1e-4)
+    
+    def test_transform_copies_read_only_input(self):
+        """Test that read-only arrays (e.g. decoded request bodies) are never written to"""
+        scaler = fit_scaler([self.data])
+        view = np.frombuffer(self.data.tobytes(), dtype=np.float32).reshape(self.data.shape)
+        
+        transformed = scaler.transform(view)
+        self.assertFalse(np.shares_memory(transformed, view))
+        np.testing.assert_array_equal(view, self.data)
+    
+    def test_constant_feature_is_only_centred(self):
+        """Test that a zero-variance feature doesn't divide by zero"""
+        scaler = fit_scaler([np.full((10, 2), 7.0, dtype=np.float32)])
+        
+        np.testing.assert_array_equal(scaler.transform(np.full((1, 2), 7.0, dtype=np.float32)), [[0.0, 0.0]])
+    
+    def test_folded_model_matches_explicit_scaling(self):
+        """Test that folding into the first Linear layer gives the same outputs as scaling the input"""
+        torch.manual_seed(0)
+        model = nn.Sequential(nn.Linear(4, 8), nn.ReLU(), nn.Linear(8, 2)).eval()
+        scaler = fit_scaler([self.data])
+        inputs = torch.from_numpy(self.data[:32])
+        
+        with torch.no_grad():
+            expected = model(scaler.transform_tensor(inputs))
+            self.assertTrue(fold_into_linear(model, scaler))
+            actual = model(inputs)
+        
+        torch.testing.assert_close(actual, expected, rtol=1e-4, atol=1e-4)
+    
+    def test_fold_declines_non_sequential_models(self):
+        """Test that models without a leading Linear layer are left alone"""
+        model = nn.Sequential(nn.ReLU(), nn.Linear(4, 2))
+        
+        self.assertFalse(fold_into_linear(model, fit_scaler([self.data])))
+    
+    def test_save_and_load(self):
+        """Test that statistics round-trip through the file next to the model"""
+        scaler = fit_scaler([self.data])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = default_scaler_path(os.path.join(tmpdir, 'model.pkl'))
+            scaler.save(path)
+            loaded = FeatureScaler.load(path)
+        
+        self.assertTrue(path.endswith('model.scaler.json'))
+        self.assertEqual(loaded.digest(), scaler.digest())
+        self.assertEqual(loaded.count, scaler.count)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,90 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.data_preprocessor import DataPreprocessor
+from app.utils.feature_schema import FeatureSchema
+
+class TestFeatureSchema(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a schema with required, defaulted, int and bool features"""
+        self.schema = FeatureSchema([
+            {"name": "bytes_in"},
+            {"name": "bytes_out", "default": 0},
+            {"name": "port", "dtype": "int", "default": 443},
+            {"name": "is_tls", "dtype": "bool", "default": 1}
+        ])
+    
+    def test_key_order_does_not_matter(self):
+        """Test that values land in their declared columns whatever the key order"""
+        records = [
+            {"bytes_in": 1.5, "bytes_out": 2.0, "port": 80, "is_tls": False},
+            {"is_tls": True, "port": 22, "bytes_out": 4.0, "bytes_in": 3.5}
+        ]
+        array, indices, errors = self.schema.records_to_array(records)
+        
+        np.testing.assert_array_equal(array, [[1.5, 2.0, 80, 0], [3.5, 4.0, 22, 1]])
+        self.assertEqual(array.dtype, np.float32)
+        self.assertEqual(indices, [0, 1])
+        self.assertEqual(errors, {})
+    
+    def test_missing_features_get_defaults(self):
+        """Test that omitted optional features take their defaults"""
+        array, _, errors = self.schema.records_to_array([{"bytes_in": 7.0}])
+        
+        np.testing.assert_array_equal(array, [[7.0, 0.0, 443, 1]])
+        self.assertEqual(errors, {})
+    
+    def test_invalid_records_are_rejected(self):
+        """Test that unknown keys, missing required features and bad values reject only their row"""
+        records = [
+            {"bytes_in": 1.0},
+            {"bytes_in": 1.0, "unexpected": 3},
+            {"bytes_out": 1.0},
+            {"bytes_in": "lots"},
+            {"bytes_in": 1.0, "port": 80.5},
+            {"bytes_in": 1.0, "is_tls": 2},
+            [1.0, 2.0, 3.0, 4.0]
+        ]
+        array, indices, errors = self.schema.records_to_array(records)
+        
+        self.assertEqual(indices, [0])
+        self.assertEqual(array.shape, (1, 4))
+        self.assertIn("Unknown feature 'unexpected'", errors[1])
+        self.assertIn("bytes_in", errors[2])
+        self.assertIn("not numeric", errors[3])
+        self.assertIn("port", errors[4])
+        self.assertIn("is_tls", errors[5])
+        self.assertIn("feature record", errors[6])
+    
+    def test_load_from_yaml(self):
+        """Test loading a schema file"""
+        with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+            f.write("features:\n  - name: a\n  - name: b\n    default: 2\n")
+        try:
+            schema = FeatureSchema.load(f.name)
+        finally:
+            os.remove(f.name)
+        
+        self.assertEqual(schema.names, ['a', 'b'])
+        self.assertEqual(schema.index, {'a': 0, 'b': 1})
+    
+    def test_preprocessor_uses_schema_for_named_input(self):
+        """Test that dict inputs go through the schema for single and batch requests"""
+        preprocessor = DataPreprocessor(schema=self.schema)
+        
+        tensor = preprocessor.process({"port": 8080, "bytes_in": 5.0})
+        np.testing.assert_array_equal(tensor.numpy(), [[5.0, 0.0, 8080, 1]])
+        
+        tensor, indices, errors = preprocessor.process_batch([{"bytes_in": 1.0}, {"nope": 1.0}], 4)
+        self.assertEqual(tuple(tensor.shape), (1, 4))
+        self.assertEqual(indices, [0])
+        self.assertIn(1, errors)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
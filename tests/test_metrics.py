@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import metrics
+
+class TestMetrics(unittest.TestCase):
+    
+    def test_histogram_renders_cumulative_buckets(self):
+        """Test that histogram buckets are cumulative and end with +Inf"""
+        histogram = metrics.Histogram('test_latency_seconds', 'Test latency', ('stage',), buckets=(0.1, 1.0))
+        histogram.observe(0.05, 'parse')
+        histogram.observe(0.5, 'parse')
+        histogram.observe(5.0, 'parse')
+        
+        lines = histogram.render()
+        self.assertIn('# TYPE test_latency_seconds histogram', lines)
+        self.assertIn('test_latency_seconds_bucket{stage="parse",le="0.1"} 1', lines)
+        self.assertIn('test_latency_seconds_bucket{stage="parse",le="1.0"} 2', lines)
+        self.assertIn('test_latency_seconds_bucket{stage="parse",le="+Inf"} 3', lines)
+        self.assertIn('test_latency_seconds_count{stage="parse"} 3', lines)
+    
+    def test_counter_and_gauge(self):
+        """Test counters accumulate per label set and gauges move both ways"""
+        counter = metrics.Counter('test_requests_total', 'Test requests', ('status',))
+        counter.inc('200')
+        counter.inc('200', amount=2)
+        counter.inc('500')
+        self.assertEqual(counter.value('200'), 3)
+        self.assertIn('test_requests_total{status="500"} 1', counter.render())
+        
+        gauge = metrics.Gauge('test_in_flight', 'Test gauge')
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        self.assertEqual(gauge.value(), 1)
+    
+    def test_stage_collects_request_timings(self):
+        """Test that stages feed both the histogram and the Server-Timing header"""
+        before = metrics.STAGE_LATENCY.count('test_stage')
+        metrics.start_request_timings()
+        with metrics.stage('test_stage'):
+            pass
+        with metrics.stage('test_stage'):
+            pass
+        
+        timings = metrics.pop_request_timings()
+        self.assertEqual([name for name, _ in timings], ['test_stage', 'test_stage'])
+        self.assertEqual(metrics.STAGE_LATENCY.count('test_stage'), before + 2)
+        
+        header = metrics.format_server_timing(timings, total=0.002)
+        self.assertRegex(header, r'^test_stage;dur=[0-9.]+, total;dur=2\.000$')
+        
+        # Outside a request nothing is collected
+        with metrics.stage('test_stage'):
+            pass
+        self.assertEqual(metrics.pop_request_timings(), [])
+    
+    def test_stage_counts_errors(self):
+        """Test that an exception inside a stage is counted and re-raised"""
+        before = metrics.STAGE_ERRORS.value('failing_stage')
+        with self.assertRaises(ValueError):
+            with metrics.stage('failing_stage'):
+                raise ValueError("boom")
+        self.assertEqual(metrics.STAGE_ERRORS.value('failing_stage'), before + 1)
+    
+    def test_render_includes_serving_metrics(self):
+        """Test that the exposition text includes the built-in serving metrics"""
+        text = metrics.render_metrics()
+        self.assertIn('# TYPE cyber_sentinel_request_seconds histogram', text)
+        self.assertIn('# TYPE cyber_sentinel_rows_scored_total counter', text)
+        self.assertTrue(text.endswith('\n'))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
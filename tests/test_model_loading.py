@@ -0,0 +1,118 @@
+import unittest
+import tempfile
+import sys
+import os
+from unittest import mock
+import torch
+import torch.nn as nn
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api import routes
+from app.models.cyber_sentinel import CyberSentinelModel
+from app.utils.model_utils import get_process_memory, load_pickled_model, mmap_unavailable_reason
+
+class StubPredictionService:
+    """Stands in for a PredictionService built by the registry"""
+    
+    def warm_up(self):
+        return {}
+    
+    def get_memory_mb(self):
+        return 1.0
+    
+    def close(self):
+        pass
+
+class TestModelLoading(unittest.TestCase):
+    
+    def setUp(self):
+        """Save a small MLP as a whole pickled module in torch's zip format"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.tmpdir.name, 'model.pkl')
+        torch.manual_seed(0)
+        torch.save(nn.Sequential(nn.Linear(6, 8), nn.ReLU(), nn.Linear(8, 2)).eval(), self.model_path)
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_mmap_load_matches_standard(self):
+        """Test that memory-mapped weights give the same predictions as a standard load"""
+        standard = CyberSentinelModel(self.model_path, load_mode='standard')
+        mapped = CyberSentinelModel(self.model_path, load_mode='mmap')
+        
+        x = torch.randn(5, 6)
+        self.assertTrue(torch.equal(standard.predict(x), mapped.predict(x)))
+        self.assertEqual(standard.model_version, mapped.model_version)
+    
+    def test_legacy_checkpoint_falls_back_to_standard_load(self):
+        """Test that mmap mode loads a legacy (non-zip) checkpoint the standard way"""
+        legacy_path = os.path.join(self.tmpdir.name, 'legacy.pkl')
+        torch.save(torch.load(self.model_path, weights_only=False), legacy_path, _use_new_zipfile_serialization=False)
+        
+        self.assertIsNotNone(mmap_unavailable_reason(legacy_path))
+        model = CyberSentinelModel(legacy_path, load_mode='mmap')
+        self.assertEqual(model.predict(torch.zeros(1, 6)).shape, (1, 2))
+    
+    def test_corrupt_checkpoint_is_not_retried(self):
+        """Test that an unreadable file raises its own error instead of a second load attempt's"""
+        corrupt_path = os.path.join(self.tmpdir.name, 'corrupt.pkl')
+        with open(self.model_path, 'rb') as source, open(corrupt_path, 'wb') as target:
+            target.write(source.read()[:200])
+        
+        with mock.patch('torch.load', side_effect=torch.load) as load:
+            with self.assertRaises(Exception):
+                load_pickled_model(corrupt_path)
+            self.assertEqual(load.call_count, 1)
+    
+    def test_backend_artifacts_are_kept_per_precision(self):
+        """Test that an int8 model doesn't reuse the fp32 TorchScript artifact from the same directory"""
+        options = {"artifact_dir": self.tmpdir.name}
+        fp32 = CyberSentinelModel(self.model_path, backend='torchscript', backend_options=options)
+        int8 = CyberSentinelModel(self.model_path, backend='torchscript', backend_options=options,
+                                  precision='int8-dynamic')
+        
+        self.assertEqual(fp32.backend.name, 'torchscript')
+        self.assertEqual(int8.backend.name, 'torchscript')
+        artifacts = sorted(name for name in os.listdir(self.tmpdir.name) if name.endswith('.torchscript.pt'))
+        self.assertEqual(artifacts, [f"{fp32.model_version}.fp32.torchscript.pt",
+                                     f"{int8.model_version}.int8-dynamic.torchscript.pt"])
+    
+    def test_unknown_load_mode(self):
+        """Test that an unknown load mode is rejected"""
+        with self.assertRaises(ValueError):
+            CyberSentinelModel(self.model_path, load_mode='lazy')
+    
+    def test_service_is_built_on_first_use(self):
+        """Test that nothing is loaded until the first request asks for the model"""
+        previous = routes._model_registry
+        routes._model_registry = None
+        self.addCleanup(setattr, routes, '_model_registry', previous)
+        
+        with mock.patch.object(routes, 'build_prediction_service',
+                               side_effect=lambda path, shadow=None: StubPredictionService()) as build:
+            self.assertFalse(routes.model_loaded())
+            routes.get_model_registry()
+            build.assert_not_called()
+            
+            with routes.lease_prediction_service() as service:
+                pass
+            with routes.lease_prediction_service() as again:
+                self.assertIs(again, service)
+            self.assertEqual(build.call_count, 1)
+            self.assertTrue(routes.model_loaded())
+    
+    def test_process_memory(self):
+        """Test that resident memory is reported in plausible megabytes"""
+        memory = get_process_memory()
+        
+        self.assertTrue(memory)
+        for value in memory.values():
+            self.assertGreaterEqual(value, 0.0)
+            self.assertLess(value, 1024 ** 2)
+        if 'rss_mb' in memory and 'rss_anon_mb' in memory:
+            self.assertGreater(memory['rss_mb'], 0.0)
+            self.assertLessEqual(memory['rss_anon_mb'], memory['rss_mb'] + 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
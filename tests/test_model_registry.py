@@ -0,0 +1,156 @@
+import unittest
+import threading
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.model_registry import ModelRegistry, UnknownModelError
+
+class StubService:
+    """Stands in for a PredictionService loaded from a path"""
+    
+    def __init__(self, path, size_mb=10.0, load_seconds=0.0):
+        time.sleep(load_seconds)
+        self.path = path
+        self.size_mb = size_mb
+        self.warmed = False
+        self.closed = False
+    
+    def warm_up(self):
+        self.warmed = True
+    
+    def get_memory_mb(self):
+        return self.size_mb
+    
+    def close(self):
+        self.closed = True
+
+class TestModelRegistry(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a registry whose factory records every load"""
+        self.loads = []
+        
+        def factory(path):
+            self.loads.append(path)
+            return StubService(path, load_seconds=self.load_seconds)
+        
+        self.load_seconds = 0.0
+        self.registry = ModelRegistry(factory, memory_budget_mb=25)
+        self.registry.register('a', 'a-v1.pkl', version='v1')
+        self.registry.register('b', 'b-v1.pkl', version='v1')
+        self.registry.register('c', 'c-v1.pkl', version='v1')
+    
+    def path_of(self, name=None, version=None):
+        """The model file behind the version a request for name/version gets"""
+        with self.registry.lease(name, version) as service:
+            return service.path
+    
+    def test_lazy_load_and_selection(self):
+        """Test that models load on first use and are chosen by name and version"""
+        self.assertEqual(self.loads, [])
+        self.assertFalse(self.registry.is_loaded())
+        self.assertEqual(self.path_of(), 'a-v1.pkl')
+        self.assertTrue(self.registry.is_loaded('a'))
+        self.assertFalse(self.registry.is_loaded('missing'))
+        self.assertEqual(self.path_of('b'), 'b-v1.pkl')
+        self.assertEqual(self.path_of('a', 'v1'), 'a-v1.pkl')
+        self.assertEqual(self.loads, ['a-v1.pkl', 'b-v1.pkl'])
+        
+        with self.assertRaises(UnknownModelError):
+            self.path_of('missing')
+        with self.assertRaises(UnknownModelError):
+            self.path_of('a', 'v9')
+    
+    def test_lru_eviction_under_budget(self):
+        """Test that the least recently used model is evicted and closed when over budget"""
+        with self.registry.lease('a') as first:
+            pass
+        with self.registry.lease('b') as second:
+            pass
+        for name in ('a', 'c'):
+            self.path_of(name)
+        
+        stats = self.registry.get_stats()
+        self.assertFalse(stats["models"]["b"]["versions"]["v1"]["resident"])
+        self.assertTrue(stats["models"]["a"]["versions"]["v1"]["resident"])
+        self.assertLessEqual(stats["memory_used_mb"], 25)
+        self.assertFalse(first.closed)
+        self.assertTrue(second.closed)
+    
+    def test_leased_model_closes_after_release(self):
+        """Test that an evicted model in use is only closed once its request finishes"""
+        with self.registry.lease('a') as service:
+            self.path_of('b')
+            self.path_of('c')
+            self.assertFalse(service.closed)
+        self.assertTrue(service.closed)
+    
+    def test_deploy_swaps_after_warm_up(self):
+        """Test that a deployed version becomes active only once loaded and warmed"""
+        self.load_seconds = 0.2
+        self.assertEqual(self.path_of('a'), 'a-v1.pkl')
+        
+        version = self.registry.deploy('a', 'a-v2.pkl', version='v2')
+        self.assertEqual(version, 'v2')
+        self.assertEqual(self.path_of('a'), 'a-v1.pkl')
+        self.wait_for_active('a', 'v2')
+        
+        with self.registry.lease('a') as service:
+            self.assertEqual(service.path, 'a-v2.pkl')
+            self.assertTrue(service.warmed)
+    
+    def wait_for_active(self, name, version):
+        deadline = time.time() + 5
+        while self.registry.get_stats()["models"][name]["active_version"] != version and time.time() < deadline:
+            time.sleep(0.01)
+    
+    def test_swapped_out_version_closes_after_last_lease(self):
+        """Test that a hot-swap unloads the old version once its in-flight requests finish"""
+        registry = ModelRegistry(StubService)
+        registry.register('a', 'a-v1.pkl', version='v1')
+        self.registry = registry
+        
+        with registry.lease('a') as old:
+            registry.deploy('a', 'a-v2.pkl', version='v2')
+            self.wait_for_active('a', 'v2')
+            self.assertFalse(old.closed)
+            self.assertFalse(registry.is_loaded('a', 'v1'))
+        self.assertTrue(old.closed)
+        
+        # Asking for the old version by name loads it again
+        with registry.lease('a', 'v1') as reloaded:
+            self.assertIsNot(reloaded, old)
+            self.assertFalse(reloaded.closed)
+    
+    def test_idle_swapped_out_version_closes_at_swap(self):
+        """Test that an old version with no requests in flight is closed as soon as the swap happens"""
+        registry = ModelRegistry(StubService)
+        registry.register('a', 'a-v1.pkl', version='v1')
+        self.registry = registry
+        with registry.lease('a') as old:
+            pass
+        
+        registry.deploy('a', 'a-v2.pkl', version='v2')
+        self.wait_for_active('a', 'v2')
+        deadline = time.time() + 5
+        while not old.closed and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(old.closed)
+        self.assertEqual(registry.get_stats()["memory_used_mb"], 10.0)
+    
+    def test_concurrent_loads_are_coalesced(self):
+        """Test that simultaneous first requests for a model load it once"""
+        self.load_seconds = 0.1
+        threads = [threading.Thread(target=self.path_of, args=('a',)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(self.loads, ['a-v1.pkl'])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,100 @@
+import unittest
+import json
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import wire_formats
+from app.utils.postprocessing import PostProcessing, parse_options
+
+class TestPostProcessing(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up raw outputs for a batch of three rows and four classes"""
+        self.outputs = np.array([
+            [0.1, 2.0, -1.0, 0.5],
+            [3.0, 0.0, 0.2, 2.9],
+            [-2.0, -1.0, -0.5, -3.0]
+        ], dtype=np.float32)
+    
+    def test_softmax_rows_sum_to_one(self):
+        """Test that softmax normalizes each row and leaves the input untouched"""
+        original = self.outputs.copy()
+        predictions, scores = PostProcessing(activation='softmax').apply(self.outputs)
+        
+        np.testing.assert_allclose(predictions.sum(axis=1), np.ones(3), rtol=1e-6)
+        np.testing.assert_array_equal(predictions.argmax(axis=1), self.outputs.argmax(axis=1))
+        np.testing.assert_array_equal(self.outputs, original)
+        self.assertIsNone(scores)
+    
+    def test_sigmoid(self):
+        """Test sigmoid against the closed form, including large inputs"""
+        outputs = np.array([[0.0, 2.0, -1000.0, 1000.0]], dtype=np.float32)
+        predictions, _ = PostProcessing(activation='sigmoid').apply(outputs)
+        
+        np.testing.assert_allclose(predictions, [[0.5, 1 / (1 + np.exp(-2.0)), 0.0, 1.0]], rtol=1e-6)
+    
+    def test_argmax(self):
+        """Test that argmax returns one label and one score per row"""
+        labels, scores = parse_options({'argmax': 'true'}).apply(self.outputs)
+        
+        np.testing.assert_array_equal(labels, [1, 0, 2])
+        np.testing.assert_allclose(scores, [2.0, 3.0, -0.5])
+    
+    def test_top_k_is_sorted(self):
+        """Test that top-k labels come best first, and k is capped at the class count"""
+        labels, scores = PostProcessing(top_k=2).apply(self.outputs)
+        np.testing.assert_array_equal(labels, [[1, 3], [0, 3], [2, 1]])
+        np.testing.assert_allclose(scores, [[2.0, 0.5], [3.0, 2.9], [-0.5, -1.0]])
+        
+        labels, _ = PostProcessing(top_k=10).apply(self.outputs)
+        self.assertEqual(labels.shape, (3, 4))
+        np.testing.assert_array_equal(labels[:, 0], [1, 0, 2])
+    
+    def test_threshold(self):
+        """Test threshold flags, and top-k labels below the threshold becoming -1"""
+        flags, _ = PostProcessing(threshold=0.5).apply(self.outputs)
+        np.testing.assert_array_equal(flags, self.outputs >= 0.5)
+        self.assertEqual(flags.dtype, np.int8)
+        
+        labels, _ = PostProcessing(top_k=1, threshold=1.0).apply(self.outputs)
+        np.testing.assert_array_equal(labels, [1, 0, -1])
+    
+    def test_precision_shortens_json(self):
+        """Test that rounded scores serialize as short decimals"""
+        predictions, _ = PostProcessing(activation='softmax', precision=3).apply(self.outputs)
+        
+        for value in json.loads(json.dumps(predictions.tolist()))[0]:
+            self.assertLessEqual(len(repr(value)), 5)
+    
+    def test_parse_options(self):
+        """Test query parameter parsing and rejection of bad values"""
+        self.assertIsNone(parse_options({}))
+        self.assertIsNone(parse_options({'chunk_size': '10'}))
+        
+        options = parse_options({'activation': 'Softmax', 'top_k': '3', 'precision': '4', 'model_info': 'false'})
+        self.assertEqual(options.activation, 'softmax')
+        self.assertEqual(options.top_k, 3)
+        self.assertEqual(options.precision, 4)
+        self.assertFalse(options.include_model_info)
+        
+        for params in ({'activation': 'relu'}, {'top_k': 'x'}, {'top_k': '-1'},
+                       {'threshold': 'high'}, {'precision': '50'}):
+            with self.assertRaises(ValueError):
+                parse_options(params)
+    
+    def test_ndjson_chunk_with_scores(self):
+        """Test that streamed chunks carry a score next to each label"""
+        labels, scores = PostProcessing(top_k=1).apply(self.outputs[:2])
+        chunk = {"offset": 10, "size": 3, "predictions": labels, "scores": scores,
+                 "row_indices": [0, 2], "errors": {1: "bad record"}}
+        
+        lines = [json.loads(line) for line in wire_formats.encode_ndjson_chunk(chunk).decode().splitlines()]
+        self.assertEqual(lines[0], {"index": 10, "prediction": 1, "score": 2.0})
+        self.assertEqual(lines[1], {"index": 11, "error": "bad record"})
+        self.assertEqual(lines[2]["prediction"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,48 @@
+import unittest
+import tempfile
+import os
+import sys
+import torch
+import torch.nn as nn
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.precision import build_precision_model, precision_report
+
+class TestPrecision(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a small MLP and reference inputs"""
+        torch.manual_seed(0)
+        self.model = nn.Sequential(nn.Linear(32, 64), nn.ReLU(), nn.Linear(64, 4)).eval()
+        self.inputs = torch.randn(128, 32)
+        self.device = torch.device('cpu')
+    
+    def test_int8_dynamic(self):
+        """Test int8 quantization, caching and the accuracy report"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            artifact_path = os.path.join(tmpdir, 'model.int8-dynamic.pt')
+            quantized = build_precision_model(self.model, 'int8-dynamic', self.device, artifact_path)
+            self.assertTrue(os.path.exists(artifact_path))
+            
+            report = precision_report(self.model, quantized, self.inputs, 'int8-dynamic', timing_runs=2)
+        
+        self.assertLess(report['max_abs_diff'], 0.1)
+        self.assertGreater(report['argmax_agreement'], 0.9)
+        self.assertGreater(report['size_saved_mb'], 0)
+    
+    def test_bf16_keeps_float32_interface(self):
+        """Test that the bf16 model takes and returns float32"""
+        reduced = build_precision_model(self.model, 'bf16', self.device)
+        with torch.no_grad():
+            output = reduced(self.inputs)
+        
+        self.assertEqual(output.dtype, torch.float32)
+        self.assertEqual(next(self.model.parameters()).dtype, torch.float32)
+    
+    def test_fp32_is_unchanged(self):
+        """Test that fp32 returns the original model"""
+        self.assertIs(build_precision_model(self.model, 'fp32', self.device), self.model)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
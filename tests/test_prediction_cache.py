@@ -0,0 +1,111 @@
+import unittest
+import threading
+import time
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.prediction_cache import PredictionCache
+
+class TestPredictionCache(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a cache and a compute function that records its calls"""
+        self.cache = PredictionCache(max_entries=100, ttl_seconds=60)
+        self.calls = []
+        
+        def compute(rows):
+            self.calls.append(rows.shape[0])
+            return rows.sum(axis=1, keepdims=True)
+        
+        self.compute = compute
+    
+    def test_batch_only_computes_misses(self):
+        """Test that only uncached rows reach the model"""
+        rows = np.arange(12, dtype=np.float32).reshape(4, 3)
+        self.cache.get_or_compute(rows[:2], self.compute, version='v1')
+        result = self.cache.get_or_compute(rows, self.compute, version='v1')
+        
+        np.testing.assert_array_equal(result, rows.sum(axis=1, keepdims=True))
+        self.assertEqual(self.calls, [2, 2])
+        self.assertEqual(self.cache.get_stats()['hits'], 2)
+    
+    def test_duplicate_rows_in_batch(self):
+        """Test that repeated rows within one batch are computed once"""
+        rows = np.ones((5, 3), dtype=np.float32)
+        result = self.cache.get_or_compute(rows, self.compute, version='v1')
+        
+        self.assertEqual(self.calls, [1])
+        self.assertEqual(result.shape, (5, 1))
+    
+    def test_version_change_clears(self):
+        """Test that a new model version invalidates cached rows"""
+        rows = np.ones((1, 3), dtype=np.float32)
+        self.cache.get_or_compute(rows, self.compute, version='v1')
+        self.cache.get_or_compute(rows, self.compute, version='v2')
+        
+        self.assertEqual(self.calls, [1, 1])
+        self.assertEqual(self.cache.get_stats()['entries'], 1)
+    
+    def test_eviction_under_budget(self):
+        """Test LRU eviction once max_entries is exceeded"""
+        cache = PredictionCache(max_entries=2)
+        for value in range(3):
+            cache.get_or_compute(np.full((1, 3), value, dtype=np.float32), self.compute)
+        
+        stats = cache.get_stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertEqual(stats['evictions'], 1)
+    
+    def test_concurrent_requests_are_coalesced(self):
+        """Test that identical in-flight rows share one computation"""
+        started = threading.Event()
+        
+        def slow_compute(rows):
+            started.set()
+            time.sleep(0.1)
+            return self.compute(rows)
+        
+        rows = np.ones((1, 3), dtype=np.float32)
+        results = []
+        first = threading.Thread(target=lambda: results.append(self.cache.get_or_compute(rows, slow_compute)))
+        first.start()
+        started.wait()
+        results.append(self.cache.get_or_compute(rows, self.compute))
+        first.join()
+        
+        self.assertEqual(self.calls, [1])
+        np.testing.assert_array_equal(results[0], results[1])
+    
+    def test_version_change_during_computation(self):
+        """Test that a computation for the old version is neither joined nor cached after a swap"""
+        started = threading.Event()
+        release = threading.Event()
+        
+        def old_model(rows):
+            started.set()
+            release.wait(timeout=5)
+            return np.zeros((rows.shape[0], 1), dtype=np.float32)
+        
+        rows = np.ones((1, 3), dtype=np.float32)
+        results = []
+        first = threading.Thread(
+            target=lambda: results.append(self.cache.get_or_compute(rows, old_model, version='v1'))
+        )
+        first.start()
+        started.wait(timeout=5)
+        
+        new_result = self.cache.get_or_compute(rows, self.compute, version='v2')
+        release.set()
+        first.join()
+        
+        np.testing.assert_array_equal(new_result, [[3.0]])
+        np.testing.assert_array_equal(results[0], [[0.0]])
+        self.assertEqual(self.calls, [1])
+        # Only the v2 answer is cached
+        np.testing.assert_array_equal(self.cache.get_or_compute(rows, old_model, version='v2'), [[3.0]])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+import torch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.profiler import ProfilerCapture, StackSampler
+from app.utils import metrics
+from app.utils.metrics import stage
+
+def busy_work(seconds):
+    """Spin in Python so the sampler has a stack to see"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+class TestProfiler(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a capture writing into a temporary directory"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.profiler = ProfilerCapture(self.tmpdir.name, max_seconds=30)
+    
+    def tearDown(self):
+        metrics.set_stage_hook(None)
+        self.tmpdir.cleanup()
+    
+    def test_idle_by_default(self):
+        """Test that an unarmed profiler captures nothing"""
+        self.assertFalse(self.profiler.armed)
+        self.assertIsNone(self.profiler.begin_request('api.predict'))
+        self.assertEqual(self.profiler.get_status()["state"], "idle")
+        self.assertIsNone(metrics._stage_hook)
+    
+    def test_arm_validates_limits(self):
+        """Test rejection of out-of-range limits and of a second concurrent capture"""
+        with self.assertRaises(ValueError):
+            self.profiler.arm(requests=0)
+        with self.assertRaises(ValueError):
+            self.profiler.arm(seconds=60)
+        
+        self.profiler.arm(requests=1)
+        with self.assertRaises(RuntimeError):
+            self.profiler.arm(requests=1)
+    
+    def test_capture_writes_trace_and_flamegraph(self):
+        """Test that captured requests produce Chrome traces with stage spans and collapsed stacks"""
+        self.profiler.arm(requests=2, sample_interval_ms=1)
+        model = torch.nn.Linear(8, 2)
+        
+        def handle_request():
+            with stage('preprocess'):
+                busy_work(0.02)
+            with stage('inference'):
+                model(torch.randn(4, 8))
+        
+        self.profiler.run('api.health_check', handle_request)
+        self.profiler.run('api.predict', handle_request)
+        self.profiler.run('api.predict', handle_request)
+        
+        status = self.profiler.get_status()
+        self.assertEqual(status["state"], "done")
+        self.assertFalse(self.profiler.armed)
+        self.assertEqual(len(status["traces"]), 2)
+        self.assertIsNone(metrics._stage_hook)
+        
+        with open(status["traces"][0]) as f:
+            trace = f.read()
+        self.assertIn('preprocess', trace)
+        self.assertIn('aten::', trace)
+        
+        with open(status["flamegraph"]) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(any('busy_work' in line for line in lines))
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+    
+    def test_stage_spans_only_on_captured_thread(self):
+        """Test that concurrent requests don't add their stages to the captured request's trace"""
+        self.profiler.arm(requests=1)
+        handle = self.profiler.begin_request('api.predict')
+        self.assertIsNotNone(handle)
+        
+        spans = []
+        other = threading.Thread(target=lambda: spans.append(self.profiler._stage_span('preprocess')))
+        other.start()
+        other.join()
+        
+        self.assertIsNone(spans[0])
+        self.assertIsNotNone(self.profiler._stage_span('preprocess'))
+        self.profiler.end_request(handle)
+    
+    def test_capture_expires(self):
+        """Test that an armed capture disarms itself after its time limit"""
+        self.profiler.arm(requests=5, seconds=0.05)
+        time.sleep(0.3)
+        
+        self.assertFalse(self.profiler.armed)
+        self.assertEqual(self.profiler.get_status()["state"], "done")
+    
+    def test_stack_sampler_only_samples_registered_threads(self):
+        """Test collapsed stacks for a registered thread"""
+        sampler = StackSampler(interval=0.001)
+        sampler.start()
+        worker = threading.Thread(target=busy_work, args=(0.05,))
+        worker.start()
+        sampler.add_thread(worker.ident)
+        worker.join()
+        sampler.stop()
+        
+        self.assertGreater(sampler.samples, 0)
+        self.assertTrue(any('busy_work' in stack for stack in sampler.counts))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
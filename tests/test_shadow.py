@@ -0,0 +1,136 @@
+import unittest
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.shadow import ShadowEvaluator
+
+class TestShadowEvaluator(unittest.TestCase):
+    
+    def _evaluator(self, predict_fn, **options):
+        options.setdefault('sample_rate', 1.0)
+        options.setdefault('busy', lambda: False)
+        evaluator = ShadowEvaluator(predict_fn, seed=0, **options)
+        self.addCleanup(evaluator.shutdown)
+        return evaluator
+    
+    def test_agreement_and_drift(self):
+        """Test vectorized agreement, differences, mean shift and label distance"""
+        # The candidate flips the sign of the second output
+        evaluator = self._evaluator(lambda rows: rows[:, :2] * np.array([1.0, -1.0], dtype=np.float32))
+        inputs = np.array([[2.0, 1.0, 0.0], [1.0, -3.0, 0.0], [0.0, 1.0, 0.0], [4.0, 0.0, 0.0]], dtype=np.float32)
+        primary = inputs[:, :2].copy()
+        
+        self.assertTrue(evaluator.submit(inputs, primary, 0.002))
+        self.assertTrue(evaluator.wait_idle(timeout=5))
+        
+        stats = evaluator.get_stats()
+        self.assertEqual((stats["compared_requests"], stats["compared_rows"], stats["errors"]), (1, 4, 0))
+        # Rows 1 and 2 change their argmax once the second output is negated
+        self.assertAlmostEqual(stats["agreement_rate"], 0.5)
+        self.assertAlmostEqual(stats["mean_abs_diff"], (2 + 6 + 2) / 8)
+        self.assertAlmostEqual(stats["rms_diff"], np.sqrt((4 + 36 + 4) / 8))
+        self.assertAlmostEqual(stats["max_abs_diff"], 6.0)
+        np.testing.assert_allclose(stats["mean_shift"], [0.0, 0.5])
+        # Both models predict class 0 for three rows of four, just not the same three
+        self.assertEqual(stats["label_distribution"]["primary"], [0.75, 0.25])
+        self.assertEqual(stats["label_distribution"]["shadow"], [0.75, 0.25])
+        self.assertAlmostEqual(stats["label_distance"], 0.0)
+        self.assertAlmostEqual(stats["latency_ms"]["primary"], 2.0)
+        self.assertIsNotNone(stats["latency_ms"]["shadow"])
+    
+    def test_single_output_uses_threshold(self):
+        """Test that single-output models are compared on the decision threshold"""
+        evaluator = self._evaluator(lambda rows: rows[:, :1] + 0.2, decision_threshold=0.5)
+        inputs = np.array([[0.1], [0.4], [0.9]], dtype=np.float32)
+        evaluator.submit(inputs, inputs.copy(), 0.001)
+        evaluator.wait_idle(timeout=5)
+        
+        self.assertAlmostEqual(evaluator.get_stats()["agreement_rate"], 2 / 3)
+    
+    def test_untimed_requests_are_left_out_of_latency(self):
+        """Test that requests without a primary forward time are compared on outputs only"""
+        evaluator = self._evaluator(lambda rows: rows)
+        inputs = np.ones((2, 2), dtype=np.float32)
+        evaluator.submit(inputs, inputs.copy(), None)
+        evaluator.submit(inputs, inputs.copy(), 0.004)
+        evaluator.wait_idle(timeout=5)
+        
+        stats = evaluator.get_stats()
+        self.assertEqual(stats["compared_requests"], 2)
+        self.assertEqual(stats["latency_ms"]["timed_requests"], 1)
+        self.assertAlmostEqual(stats["latency_ms"]["primary"], 4.0)
+        self.assertAlmostEqual(stats["latency_ms"]["primary_per_row"], 2.0)
+    
+    def test_inputs_are_copied(self):
+        """Test that the queued input survives the caller reusing its buffer"""
+        seen = []
+        release = threading.Event()
+        
+        def predict(rows):
+            release.wait(timeout=5)
+            seen.append(rows.copy())
+            return rows
+        
+        evaluator = self._evaluator(predict)
+        buffer = np.ones((2, 3), dtype=np.float32)
+        evaluator.submit(buffer, buffer.copy(), 0.001)
+        buffer[:] = 0
+        release.set()
+        evaluator.wait_idle(timeout=5)
+        
+        np.testing.assert_array_equal(seen[0], np.ones((2, 3)))
+    
+    def test_sampling(self):
+        """Test that only the configured fraction of requests is queued"""
+        evaluator = self._evaluator(lambda rows: rows, sample_rate=0.0)
+        outputs = np.zeros((1, 2), dtype=np.float32)
+        self.assertFalse(any(evaluator.submit(outputs, outputs, 0.001) for _ in range(100)))
+        self.assertEqual(evaluator.get_stats()["sampled"], 0)
+        
+        with self.assertRaises(ValueError):
+            ShadowEvaluator(lambda rows: rows, sample_rate=1.5)
+    
+    def test_dropped_under_load(self):
+        """Test that shadow work is dropped while busy or once the queue is full"""
+        busy = [True]
+        release = threading.Event()
+        evaluator = self._evaluator(lambda rows: release.wait(timeout=5) and rows,
+                                    max_queue=1, busy=lambda: busy[0])
+        outputs = np.zeros((1, 2), dtype=np.float32)
+        
+        self.assertFalse(evaluator.submit(outputs, outputs, 0.001))
+        busy[0] = False
+        # The first is picked up by the worker, the second fills the queue, the third is dropped
+        evaluator.submit(outputs, outputs, 0.001)
+        while evaluator._queue.qsize():
+            time.sleep(0.001)
+        self.assertTrue(evaluator.submit(outputs, outputs, 0.001))
+        self.assertFalse(evaluator.submit(outputs, outputs, 0.001))
+        release.set()
+        evaluator.wait_idle(timeout=5)
+        
+        stats = evaluator.get_stats()
+        self.assertEqual(stats["dropped"], {"queue_full": 1, "busy": 1})
+        self.assertEqual((stats["sampled"], stats["compared_requests"]), (4, 2))
+    
+    def test_candidate_errors_are_counted(self):
+        """Test that a failing candidate never affects the caller"""
+        def fail(rows):
+            raise RuntimeError("candidate failed")
+        
+        evaluator = self._evaluator(fail)
+        outputs = np.zeros((1, 2), dtype=np.float32)
+        self.assertTrue(evaluator.submit(outputs, outputs, 0.001))
+        evaluator.wait_idle(timeout=5)
+        
+        stats = evaluator.get_stats()
+        self.assertEqual((stats["errors"], stats["compared_requests"]), (1, 0))
+        self.assertIsNone(stats["agreement_rate"])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,39 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.topology import plan_topology
+
+class TestTopology(unittest.TestCase):
+    
+    def test_cores_split_across_workers(self):
+        """Test that every core is used exactly once and threads match the split"""
+        layout = plan_topology(4, cpus=list(range(16)))
+        
+        self.assertEqual(len(layout), 4)
+        self.assertEqual(sorted(cpu for slot in layout for cpu in slot['cpus']), list(range(16)))
+        self.assertEqual([slot['intra_op_threads'] for slot in layout], [4, 4, 4, 4])
+    
+    def test_uneven_split(self):
+        """Test that leftover cores go to the first workers"""
+        layout = plan_topology(4, cpus=list(range(10)))
+        
+        self.assertEqual([len(slot['cpus']) for slot in layout], [3, 3, 2, 2])
+    
+    def test_more_workers_than_cores(self):
+        """Test that oversubscribed workers run single-threaded"""
+        layout = plan_topology(3, cpus=[0, 1])
+        
+        self.assertEqual([slot['intra_op_threads'] for slot in layout], [1, 1, 1])
+    
+    def test_explicit_thread_counts(self):
+        """Test explicit intra-op and inter-op thread counts"""
+        layout = plan_topology(2, cpus=list(range(8)), intra_op_threads=2, interop_threads=2)
+        
+        self.assertEqual(layout[0]['intra_op_threads'], 2)
+        self.assertEqual(layout[0]['interop_threads'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.warmup import Readiness, percentile, settle_latency
+
+class FakeClock:
+    """A clock that only moves when a stub forward pass advances it"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+class TestSettleLatency(unittest.TestCase):
+    
+    def setUp(self):
+        self.clock = FakeClock()
+        self.calls = []
+    
+    def _run(self, latencies):
+        """A forward pass whose latency for each batch size follows latencies(batch_size, call_number)"""
+        def run(batch_size):
+            self.calls.append(batch_size)
+            self.clock.now += latencies(batch_size, len(self.calls))
+        return run
+    
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        samples = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(samples, 50), 50.0)
+        self.assertEqual(percentile(samples, 99), 99.0)
+        self.assertEqual(percentile([3.0], 99), 3.0)
+    
+    def test_settles_once_p99_stops_moving(self):
+        """Test that rounds continue while the first passes are slow and stop once p99 is stable"""
+        # The first 30 calls are cold: 50ms instead of 1ms (batch 1) or 4ms (batch 8)
+        run = self._run(lambda size, call: 0.05 if call <= 30 else 0.001 * (1 if size == 1 else 4))
+        report = settle_latency(run, [1, 8], iterations=10, clock=self.clock)
+        
+        self.assertTrue(report["settled"])
+        # Rounds 1-2 include cold calls, round 3 is the first warm one and round 4 confirms it
+        self.assertEqual(report["rounds"], 4)
+        self.assertEqual(len(self.calls), 4 * 2 * 10)
+        self.assertAlmostEqual(report["batch_sizes"]["1"]["p99_ms"], 1.0)
+        self.assertAlmostEqual(report["batch_sizes"]["8"]["p50_ms"], 4.0)
+    
+    def test_stops_after_max_seconds(self):
+        """Test that warm-up gives up, unsettled, when p99 keeps moving"""
+        run = self._run(lambda size, call: 0.001 * call)
+        report = settle_latency(run, [1], iterations=5, max_seconds=1.0, clock=self.clock)
+        
+        self.assertFalse(report["settled"])
+        self.assertGreaterEqual(report["seconds"], 1.0)
+    
+    def test_needs_batch_sizes(self):
+        with self.assertRaises(ValueError):
+            settle_latency(lambda size: None, [])
+
+class TestReadiness(unittest.TestCase):
+    
+    def test_states(self):
+        """Test idle -> warming -> ready, and that a warm-up is only started once"""
+        clock = FakeClock()
+        readiness = Readiness(clock=clock)
+        self.assertTrue(readiness.ready)
+        
+        self.assertTrue(readiness.begin())
+        self.assertFalse(readiness.begin())
+        self.assertFalse(readiness.ready)
+        self.assertEqual(readiness.to_dict()["state"], "warming")
+        
+        clock.now = 2.5
+        readiness.finish({"settled": True})
+        state = readiness.to_dict()
+        self.assertTrue(state["ready"])
+        self.assertEqual(state["warm_up_seconds"], 2.5)
+        self.assertEqual(state["warm_up"], {"settled": True})
+    
+    def test_failure_is_not_ready(self):
+        """Test that a failed warm-up keeps the worker out of rotation"""
+        readiness = Readiness()
+        readiness.begin()
+        readiness.fail("model file missing")
+        
+        self.assertFalse(readiness.ready)
+        self.assertEqual(readiness.to_dict()["error"], "model file missing")
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,162 @@
+import io
+import unittest
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import wire_formats
+
+class TestWireFormats(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.array = np.arange(12, dtype=np.float32).reshape(3, 4)
+    
+    def test_raw_round_trip(self):
+        """Test raw float32 decoding with a shape header"""
+        body, headers = wire_formats.encode_result({"prediction": self.array}, 'prediction', wire_formats.OCTET_STREAM)
+        decoded = wire_formats.decode_body(body, 'application/octet-stream', 'input', headers[wire_formats.SHAPE_HEADER])
+        
+        np.testing.assert_array_equal(decoded, self.array)
+        self.assertEqual(headers[wire_formats.SHAPE_HEADER], '3,4')
+    
+    def test_raw_decode_is_zero_copy(self):
+        """Test that the decoded array is a view over the request bytes"""
+        body = self.array.tobytes()
+        decoded = wire_formats.decode_raw(body, '3,4')
+        
+        self.assertFalse(decoded.flags.owndata)
+        self.assertEqual(decoded.dtype, np.float32)
+    
+    def test_raw_shape_mismatch(self):
+        """Test that a wrong shape header is rejected"""
+        with self.assertRaises(ValueError):
+            wire_formats.decode_raw(self.array.tobytes(), '5,4')
+    
+    def test_npy_round_trip(self):
+        """Test .npy encoding and zero-copy decoding"""
+        body, _ = wire_formats.encode_result({"predictions": self.array}, 'predictions', 'application/npy')
+        decoded = wire_formats.decode_body(body, wire_formats.NPY, 'inputs')
+        
+        np.testing.assert_array_equal(decoded, self.array)
+        self.assertFalse(decoded.flags.owndata)
+    
+    def test_rejected_rows_in_headers(self):
+        """Test that raw and .npy batch responses list rejected rows in headers"""
+        result = {"predictions": self.array, "errors": [{"index": 1, "error": "bad"}, {"index": 4, "error": "bad"}]}
+        for mimetype in (wire_formats.OCTET_STREAM, wire_formats.NPY):
+            _, headers = wire_formats.encode_result(result, 'predictions', mimetype)
+            self.assertEqual(headers[wire_formats.REJECTED_ROWS_HEADER], '1,4')
+            self.assertEqual(headers[wire_formats.ROW_ERRORS_HEADER], '2')
+        
+        _, headers = wire_formats.encode_result({"predictions": self.array}, 'predictions', wire_formats.NPY)
+        self.assertNotIn(wire_formats.REJECTED_ROWS_HEADER, headers)
+        
+        too_many = {"predictions": self.array, "errors": [{"index": i, "error": "bad"} for i in range(10000)]}
+        with self.assertRaises(wire_formats.RowErrorsTooLarge):
+            wire_formats.encode_result(too_many, 'predictions', wire_formats.OCTET_STREAM)
+    
+    def test_msgpack_round_trip(self):
+        """Test msgpack encoding with binary array payloads"""
+        if wire_formats.msgpack is None:
+            self.skipTest("msgpack is not installed")
+        
+        result = {"success": True, "predictions": self.array}
+        body, _ = wire_formats.encode_result(result, 'predictions', wire_formats.MSGPACK)
+        payload = wire_formats.msgpack.unpackb(body, raw=False)
+        decoded = wire_formats.decode_msgpack(body, 'predictions')
+        
+        self.assertTrue(payload['success'])
+        np.testing.assert_array_equal(decoded, self.array)
+    
+    def test_msgpack_bad_dtype_and_shape(self):
+        """Test that an invalid dtype or shape is a client error"""
+        if wire_formats.msgpack is None:
+            self.skipTest("msgpack is not installed")
+        
+        data = self.array.tobytes()
+        for payload in ({'inputs': data, 'dtype': 'no-such-type'}, {'inputs': data, 'dtype': 3.5},
+                        {'inputs': data, 'shape': 12}, {'inputs': data, 'shape': ['three', 4]}):
+            with self.assertRaises(ValueError):
+                wire_formats.decode_msgpack(wire_formats.msgpack.packb(payload, use_bin_type=True), 'inputs')
+    
+    def test_ndjson_records(self):
+        """Test that NDJSON lines are parsed and bad lines become errors"""
+        stream = io.BytesIO(b'[1.0, 2.0]\n\n{"features": [3.0, 4.0]}\nnot json\n')
+        records = list(wire_formats.iter_ndjson_records(stream, 1024))
+        
+        self.assertEqual(records[0], [1.0, 2.0])
+        self.assertEqual(records[1], {"features": [3.0, 4.0]})
+        self.assertIsInstance(records[2], ValueError)
+    
+    def test_ndjson_oversized_record(self):
+        """Test that oversized lines are skipped without stopping the stream"""
+        stream = io.BytesIO(b'[' + b'1.0, ' * 100 + b'1.0]\n[5.0]\n')
+        records = list(wire_formats.iter_ndjson_records(stream, 64))
+        
+        self.assertIsInstance(records[0], ValueError)
+        self.assertEqual(records[1], [5.0])
+    
+    def test_frames_round_trip(self):
+        """Test length-prefixed frames, with an empty frame for rejected rows"""
+        chunk = {
+            "offset": 0,
+            "size": 3,
+            "predictions": self.array[:2],
+            "row_indices": [0, 2],
+            "errors": {1: "bad row"}
+        }
+        stream = io.BytesIO(wire_formats.encode_frames_chunk(chunk))
+        records = list(wire_formats.iter_frame_records(stream, 1024))
+        
+        self.assertEqual(len(records), 3)
+        np.testing.assert_array_equal(records[0], self.array[0])
+        self.assertEqual(records[1].size, 0)
+        np.testing.assert_array_equal(records[2], self.array[1])
+    
+    def test_ndjson_reader_matches_iterator(self):
+        """Test that lines fed in arbitrary pieces split the same way as the blocking reader's"""
+        data = b'[1.0, 2.0]\n\n[' + b'1.0, ' * 100 + b'1.0]\n{"features": [3.0, 4.0]}\nnot json\n[5.0]'
+        reader = wire_formats.NdjsonRecordReader(64)
+        lines = []
+        for start in range(0, len(data), 7):
+            lines += reader.feed(data[start:start + 7])
+        lines += reader.close()
+        records = [reader.decode(line) for line in lines]
+        expected = list(wire_formats.iter_ndjson_records(io.BytesIO(data), 64))
+        
+        self.assertEqual(len(records), len(expected))
+        for record, expected_record in zip(records, expected):
+            if isinstance(expected_record, Exception):
+                self.assertIsInstance(record, ValueError)
+            else:
+                self.assertEqual(record, expected_record)
+    
+    def test_frame_reader(self):
+        """Test frames fed a byte at a time, an oversized frame, and a truncated last frame"""
+        chunk = {
+            "offset": 0,
+            "size": 2,
+            "predictions": self.array[:2],
+            "row_indices": [0, 1],
+            "errors": {}
+        }
+        oversized = wire_formats.FRAME_HEADER.pack(2048) + bytes(2048)
+        data = oversized + wire_formats.encode_frames_chunk(chunk) + wire_formats.FRAME_HEADER.pack(8) + b'\0'
+        reader = wire_formats.FrameRecordReader(1024)
+        frames = []
+        for position in range(len(data)):
+            frames += reader.feed(data[position:position + 1])
+        frames += reader.close()
+        records = [reader.decode(frame) for frame in frames]
+        
+        self.assertEqual(len(records), 4)
+        self.assertIsInstance(records[0], ValueError)
+        np.testing.assert_array_equal(records[1], self.array[0])
+        np.testing.assert_array_equal(records[2], self.array[1])
+        self.assertEqual(str(records[3]), "Truncated frame")
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file